@@ -1,79 +1,209 @@
-import datetime
+import bisect
+import time
+
+import numpy as np
+
+from src.account.ledger import Ledger, BUY, SELL, market_ts
+from src.event_engine.event import Event
 from src.event_engine.event_type import EventType
 from utils.logger import get_logger
 
 logger = get_logger("Account")
 
+# 按信号成交的事件：未启用风控时直接订阅 STRATEGY_SIGNAL，启用后订阅风控放行的 ORDER_SUBMIT
+ORDER_EVENTS = (EventType.STRATEGY_SIGNAL, EventType.ORDER_SUBMIT)
+
 
 class AccountSimulator:
-    def __init__(self, initial_cash: int = 1_000_000):
+    """
+    模拟账户
+
+    - 持仓市值增量维护：某标的最新价变化时只按该标的持仓加上 数量 × 价差，每个行情 O(1)，与持仓数无关
+    - 成交与资产曲线记入列式账本 ledger（见 src/account/ledger.py），report() 一次性计算绩效
+    - 资产曲线列：history_ts / history_cash / history_equity；时间戳取最近一条行情的交易日 + 时间（market_ts），
+      回放时按行情时间计算日收益与夏普，行情不带交易日时退化为 time.time()
+    - 持仓只在成交时拷贝一份，记为 (资产曲线下标, 持仓字典)，见 position_history
+    - 传入 fill_simulator 时按缓存的十档盘口撮合（部分成交 / 滑点 / 费用 / 整手 / T+1，见 src/account/fill_simulator.py），
+      否则按信号价全部成交
+    - 信号来自 STRATEGY_SIGNAL，或经事前风控（src/risk/risk_engine.py）放行后的 ORDER_SUBMIT
+    - 传入 event_engine 时每笔委托处理完都发出 ORDER_FILLED（未成交 volume 为 0），风控据此按实际成交对账
+    """
+
+    def __init__(self, initial_cash: int = 1_000_000, fill_simulator=None, name: str = "", event_engine=None):
+        """
+        :param fill_simulator: 撮合模拟器（可被多个账户共用）
+        :param name: 账户名称（组合中的子账户为策略名）
+        :param event_engine: 发布 ORDER_FILLED 的事件引擎，None 表示不发布
+        """
+        self.name = name
+        self.event_engine = event_engine
         self.initial_cash = initial_cash
+        self.fill_simulator = fill_simulator
         self.cash = initial_cash
         self.position: dict[str, int] = {}
-        self.trades:   list[list] = []
-        self.history:  list[dict] = []
+        self.ledger = Ledger()
+        self.market_value = 0.0
+        self.position_history: list[tuple[int, dict]] = []
         self._last_prices: dict[str, float] = {}
+        self._market_ts = None      # 最近一条行情的时间（epoch 秒）
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.market_value
+
+    @property
+    def trades(self) -> np.ndarray:
+        return self.ledger.trades
+
+    @property
+    def history_ts(self) -> np.ndarray:
+        return self.ledger.equity["ts"]
+
+    @property
+    def history_cash(self) -> np.ndarray:
+        return self.ledger.equity["cash"]
+
+    @property
+    def history_equity(self) -> np.ndarray:
+        return self.ledger.equity["equity"]
 
     # ========== 事件入口 ==========
     def on_event(self, event):
-        if event.type == EventType.STRATEGY_SIGNAL:
+        if event.type in ORDER_EVENTS:
             self._on_order_filled(event.data)
         elif event.type == EventType.MARKET_SNAPSHOT:
             self._on_price(event.data)
+        elif event.type == EventType.ORDER_BOOK and self.fill_simulator is not None:
+            self.fill_simulator.on_market(event.data)
+
+    def on_events(self, events: list):
+        """批量入口：信号逐条成交；行情逐条增量估值，整批结束后只记一次资产曲线"""
+        revalue = False
+        fill_simulator = self.fill_simulator
+        for event in events:
+            if event.type in ORDER_EVENTS:
+                self._on_order_filled(event.data)
+            elif event.type == EventType.MARKET_SNAPSHOT:
+                md = event.data
+                if fill_simulator is not None:
+                    fill_simulator.on_market(md)
+                self._market_ts = market_ts(md) or self._market_ts
+                sym, price = md.get("SecurityID"), md.get("TradePx")
+                if sym and price is not None:
+                    revalue = self._mark(sym, price) or revalue
+            elif event.type == EventType.ORDER_BOOK and fill_simulator is not None:
+                fill_simulator.on_market(event.data)
+        if revalue:
+            self._snapshot(self.now())
+
+    def now(self) -> float:
+        """记账时间：最近一条行情的时间，尚无带交易日的行情时为 time.time()"""
+        return self._market_ts or time.time()
 
     # ---------- 信号处理 ----------
-    def _on_order_filled(self, sig: dict):
+    def _on_order_filled(self, sig: dict, ts: float = None):
+        """:param ts: 成交时间（epoch 秒），缺省为 now()"""
+        price, vol, fee = self._execute(sig, ts)
+        if self.event_engine is not None:
+            self.event_engine.put(Event(EventType.ORDER_FILLED, {
+                "symbol": sig["symbol"], "action": sig["action"], "price": price, "volume": vol, "fee": fee,
+                "account": self.name, "order": sig,
+            }, source=self.name or "Account"))
+
+    def _execute(self, sig: dict, ts: float = None) -> tuple:
+        """成交一笔信号并记账，返回 (成交均价, 成交数量, 费用)，未成交时数量为 0"""
         sym, act, price = sig["symbol"], sig["action"], sig["price"]
         vol = sig.get("volume", 100)
-        ts  = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ts  = ts or self.now()
+        fee = 0.0
 
+        if self.fill_simulator is not None:
+            fill = self.fill_simulator.execute(sig, self.position.get(sym, 0), self.cash, self.name)
+            if not fill.qty:
+                return price, 0, 0.0
+            if fill.reason:
+                logger.info("⚠️ %s %s", sym, fill.reason)
+            price, vol, fee = fill.price, fill.qty, fill.fee
+        elif act == "buy":
+            if self.cash < price * vol:
+                logger.warning("资金不足：cash=%s cost=%s", self.cash, price * vol)
+                return price, 0, 0.0
+        elif self.position.get(sym, 0) < vol:
+            logger.warning("持仓不足：%s 想卖 %s 现有 %s", sym, vol, self.position.get(sym, 0))
+            return price, 0, 0.0
+
+        amount = price * vol
+        self._mark(sym, price)
         if act == "buy":
-            cost = price * vol
-            if self.cash < cost:
-                logger.warning("资金不足：cash=%s cost=%s", self.cash, cost)
-                return
-            self.cash -= cost
+            self.cash -= amount + fee
             self.position[sym] = self.position.get(sym, 0) + vol
+            self.market_value += amount
         else:
-            if self.position.get(sym, 0) < vol:
-                logger.warning("持仓不足：%s 想卖 %s 现有 %s", sym, vol, self.position.get(sym, 0))
-                return
-            self.cash += price * vol
+            self.cash += amount - fee
             self.position[sym] -= vol
+            self.market_value -= amount
 
-        self.trades.append([ts, act, sym, price, vol])
-        self._last_prices[sym] = price
-        self._snapshot(ts)
+        self.ledger.record_trade(ts, sym, BUY if act == "buy" else SELL, price, vol, fee)
+        index = self._snapshot(ts)
+        self.position_history.append((index, dict(self.position)))
+        return price, vol, fee
 
     # ---------- 行情估值 ----------
     def _on_price(self, md: dict):
+        if self.fill_simulator is not None:
+            self.fill_simulator.on_market(md)
+        self._market_ts = market_ts(md) or self._market_ts
         sym, price = md.get("SecurityID"), md.get("TradePx")
-        if sym and price is not None:
-            self._last_prices[sym] = price
-            if self.position.get(sym, 0):
-                self._snapshot(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        if sym and price is not None and self._mark(sym, price):
+            self._snapshot(self.now())
+
+    def _mark(self, sym: str, price) -> bool:
+        """刷新最新价并增量更新持仓市值，返回是否持有该标的"""
+        last = self._last_prices.get(sym, 0)
+        self._last_prices[sym] = price
+        qty = self.position.get(sym, 0)
+        if qty:
+            self.market_value += qty * (price - last)
+            return True
+        return False
+
+    def revalue(self) -> float:
+        """按全部持仓重新计算市值（校验 / 消除浮点累计误差用），返回总资产"""
+        self.market_value = float(sum(q * self._last_prices.get(s, 0) for s, q in self.position.items()))
+        return self.equity
 
     # ---------- 快照 ----------
-    def _snapshot(self, ts: str):
-        total = self.cash + sum(q * self._last_prices.get(s, 0)
-                                for s, q in self.position.items())
-        self.history.append({
-            "time": ts,
-            "cash": self.cash,
-            "position": dict(self.position),
-            "total_value": total
-        })
+    def _snapshot(self, ts: float) -> int:
+        return self.ledger.record_equity(ts, self.cash, self.cash + self.market_value)
+
+    def position_at(self, index: int) -> dict:
+        """资产曲线第 index 行时的持仓（该行之前最近一次成交后的持仓）"""
+        i = bisect.bisect_right(self.position_history, index, key=lambda item: item[0])
+        return self.position_history[i - 1][1] if i else {}
 
     # ---------- 输出 ----------
     def print_trades(self):
-        logger.info("📋 [成交记录]")
-        for ts, act, sym, p, q in self.trades:
-            logger.info("  - %s | %s | %s | %s | %s", ts,
-                        "买入" if act == "buy" else "卖出", sym, p, q)
+        df = self.ledger.trades_frame()
+        logger.info("📋 [成交记录]\n%s", df.to_string(index=False) if len(df) else "  无")
 
     def print_history(self):
-        logger.info("📈 [账户资产变化]")
-        for r in self.history:
-            pos = ", ".join(f"{k}:{v}" for k, v in r['position'].items()) or "无"
-            logger.info("  - %s | 现金:%s | 持仓:%s | 总资产:%s",
-                        r['time'], r['cash'], pos, r['total_value'])
+        df = self.ledger.equity_frame()
+        if len(df):
+            # 每行取该行之前最近一次成交后的持仓
+            fill_index = np.array([i for i, _ in self.position_history], dtype=np.int64)
+            labels = np.array(["无"] + [", ".join(f"{k}:{v}" for k, v in pos.items()) or "无"
+                                       for _, pos in self.position_history], dtype=object)
+            df.insert(2, "position", labels[np.searchsorted(fill_index, np.arange(len(df)), side="right")])
+        logger.info("📈 [账户资产变化]\n%s", df.to_string(index=False) if len(df) else "  无")
+
+    def report(self, periods_per_year: int = 252) -> dict:
+        """回测结束后计算并打印绩效（分标的盈亏、收益、夏普、最大回撤、换手率）"""
+        stats = self.ledger.analytics(self._last_prices, periods_per_year=periods_per_year,
+                                      initial_equity=self.initial_cash)
+        logger.info("📊 [绩效] 成交 %d 笔 | 总收益 %.4f%% | 夏普 %.2f | 最大回撤 %.4f%% | 换手率 %.2f",
+                    stats["trades"], stats["total_return"] * 100, stats["sharpe"],
+                    stats["max_drawdown"] * 100, stats["turnover"])
+        pnl = stats["symbol_pnl"]
+        if len(pnl):
+            logger.info("💰 [分标的盈亏]\n%s", pnl.to_string(index=False))
+        return stats
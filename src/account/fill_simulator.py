@@ -0,0 +1,216 @@
+# src/account/fill_simulator.py
+"""
+撮合模拟：按最新十档盘口成交（部分成交 / 滑点 / 交易费用 / A 股整手与 T+1 规则）
+
+盘口来源（按标的缓存最近一次）:
+    - MARKET_SNAPSHOT：SnapshotRow / SnapshotView 的十档（MdsL2StockSnapshotBodyT 的 BidLevels / OfferLevels）
+    - ORDER_BOOK：OrderBookManager 逐笔重建的委托簿深度（bid_px / bid_qty / ask_px / ask_qty）
+普通快照字典不含档位，该标的没有盘口时按信号价（加滑点）全部成交；
+ORDER_BOOK 中的委托队列（kind="best_orders"，买一 / 卖一前 50 笔委托）不代表盘口深度，忽略，不覆盖已缓存的十档
+"""
+
+from typing import Optional
+
+from src.market.order_book import _snapshot_levels
+from utils.logger import get_logger
+
+logger = get_logger("FillSim")
+
+
+class Fill:
+    """一笔委托的撮合结果：qty 成交数量（0 表示未成交），price 成交均价（含滑点），fee 费用合计"""
+
+    __slots__ = ("qty", "price", "fee", "reason")
+
+    def __init__(self, qty: int, price: float, fee: float, reason: str = ""):
+        self.qty = qty
+        self.price = price
+        self.fee = fee
+        self.reason = reason
+
+
+class FillSimulator:
+    """
+    - 市价单（默认）：从对手方最优档逐档吃单，最多 max_levels 档；限价单（信号带 order_type="limit"）只吃不劣于信号价的档位
+    - 对手盘不足时部分成交，剩余数量撤销（IOC）；成交后从缓存盘口扣减，下一次快照到来前的后续信号不会重复吃同一档
+    - 滑点：成交均价再向不利方向偏移 slippage_bps 个基点；限价单的均价不超过限价
+    - 费用：佣金 commission_rate（不低于 min_commission）、卖出印花税 stamp_duty、过户费 transfer_fee，均按成交金额
+    - 整手：买入数量向下取整到 lot_size 的整数倍；卖出须为整手，卖出全部剩余持仓时允许零股
+    - T+1：当日买入的数量当日不可卖，行情交易日变化（或调用 new_day）时解冻
+    - price_scale：价格单位（MDS 原始价格为元 × 10000，此时填 10000），用于换算 min_commission
+    """
+
+    def __init__(self, commission_rate: float = 0.00025, min_commission: float = 5.0,
+                 stamp_duty: float = 0.0005, transfer_fee: float = 0.00001,
+                 slippage_bps: float = 0.0, lot_size: int = 100, t_plus_one: bool = True,
+                 max_levels: int = 10, price_scale: float = 1.0):
+        self.commission_rate = commission_rate
+        self.min_commission = min_commission * price_scale
+        self.stamp_duty = stamp_duty
+        self.transfer_fee = transfer_fee
+        self.slippage = slippage_bps / 10000
+        self.lot_size = lot_size
+        self.t_plus_one = t_plus_one
+        self.max_levels = max_levels
+
+        self._books: dict[str, tuple] = {}        # 代码 -> (买价, 买量, 卖价, 卖量)，列表可被成交扣减
+        self._bought_today: dict[tuple, int] = {}  # (账户, 代码) -> 当日买入数量
+        self._trade_date = None
+        self.filled = 0
+        self.partial = 0
+        self.rejected = 0
+
+    # ---------------- 行情 ----------------
+    def on_market(self, data):
+        """缓存盘口（MARKET_SNAPSHOT / ORDER_BOOK 数据），并按交易日切换解冻 T+1"""
+        day = data.get("trade_date") or data.get("TradeDate")
+        if day and day != self._trade_date:
+            if self._trade_date is not None:
+                self.new_day()
+            self._trade_date = day
+        kind = data.get("kind")
+        if kind == "book":
+            levels = (list(data["bid_px"]), list(data["bid_qty"]), list(data["ask_px"]), list(data["ask_qty"]))
+        elif kind == "best_orders":
+            return
+        else:
+            levels = _snapshot_levels(data)
+        if levels is not None:
+            self._books[data.get("SecurityID")] = levels
+
+    def new_day(self):
+        self._bought_today.clear()
+
+    def book(self, symbol: str) -> Optional[tuple]:
+        return self._books.get(symbol)
+
+    # ---------------- 撮合 ----------------
+    def execute(self, sig: dict, position: int, cash: float, account=None) -> Fill:
+        """
+        按信号撮合一笔委托
+        :param sig: 策略信号（symbol / action / price / volume，可选 order_type="limit"）
+        :param position: 当前持仓
+        :param cash: 可用资金（买入时按 成交金额 + 费用 校验，不足则按资金缩减到整手，只从盘口扣减实际成交的数量）
+        :param account: 账户标识（多个子账户共用一个撮合器时，T+1 冻结按账户分开计算）
+        """
+        sym, price = sig["symbol"], sig["price"]
+        frozen_key = (account, sym)
+        is_buy = sig["action"] == "buy"
+        qty = int(sig.get("volume", 100))
+        lot = self.lot_size
+
+        if is_buy:
+            qty -= qty % lot
+        else:
+            frozen = self._bought_today.get(frozen_key, 0) if self.t_plus_one else 0
+            sellable = position - frozen
+            if qty > sellable:
+                return self._reject(sym, f"可卖数量不足（T+1 冻结 {frozen}）"
+                                    if sellable < position else "持仓不足")
+            if qty % lot and qty != position:
+                qty -= qty % lot
+        if qty <= 0:
+            return self._reject(sym, "不足一手")
+
+        limit = price if sig.get("order_type") == "limit" else None
+        book = self._books.get(sym)
+        vol = None
+        if book is None:
+            fills = [(None, price, qty)]
+        else:
+            px, vol = (book[2], book[3]) if is_buy else (book[0], book[1])
+            fills = self._walk(px, vol, qty, limit, is_buy)
+            if not fills:
+                return self._reject(sym, "对手盘无可成交档位")
+
+        filled = sum(q for _, _, q in fills)
+        avg = self._avg_price(fills, filled, limit, is_buy)
+        amount = avg * filled
+        fee = self.fee(amount, is_buy)
+
+        if is_buy and amount + fee > cash:
+            # 资金不足：先按资金确定买得起的整手数，再只吃这部分档位（盘口按实际成交扣减）
+            cost = amount + fee
+            n = min(filled, int(cash / avg) // lot * lot)    # 吃得越少均价越低，从该估计向上试探
+            while n + lot <= filled and self._cost(fills, n + lot, limit) <= cash:
+                n += lot
+            while n > 0 and self._cost(fills, n, limit) > cash:
+                n -= lot
+            if n <= 0:
+                return self._reject(sym, f"资金不足：cash={cash} cost={cost}")
+            fills = self._head(fills, n)
+            filled = n
+            avg = self._avg_price(fills, filled, limit, is_buy)
+            amount = avg * filled
+            fee = self.fee(amount, True)
+
+        if vol is not None:
+            for i, _, q in fills:
+                vol[i] -= q
+
+        if is_buy and self.t_plus_one:
+            self._bought_today[frozen_key] = self._bought_today.get(frozen_key, 0) + filled
+        self.filled += 1
+        reason = ""
+        if filled < qty:
+            self.partial += 1
+            reason = f"部分成交 {filled}/{qty}"
+        return Fill(filled, avg, fee, reason)
+
+    def _walk(self, px: list, vol: list, qty: int, limit, is_buy: bool) -> list:
+        """逐档计算可成交数量，返回 [(档位序号, 价格, 数量)]；不修改盘口，确定最终成交数量后再扣减"""
+        fills = []
+        remaining = qty
+        for i in range(min(len(px), self.max_levels)):
+            p, v = px[i], vol[i]
+            if not p or v <= 0:
+                continue
+            if limit is not None and (p > limit if is_buy else p < limit):
+                break
+            take = v if v < remaining else remaining
+            fills.append((i, p, take))
+            remaining -= take
+            if not remaining:
+                break
+        return fills
+
+    @staticmethod
+    def _head(fills: list, qty: int) -> list:
+        """按档位顺序截取前 qty 股"""
+        head = []
+        for i, p, q in fills:
+            if qty <= 0:
+                break
+            take = q if q < qty else qty
+            head.append((i, p, take))
+            qty -= take
+        return head
+
+    def _avg_price(self, fills: list, filled: int, limit, is_buy: bool) -> float:
+        """成交均价：按档位加权后向不利方向加滑点，限价单不超过限价"""
+        avg = sum(p * q for _, p, q in fills) / filled
+        if is_buy:
+            avg *= 1 + self.slippage
+            return min(avg, limit) if limit is not None else avg
+        avg *= 1 - self.slippage
+        return max(avg, limit) if limit is not None else avg
+
+    def _cost(self, fills: list, qty: int, limit) -> float:
+        """买入前 qty 股的 成交金额 + 费用"""
+        amount = self._avg_price(self._head(fills, qty), qty, limit, True) * qty
+        return amount + self.fee(amount, True)
+
+    def fee(self, amount: float, is_buy: bool) -> float:
+        fee = max(amount * self.commission_rate, self.min_commission) + amount * self.transfer_fee
+        if not is_buy:
+            fee += amount * self.stamp_duty
+        return fee
+
+    def _reject(self, sym: str, reason: str) -> Fill:
+        self.rejected += 1
+        logger.warning("❌ 委托未成交 %s: %s", sym, reason)
+        return Fill(0, 0.0, 0.0, reason)
+
+    def stats(self) -> dict:
+        return {"books": len(self._books), "filled": self.filled, "partial": self.partial, "rejected": self.rejected}
+
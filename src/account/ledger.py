@@ -0,0 +1,257 @@
+# src/account/ledger.py
+"""
+列式账本：成交与资产曲线存于可扩容的 NumPy 结构化数组，回测结束后一次性向量化计算绩效
+
+- 追加为 O(1) 摊销（容量不足时按倍数扩容），不为每条记录创建 list / dict
+- 标的代码在账本内编号（symbol_id），成交数组只存整数编号
+- analytics() 用 bincount / cumsum / diff / maximum.accumulate 计算，不逐行循环
+- 时间戳 ts 为 epoch 秒；回放时应取行情时间（market_ts），按自然日计算夏普才有意义；
+  行情时间、自然日划分与显示时间统一按交易所时区（Asia/Shanghai，UTC+8），与运行机器的时区无关
+"""
+
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPE = np.dtype([
+    ("ts", "f8"), ("symbol_id", "i4"), ("side", "i1"),      # side: 1 买入 / -1 卖出
+    ("price", "f8"), ("qty", "i8"), ("fee", "f8"),
+])
+EQUITY_DTYPE = np.dtype([("ts", "f8"), ("cash", "f8"), ("equity", "f8")])
+
+BUY, SELL = 1, -1
+
+# 交易所时区（Asia/Shanghai，无夏令时，固定 UTC+8）
+EXCHANGE_TZ = datetime.timezone(datetime.timedelta(hours=8), "Asia/Shanghai")
+_EXCHANGE_OFFSET = 8 * 3600
+
+
+class _Table:
+    """可扩容结构化数组，data 为已写入部分的视图"""
+
+    def __init__(self, dtype: np.dtype, capacity: int):
+        self._buf = np.zeros(max(capacity, 16), dtype=dtype)
+        self.size = 0
+
+    def append(self, row: tuple) -> int:
+        if self.size == len(self._buf):
+            buf = np.zeros(len(self._buf) * 2, dtype=self._buf.dtype)
+            buf[:self.size] = self._buf
+            self._buf = buf
+        self._buf[self.size] = row
+        self.size += 1
+        return self.size - 1
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buf[:self.size]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class Ledger:
+    """
+    成交 / 资产曲线账本
+
+    - record_trade / record_equity：逐条追加
+    - trades / equity：结构化数组视图（列访问如 ledger.equity["equity"]）
+    - analytics()：分标的已实现 / 未实现盈亏、收益率、夏普、最大回撤、换手率
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._trades = _Table(TRADE_DTYPE, capacity)
+        self._equity = _Table(EQUITY_DTYPE, capacity)
+        self.symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+
+    # ---------------- 追加 ----------------
+    def symbol_id(self, symbol: str) -> int:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return sid
+
+    def record_trade(self, ts: float, symbol: str, side: int, price: float, qty: int, fee: float = 0.0) -> int:
+        return self._trades.append((ts, self.symbol_id(symbol), side, price, qty, fee))
+
+    def record_equity(self, ts: float, cash: float, equity: float) -> int:
+        return self._equity.append((ts, cash, equity))
+
+    @property
+    def trades(self) -> np.ndarray:
+        return self._trades.data
+
+    @property
+    def equity(self) -> np.ndarray:
+        return self._equity.data
+
+    # ---------------- 绩效 ----------------
+    def symbol_pnl(self, last_prices: Optional[dict] = None) -> pd.DataFrame:
+        """
+        分标的盈亏（移动平均成本法，适用于只做多）
+        - 成交按 (标的, 时间) 排序后分段累加持仓；买入按数量加权更新持仓均价，卖出不改变均价，持仓归零后重新起算
+        - 已实现 = Σ 卖出数量 × (卖出价 - 卖出前持仓均价) - 手续费
+        - 未实现 = 剩余持仓 × (最新价 - 持仓均价)，最新价缺失时取最后成交价
+        - 已实现 + 未实现 = 卖出金额 - 买入金额 + 持仓市值 - 手续费
+        """
+        t = self.trades
+        n = len(self.symbols)
+        order = np.lexsort((t["ts"], t["symbol_id"]))      # 同一时间戳保持记录顺序（lexsort 稳定）
+        t = t[order]
+        sid = t["symbol_id"]
+        qty = t["qty"].astype(np.float64)
+        buy = t["side"] == BUY
+        fees = np.bincount(sid, weights=t["fee"], minlength=n)
+
+        # 持仓：按标的分段累加
+        new_symbol = np.r_[True, sid[1:] != sid[:-1]] if len(t) else np.empty(0, dtype=bool)
+        position = _segment_cumsum(np.where(buy, qty, -qty), new_symbol)
+        before = position - np.where(buy, qty, -qty)
+
+        # 持仓从零开始到再次归零为一段，段内按移动平均成本结算卖出（卖出不改变均价）
+        episode = new_symbol | (before <= 0)
+        avg = _running_avg_cost(t["price"], qty, buy, episode)
+        avg_before = np.where(episode, 0.0, avg)
+        realized = np.bincount(sid, weights=np.where(buy, 0.0, qty * (t["price"] - avg_before)), minlength=n) - fees
+
+        last = np.full(n, np.nan)
+        final_position = np.zeros(n)
+        avg_cost = np.zeros(n)
+        if len(t):
+            last[sid] = t["price"]          # 同一标的多次成交时后写覆盖前写，即最后成交价
+            final_position[sid] = position
+            avg_cost[sid] = np.where(position > 0, avg, 0.0)
+        if last_prices:
+            for i, symbol in enumerate(self.symbols):
+                if symbol in last_prices:
+                    last[i] = last_prices[symbol]
+
+        unrealized = np.where(final_position != 0, final_position * (last - avg_cost), 0.0)
+        return pd.DataFrame({
+            "symbol": self.symbols, "position": final_position.astype(np.int64), "avg_cost": avg_cost,
+            "last_price": last, "realized": realized, "unrealized": unrealized,
+            "total": realized + unrealized, "fees": fees,
+        })
+
+    def analytics(self, last_prices: Optional[dict] = None, periods_per_year: int = 252,
+                  initial_equity: Optional[float] = None) -> dict:
+        """
+        一次性计算绩效指标（initial_equity 为期初资产，缺省取资产曲线首行）
+        - returns：逐条资产曲线收益率；daily_returns：按自然日取最后一条资产计算
+        - sharpe：日收益均值 / 标准差 × sqrt(periods_per_year)，不足两个交易日时为 nan
+        - max_drawdown：资产相对历史最高点的最大回撤（负数）
+        - turnover：成交总金额 / 平均资产
+        """
+        eq = self.equity
+        values, ts = eq["equity"], eq["ts"]
+        result = {
+            "trades": len(self.trades),
+            "symbol_pnl": self.symbol_pnl(last_prices),
+            "returns": np.diff(values) / values[:-1] if len(values) > 1 else np.empty(0),
+            "total_return": 0.0,
+            "sharpe": float("nan"),
+            "max_drawdown": 0.0,
+            "max_drawdown_ts": None,
+            "turnover": 0.0,
+        }
+        if not len(values):
+            return result
+
+        base = float(values[0] if initial_equity is None else initial_equity)
+        result["total_return"] = float(values[-1] / base - 1)
+        peak = np.maximum(np.maximum.accumulate(values), base)
+        drawdown = values / peak - 1
+        i = int(drawdown.argmin())
+        result["max_drawdown"] = float(drawdown[i])
+        result["max_drawdown_ts"] = float(ts[i]) if drawdown[i] < 0 else None
+
+        days = _exchange_days(ts)
+        day_end = np.r_[np.flatnonzero(np.diff(days)), len(days) - 1]
+        daily = values[day_end]
+        daily_returns = np.diff(daily) / daily[:-1]
+        result["daily_returns"] = daily_returns
+        if len(daily_returns) >= 2 and daily_returns.std(ddof=1) > 0:
+            result["sharpe"] = float(daily_returns.mean() / daily_returns.std(ddof=1) * np.sqrt(periods_per_year))
+
+        t = self.trades
+        result["turnover"] = float((t["price"] * t["qty"]).sum() / values.mean())
+        return result
+
+    # ---------------- 输出 ----------------
+    def trades_frame(self) -> pd.DataFrame:
+        t = self.trades
+        return pd.DataFrame({
+            "time": _format_ts(t["ts"]),
+            "action": np.where(t["side"] == BUY, "买入", "卖出"),
+            "symbol": np.asarray(self.symbols, dtype=object)[t["symbol_id"]] if len(t) else [],
+            "price": t["price"], "qty": t["qty"], "fee": t["fee"],
+        })
+
+    def equity_frame(self) -> pd.DataFrame:
+        eq = self.equity
+        return pd.DataFrame({"time": _format_ts(eq["ts"]), "cash": eq["cash"], "equity": eq["equity"]})
+
+
+def _segment_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """分段累加：starts 为真的位置开始新的一段"""
+    total = np.cumsum(values)
+    if not len(values):
+        return total
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(values)), 0))
+    return total - total[first] + values[first]
+
+
+def _running_avg_cost(price: np.ndarray, qty: np.ndarray, buy: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    每笔成交后的移动平均成本（starts 为真的位置持仓从零起算）
+    逐笔累加持仓数量与持仓成本：买入 cost += price × qty；卖出按均价扣减成本，均价不变。
+    卖出处即卖出前的均价（含平仓那一笔）
+    """
+    avg = np.zeros(len(price))
+    pos = cost = 0.0
+    for k, (p, q, is_buy, start) in enumerate(zip(price.tolist(), qty.tolist(), buy.tolist(), starts.tolist())):
+        if start:
+            pos = cost = 0.0
+        if is_buy:
+            pos += q
+            cost += p * q
+            avg[k] = cost / pos if pos > 0 else 0.0
+        else:
+            avg[k] = cost / pos if pos > 0 else 0.0
+            pos -= q
+            cost = avg[k] * pos
+    return avg
+
+
+_midnights: dict = {}
+
+
+def market_ts(md) -> Optional[float]:
+    """
+    行情时间（trade_date / TradeDate 为 YYYYMMDD，update_time / UpdateTime 为 HHMMSSsss，交易所时间）-> epoch 秒，
+    没有交易日时返回 None；交易日零点按日缓存，每条行情只做整数运算
+    """
+    day = md.get("trade_date") or md.get("TradeDate")
+    if not day:
+        return None
+    midnight = _midnights.get(day)
+    if midnight is None:
+        d = int(day)
+        midnight = _midnights[day] = datetime.datetime(d // 10000, d // 100 % 100, d % 100,
+                                                       tzinfo=EXCHANGE_TZ).timestamp()
+    t = int(md.get("update_time") or md.get("UpdateTime") or 0)
+    return midnight + t // 10_000_000 * 3600 + t // 100_000 % 100 * 60 + t % 100_000 / 1000
+
+
+def _exchange_days(ts: np.ndarray) -> np.ndarray:
+    """epoch 秒 -> 交易所时区自然日编号"""
+    return np.floor((ts + _EXCHANGE_OFFSET) / 86400).astype(np.int64)
+
+
+def _format_ts(ts: np.ndarray) -> np.ndarray:
+    """epoch 秒 -> 交易所时区时间字符串"""
+    return (pd.to_datetime(ts + _EXCHANGE_OFFSET, unit="s")).strftime("%Y-%m-%d %H:%M:%S").to_numpy()
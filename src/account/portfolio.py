@@ -0,0 +1,176 @@
+# src/account/portfolio.py
+"""
+多策略组合：每个策略一个子账户（AccountSimulator），按 STRATEGY_SIGNAL（启用风控时为 ORDER_SUBMIT）的 event.source 路由
+
+- 资金分配：allocations 中的值 ≤ 1 视为占 total_cash 的权重，> 1 视为金额；未配置的策略平分剩余资金
+- 行情只处理一次：撮合器（共用一个 FillSimulator，盘口缓存与成交扣减对所有子账户一致）更新一次，
+  再按 代码 -> 持有该代码的子账户 索引只给持仓账户增量估值，未持仓的子账户不处理该行情
+- 每个子账户自带列式账本（资产曲线只在该账户估值变化时追加）；组合总资产曲线记在 self.ledger，
+  时间戳均取行情时间（见 now()）
+- 汇总视图：exposure() 按标的汇总持仓 / 市值及各策略占比，summary() 按策略汇总资金与收益
+"""
+
+import time
+from typing import Optional
+
+import pandas as pd
+
+from src.account.account_simulator import AccountSimulator, ORDER_EVENTS
+from src.account.ledger import Ledger, market_ts
+from src.event_engine.event_type import EventType
+from utils.logger import get_logger
+
+logger = get_logger("Portfolio")
+
+
+class PortfolioEngine:
+    """多策略组合引擎（订阅 STRATEGY_SIGNAL 或 ORDER_SUBMIT / MARKET_SNAPSHOT，启用撮合模拟时还可订阅 ORDER_BOOK）"""
+
+    def __init__(self, strategies: list, total_cash: float = 1_000_000,
+                 allocations: Optional[dict] = None, fill_simulator=None, event_engine=None):
+        """
+        :param strategies: 策略名称列表（与策略发出信号时的 event.source 一致）
+        :param allocations: {策略名: 权重或金额}
+        :param fill_simulator: 共用的撮合模拟器，None 时按信号价成交
+        :param event_engine: 子账户发布 ORDER_FILLED 的事件引擎，None 表示不发布
+        """
+        self.total_cash = total_cash
+        self.fill_simulator = fill_simulator
+        self.accounts: dict[str, AccountSimulator] = {}
+        for name, cash in self._allocate(list(strategies), total_cash, allocations or {}).items():
+            self.accounts[name] = AccountSimulator(cash, fill_simulator=fill_simulator, name=name,
+                                                   event_engine=event_engine)
+        self.initial_cash = sum(a.initial_cash for a in self.accounts.values())
+        self.ledger = Ledger()
+        self._holders: dict[str, set] = {}        # 代码 -> 持有该代码的子账户
+        self._market_ts = None                    # 最近一条行情的时间（epoch 秒）
+        self.unrouted = 0
+
+    @staticmethod
+    def _allocate(strategies: list, total_cash: float, allocations: dict) -> dict:
+        cash = {}
+        for name in strategies:
+            value = allocations.get(name)
+            if value is not None:
+                cash[name] = total_cash * value if value <= 1 else float(value)
+        assigned = sum(cash.values())
+        if assigned > total_cash:
+            raise ValueError(f"❌ 策略资金分配合计 {assigned} 超过总资金 {total_cash}")
+        rest = [name for name in strategies if name not in cash]
+        for name in rest:
+            cash[name] = (total_cash - assigned) / len(rest)
+        return cash
+
+    def now(self) -> float:
+        """记账时间（子账户与组合资产曲线共用）：最近一条行情的时间，尚无带交易日的行情时为 time.time()"""
+        return self._market_ts or time.time()
+
+    # ========== 事件入口 ==========
+    def on_event(self, event):
+        self.on_events([event])
+
+    def on_events(self, events: list):
+        """批量入口：信号按来源路由到子账户；行情一次更新盘口缓存，只给持仓子账户估值，整批结束后统一记资产曲线"""
+        marked = set()          # 因行情估值变化的子账户（成交时子账户已自行记资产曲线）
+        filled = False
+        fill_simulator = self.fill_simulator
+        holders = self._holders
+        for event in events:
+            etype = event.type
+            if etype == EventType.MARKET_SNAPSHOT:
+                md = event.data
+                if fill_simulator is not None:
+                    fill_simulator.on_market(md)
+                self._market_ts = market_ts(md) or self._market_ts
+                sym, price = md.get("SecurityID"), md.get("TradePx")
+                if sym and price is not None:
+                    accounts = holders.get(sym)
+                    if accounts:
+                        for account in accounts:
+                            account._mark(sym, price)
+                        marked.update(accounts)
+            elif etype in ORDER_EVENTS:
+                account = self.accounts.get(event.source)
+                if account is None:
+                    self.unrouted += 1
+                    logger.warning("⚠️ 未配置子账户的策略信号，已忽略: source=%s", event.source)
+                    continue
+                sym = event.data["symbol"]
+                account._on_order_filled(event.data, self.now())
+                if account.position.get(sym, 0):
+                    holders.setdefault(sym, set()).add(account)
+                else:
+                    holders.get(sym, set()).discard(account)
+                filled = True
+            elif etype == EventType.ORDER_BOOK and fill_simulator is not None:
+                fill_simulator.on_market(event.data)
+
+        if marked or filled:
+            ts = self.now()
+            for account in marked:
+                account._snapshot(ts)
+            accounts = self.accounts.values()
+            self.ledger.record_equity(ts, sum(a.cash for a in accounts), sum(a.equity for a in accounts))
+
+    # ========== 汇总视图 ==========
+    @property
+    def cash(self) -> float:
+        return sum(a.cash for a in self.accounts.values())
+
+    @property
+    def equity(self) -> float:
+        return sum(a.equity for a in self.accounts.values())
+
+    def positions(self) -> dict:
+        """组合合计持仓 {代码: 数量}"""
+        total: dict[str, int] = {}
+        for sym, accounts in self._holders.items():
+            qty = sum(a.position.get(sym, 0) for a in accounts)
+            if qty:
+                total[sym] = qty
+        return total
+
+    def exposure(self) -> pd.DataFrame:
+        """按标的汇总：合计持仓、市值、占组合资产比例，以及各策略持仓数量（列名为策略名）"""
+        rows = []
+        for sym, accounts in self._holders.items():
+            if not accounts:
+                continue
+            row = {"symbol": sym, "position": 0, "market_value": 0.0}
+            for account in accounts:
+                qty = account.position.get(sym, 0)
+                row[account.name] = qty
+                row["position"] += qty
+                row["market_value"] += qty * account._last_prices.get(sym, 0)
+            rows.append(row)
+        df = pd.DataFrame(rows, columns=["symbol", "position", "market_value", *self.accounts])
+        df = df.fillna(0)
+        equity = self.equity
+        df.insert(3, "weight", df["market_value"] / equity if equity else 0.0)
+        return df.sort_values("market_value", ascending=False, ignore_index=True)
+
+    def summary(self) -> pd.DataFrame:
+        """按策略汇总：分配资金、现金、市值、总资产、收益率、持仓数、成交笔数"""
+        return pd.DataFrame([{
+            "strategy": name,
+            "allocated": a.initial_cash,
+            "cash": a.cash,
+            "market_value": a.market_value,
+            "equity": a.equity,
+            "return": a.equity / a.initial_cash - 1 if a.initial_cash else 0.0,
+            "positions": sum(1 for q in a.position.values() if q),
+            "trades": len(a.trades),
+        } for name, a in self.accounts.items()])
+
+    def report(self, periods_per_year: int = 252) -> dict:
+        """打印各策略汇总、组合敞口及组合绩效，返回 {策略名: 绩效, "portfolio": 组合绩效}"""
+        logger.info("🧩 [策略子账户]\n%s", self.summary().to_string(index=False))
+        exposure = self.exposure()
+        if len(exposure):
+            logger.info("📌 [组合敞口]\n%s", exposure.to_string(index=False))
+        stats = {name: a.ledger.analytics(a._last_prices, periods_per_year, a.initial_cash)
+                 for name, a in self.accounts.items()}
+        total = stats["portfolio"] = self.ledger.analytics(None, periods_per_year, self.initial_cash)
+        logger.info("📊 [组合绩效] 总收益 %.4f%% | 夏普 %.2f | 最大回撤 %.4f%%",
+                    total["total_return"] * 100, total["sharpe"], total["max_drawdown"] * 100)
+        return stats
@@ -1,16 +1,25 @@
 import os
 import time
+import numpy as np
 import pandas as pd
-from src.event_engine.event import Event
+from src.event_engine.event import event_pool
 from src.event_engine.event_type import EventType
 
 
+def _time_ms(update_time) -> np.ndarray:
+    """HHMMSSsss 时间数组 -> 当日毫秒数"""
+    t = np.asarray(update_time, dtype=np.int64)
+    return t // 10_000_000 * 3_600_000 + t // 100_000 % 100 * 60_000 + t % 100_000
+
+
 class DataPlayer:
     def __init__(self, event_engine, data_source="mock", config=None, delay=0.1):
         """
         :param event_engine: 事件引擎实例
-        :param data_source: 数据来源类型，可为 "mock"、"csv"、"local"
+        :param data_source: 数据来源类型，可为 "mock"、"csv"、"local"、"journal"（原始行情日志）
         :param config: 数据配置（文件路径、字段映射等）
+                       csv: path；speed 不设置时每行间隔 delay 秒，0 尽快回放，1 按 UpdateTime 实时，N 为 N 倍速；
+                            chunk_size 每批构造的行数
         :param delay: 每条数据之间的时间间隔，控制回放节奏
         """
         self.event_engine = event_engine
@@ -19,12 +28,16 @@ class DataPlayer:
         self.delay = delay
 
     def start(self):
+        """在调用线程中回放（该线程绑定为事件队列生产者）"""
+        self.event_engine.bind_producer()
         if self.data_source == "mock":
             self._play_mock()
         elif self.data_source == "csv":
             self._play_csv()
         elif self.data_source == "local":
             self._play_local()
+        elif self.data_source == "journal":
+            self._play_journal()
         else:
             raise ValueError(f"❌ 不支持的数据源类型: {self.data_source}")
 
@@ -54,33 +67,132 @@ class DataPlayer:
             time.sleep(self.delay)
 
     def _play_csv(self):
+        """
+        CSV 快照回放
+        - 读入后一次性转成按列的 Python 列表，按 chunk_size 分批 zip 成字典发布（不逐行 iterrows / to_dict）
+        - 时钟：speed 未设置时每行 sleep(delay)（兼容旧行为）；0 尽快回放；
+          >0 按 UpdateTime 间隔 / speed 控制节奏，同一时刻的行一起发布
+        """
         path = self.config.get("path")
         if not path or not os.path.exists(path):
             print(f"❌ CSV 文件未找到: {path}")
             return
 
         print(f"📄 从 CSV 文件回放: {path}")
-        df = pd.read_csv(path)
-        for _, row in df.iterrows():
-            record = row.to_dict()
-            self._push_snapshot_event(record)
-            time.sleep(self.delay)
+        df = pd.read_csv(path, dtype={"SecurityID": str})
+        if df.empty:
+            print("⚠️ CSV 文件为空")
+            return
+        speed = self.config.get("speed")
+        chunk_size = max(int(self.config.get("chunk_size", 1000)), 1)
+        if speed and "UpdateTime" not in df.columns:
+            print("⚠️ CSV 缺少 UpdateTime 列，改为尽快回放")
+            speed = 0
+
+        columns = df.columns.tolist()
+        arrays = [df[c].tolist() for c in columns]
+        n = len(df)
+        t0 = time.perf_counter()
+        if speed is None:
+            for i in range(n):
+                self._push_rows(columns, arrays, i, i + 1)
+                time.sleep(self.delay)
+        elif not speed:
+            for start in range(0, n, chunk_size):
+                self._push_rows(columns, arrays, start, start + chunk_size)
+        else:
+            # 距首行的回放时刻（ns）；跨日或乱序时不回退
+            due = np.maximum.accumulate(_time_ms(df["UpdateTime"].to_numpy()))
+            due = ((due - due[0]) * (1_000_000 / speed)).astype(np.int64)
+            bounds = np.flatnonzero(np.diff(due)) + 1
+            start_ns = time.perf_counter_ns()
+            for start, end in zip(np.r_[0, bounds].tolist(), np.r_[bounds, n].tolist()):
+                wait = due[start] - (time.perf_counter_ns() - start_ns)
+                if wait > 0:
+                    time.sleep(wait / 1e9)
+                for s in range(start, end, chunk_size):
+                    self._push_rows(columns, arrays, s, min(s + chunk_size, end))
+        elapsed = time.perf_counter() - t0
+        print(f"✅ CSV 回放完成: {n} 行, {elapsed:.2f} 秒, {n / max(elapsed, 1e-9):,.0f} 行/秒")
+
+    def _push_rows(self, columns: list, arrays: list, start: int, end: int):
+        put, acquire = self.event_engine.put, event_pool.acquire
+        snapshot = EventType.MARKET_SNAPSHOT
+        for values in zip(*[a[start:end] for a in arrays]):
+            put(acquire(snapshot, dict(zip(columns, values)), "DataPlayer"))
 
     def _play_local(self):
-        print("📦 本地历史数据播放未实现，请接入 DataLoader 后支持")
-        # 可以调用已有的 data_loader.py 加载数据
-        # 举例：
-        # from src.data_loader import load_snapshot_data
-        # df = load_snapshot_data(...)
-        pass
+        """
+        本地多标的回放：DataLoader.stream_symbols 并行分块读取 <path>/<symbol>.csv，
+        按 (TradeDate, UpdateTime) 堆归并后逐行发布，内存占用只与标的数 × chunk_size 有关
+        - config: path 数据目录；symbols 标的列表（默认目录下全部）；chunk_size；max_workers；
+          speed 0 / 未设置尽快回放，>0 按 UpdateTime 间隔 / speed 控制节奏
+        """
+        from src.data_loader import DataLoader
+
+        path = self.config.get("path")
+        if not path or not os.path.isdir(path):
+            print(f"❌ 本地数据目录未找到: {path}")
+            return
+
+        loader = DataLoader(path)
+        rows = loader.stream_symbols(self.config.get("symbols"),
+                                     chunk_size=self.config.get("chunk_size", 5000),
+                                     max_workers=self.config.get("max_workers", 8))
+        speed = self.config.get("speed") or 0
+        put, acquire = self.event_engine.put, event_pool.acquire
+        snapshot = EventType.MARKET_SNAPSHOT
+        print(f"📦 从本地目录回放: {path}")
+
+        count = 0
+        t0 = time.perf_counter()
+        first_ms = last_ms = None
+        for row in rows:
+            if speed > 0:
+                ms = int(_time_ms(row["UpdateTime"]))
+                if first_ms is None:
+                    first_ms = last_ms = ms
+                if ms > last_ms:
+                    last_ms = ms
+                    wait = (ms - first_ms) / 1000 / speed - (time.perf_counter() - t0)
+                    if wait > 0:
+                        time.sleep(wait)
+            put(acquire(snapshot, row, "DataPlayer"))
+            count += 1
+        elapsed = time.perf_counter() - t0
+        print(f"✅ 本地回放完成: {count} 行, {elapsed:.2f} 秒, {count / max(elapsed, 1e-9):,.0f} 行/秒")
+
+    def _play_journal(self):
+        """
+        回放原始行情日志（QuantClient journal 参数录制）：原始字节经 MdsMsgDispatcher 派发给真实的 MdsSpiHandler，
+        与实盘走同一套解码 / 事件发布逻辑，不连接行情服务器
+        - config: path 日志路径；speed 0 尽快回放 / 1 实时 / N 倍速；copy_args 同实盘；spi 为 MdsSpiHandler 的其余参数
+        """
+        path = self.config.get("path")
+        if not path or not os.path.exists(path):
+            print(f"❌ 原始行情日志未找到: {path}")
+            return
+
+        from src.spi.mds_spi_handler import MdsSpiHandler
+        from quote_api.c_api_wrapper import MdsMsgDispatcher
+        from src.record.raw_journal import RawJournalReader
+
+        spi = MdsSpiHandler(strategy_group=[], event_engine=self.event_engine, **(self.config.get("spi") or {}))
+        dispatcher = MdsMsgDispatcher(spi, self.config.get("copy_args", True))
+        reader = RawJournalReader(path)
+        print(f"📼 从原始行情日志回放: {path}")
+        try:
+            t0 = time.perf_counter()
+            count = reader.replay(dispatcher, speed=self.config.get("speed", 0))
+            elapsed = time.perf_counter() - t0
+            print(f"✅ 回放完成: {count} 条消息, {elapsed:.2f} 秒, {count / max(elapsed, 1e-9):,.0f} 条/秒")
+        finally:
+            reader.close()
+            if spi.tick_gap_tracker is not None:
+                spi.tick_gap_tracker.stop()
 
     def _push_snapshot_event(self, data: dict):
-        event = Event(
-            type_=EventType.MARKET_SNAPSHOT,
-            data=data,
-            source="DataPlayer"
-        )
-        self.event_engine.put(event)
+        self.event_engine.put(event_pool.acquire(EventType.MARKET_SNAPSHOT, data, "DataPlayer"))
 
     def load_ohlc(self):
         """未来扩展：加载 OHLC 数据接口"""
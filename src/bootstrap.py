@@ -1,14 +1,20 @@
 from pathlib import Path
-import time
 import yaml
 
 from utils.logger import get_logger
 from src.event_engine.event_engine import EventEngine
 from src.event_engine.event_type import EventType
+from src.event_engine.logging_handler import log_event_handler
 from src.client import QuantClient
 from src.strategy_loader import load_strategies_from_yaml
 from src.account.account_simulator import AccountSimulator
+from src.account.fill_simulator import FillSimulator
+from src.account.portfolio import PortfolioEngine
+from src.risk.risk_engine import PreTradeRiskEngine
 from src.record.signal_recorder import SignalRecorder
+from src.market.order_book import OrderBookManager
+from src.data_handler import MarketDataSaver
+from src.monitor.latency import latency_tracker
 
 
 def main() -> None:
@@ -23,45 +29,151 @@ def main() -> None:
     logger = get_logger("Quant", log_level, log_file)
     logger.info("🚀 Quant 启动 | run_mode=%s | log_level=%s", run_mode, log_level)
 
+    # ── 延迟统计 ─────────────────────────────
+    latency_cfg = settings.get("latency", {}) or {}
+    latency_tracker.enable(latency_cfg.get("enabled", False))
+
     # ── 事件引擎 ─────────────────────────────
-    ee = EventEngine("main")
+    ee_cfg = settings.get("event_engine", {}) or {}
+    ee = EventEngine(
+        "main",
+        workers=ee_cfg.get("workers", 1),
+        batch_size=ee_cfg.get("batch_size", 1),
+        batch_budget_us=ee_cfg.get("batch_budget_us", 0),
+        queue_type=ee_cfg.get("queue", "fifo"),
+        queue_options=ee_cfg.get("queue_options"),
+        recycle_events=ee_cfg.get("recycle_events", False),
+        profile=ee_cfg.get("profile", False),
+        slow_handler_ms=ee_cfg.get("slow_handler_ms", 0),
+        slow_handler_event=EventType[ee_cfg.get("slow_handler_event", "LOG_EVENT")],
+    )
     ee.start()
 
     # ── 账户 & 记录器 ───────────────────────
-    account  = AccountSimulator()
+    # 账户 / 组合 / 风控 / 记录器 / 策略持有跨标的状态，以 serial=True 注册，分片模式下加锁串行调用
+    account_cfg = settings.get("account", {}) or {}
+    fill_cfg = dict(account_cfg.get("fill_simulation") or {})
+    fill_simulator = FillSimulator(**fill_cfg) if fill_cfg.pop("enabled", False) else None
+    strategies = load_strategies_from_yaml(cfg_dir / "strategy.yaml", ee)
+
+    # 事前风控：启用后策略信号先经风控，账户只处理放行的 ORDER_SUBMIT，风控按账户的 ORDER_FILLED 对账持仓
+    risk_cfg = yaml.safe_load(open(cfg_dir / "risk.yaml", encoding="utf-8")) or {}
+    risk = None
+    order_event = EventType.STRATEGY_SIGNAL
+    if risk_cfg.get("enabled", False):
+        risk = PreTradeRiskEngine(ee, risk_cfg)
+        ee.register_batch(EventType.MARKET_SNAPSHOT, risk.on_events, serial=True)
+        ee.register_batch(EventType.STRATEGY_SIGNAL, risk.on_events, serial=True)
+        ee.register_batch(EventType.ORDER_FILLED, risk.on_events, serial=True)
+        order_event = EventType.ORDER_SUBMIT
+
+    portfolio_cfg = settings.get("portfolio", {}) or {}
+    if portfolio_cfg.get("enabled", False):
+        # 每个策略一个子账户，信号按 event.source 路由
+        account = PortfolioEngine(
+            [st.name for st in strategies],
+            total_cash=portfolio_cfg.get("total_cash", account_cfg.get("initial_cash", 1_000_000)),
+            allocations=portfolio_cfg.get("allocations"),
+            fill_simulator=fill_simulator,
+            event_engine=ee if risk is not None else None,
+        )
+        ee.register_batch(order_event, account.on_events, serial=True)
+    else:
+        account = AccountSimulator(account_cfg.get("initial_cash", 1_000_000), fill_simulator=fill_simulator,
+                                   event_engine=ee if risk is not None else None)
+        ee.register(order_event, account.on_event, serial=True)
     recorder = SignalRecorder(verbose=(log_level in ("DEBUG", "INFO")))
 
-    ee.register(EventType.STRATEGY_SIGNAL, account.on_event)
-    ee.register(EventType.MARKET_SNAPSHOT, account.on_event)
-    ee.register(EventType.STRATEGY_SIGNAL, recorder.on_event)
+    ee.register_batch(EventType.MARKET_SNAPSHOT, account.on_events, serial=True)
+    ee.register_batch(EventType.STRATEGY_SIGNAL, recorder.on_events, serial=True)
+    ee.register(EventType.LOG_EVENT, log_event_handler)
+    ee.register(EventType.RISK_ALERT, log_event_handler)
 
-    # ── 加载策略 ───────────────────────────
-    strategies = load_strategies_from_yaml(cfg_dir / "strategy.yaml", ee)
+    # ── 逐笔委托簿重建 ─────────────────────
+    market_cfg = settings.get("market", {}) or {}
+    book_cfg = market_cfg.get("order_book", {}) or {}
+    books = None
+    if book_cfg.get("enabled", False):
+        books = OrderBookManager(ee, depth=book_cfg.get("depth", 10), price_tick=book_cfg.get("price_tick", 100))
+        books.register()
+        if fill_simulator is not None:
+            ee.register_batch(EventType.ORDER_BOOK, account.on_events, serial=True)
+
+    # ── 策略订阅行情 ─────────────────────────
     for st in strategies:
-        ee.register(EventType.MARKET_SNAPSHOT, st.on_event)
+        ee.register(EventType.MARKET_SNAPSHOT, st.on_event, serial=True)
 
     # ── 启动数据源 ─────────────────────────
+    saver = None
     if run_mode == "realtime":
+        if settings.get("save_snapshot", False):
+            saver = MarketDataSaver(
+                compress=True,
+                root_dir=cfg_dir.parent / settings.get("snapshot_dir", "data/snapshot"),
+                backend=settings.get("snapshot_format", "csv"),
+            )
+            ee.register_batch(EventType.MARKET_SNAPSHOT, saver.on_events, serial=True)
+            if saver.store is not None:
+                ee.register_batch(EventType.MARKET_TICK, saver.on_events, serial=True)
+
+        tick_gap = dict(market_cfg.get("tick_gap") or {})
+        tick_gap = tick_gap if tick_gap.pop("enabled", False) else None
         qc = QuantClient(
             config_file=cfg_dir / "config_file.ini",
             strategies=strategies,
             subscribe_codes=[],
-            subscribe_config=yaml.safe_load(open(cfg_dir / "subscribe.yaml", encoding="utf-8"))
+            subscribe_config=yaml.safe_load(open(cfg_dir / "subscribe.yaml", encoding="utf-8")),
+            event_engine=ee,
+            copy_args=market_cfg.get("copy_args", True),
+            snapshot_view=market_cfg.get("snapshot_view", False),
+            snapshot_columns=market_cfg.get("snapshot_columns", 0),
+            tick_gap=tick_gap,
+            journal=market_cfg.get("journal") or None,
         )
         qc.start()
         logger.info("✅ 实时行情启动完成")
 
     else:  # backtest / replay
         from src.backtest.data_player import DataPlayer
-        player = DataPlayer(event_engine=ee, data_source="mock", delay=0.1)
+        replay_cfg = settings.get("replay", {}) or {}
+        player = DataPlayer(event_engine=ee, data_source=replay_cfg.get("source", "mock"),
+                            config=replay_cfg, delay=0.1)
         player.start()
-        logger.info("✅ 数据回放开始")
-        time.sleep(2)
+        logger.info("✅ 数据回放结束，等待事件队列排空")
 
     # ── 停止并输出结果 ─────────────────────
-    ee.stop()
-    account.print_history()
-    account.print_trades()
+    # 回放在本线程同步完成，停止前先排空队列，已投递的行情 / 信号 / 成交都处理完
+    ee.stop(drain=run_mode != "realtime")
+    if saver is not None:
+        saver.close()
+    for qs in ee.queue_stats():
+        logger.info("📊 事件队列 %s", qs)
+    if ee.profile:
+        ee.print_handler_stats()
+    if books is not None:
+        logger.info("📚 委托簿重建 %s", books.stats())
+    if run_mode == "realtime" and qc.journal is not None:
+        qc.journal.close()
+        logger.info("📼 原始行情日志 %s", qc.journal.stats())
+    if run_mode == "realtime" and qc.spi.tick_gap_tracker is not None:
+        qc.spi.tick_gap_tracker.stop()
+        qc.spi.tick_gap_tracker.report()
+    if latency_tracker.enabled:
+        latency_tracker.report()
+        if latency_cfg.get("csv"):
+            latency_tracker.to_csv(latency_cfg["csv"])
+    if isinstance(account, PortfolioEngine):
+        for sub in account.accounts.values():
+            sub.print_trades()
+        account.report()
+    else:
+        account.print_history()
+        account.print_trades()
+        account.report()
+    if risk is not None:
+        risk.report()
+    if fill_simulator is not None:
+        logger.info("🧮 撮合模拟 %s", fill_simulator.stats())
     recorder.print_signals()
 
 
@@ -1,5 +1,6 @@
 from vendor_api.quote_api.mds_api import MdsClientApi
 from src.spi.mds_spi_handler import MdsSpiHandler
+from src.record.raw_journal import RawJournalWriter
 from pathlib import Path
 from typing import List, Optional
 
@@ -11,8 +12,24 @@ class QuantClient:
         strategies: List,
         subscribe_codes: Optional[list[str]] = None,
         subscribe_config: Optional[dict] = None,
-        event_engine=None                # ⭐ 新增
+        event_engine=None,               # ⭐ 新增
+        copy_args=True,
+        snapshot_view: bool = False,
+        snapshot_columns: int = 0,
+        tick_gap: Optional[dict] = None,
+        journal: Optional[str] = None
     ) -> None:
+        """
+        :param copy_args: 行情回调参数复制方式：True 整体复制 / "pool" 仅复制有效成员到可回收缓冲池 /
+                          False 不复制（数据须在回调内立即取用）
+        :param snapshot_view: L2 快照以只读视图发布；copy_args=False 时不安全，自动退回字典
+        :param snapshot_columns: >0 时 L2 快照拷贝进该行数的 NumPy 列式缓存发布（优先于 snapshot_view）
+        :param tick_gap: 逐笔缺口检测 / 自动重传配置（见 MdsSpiHandler），None 表示关闭
+        :param journal: 原始行情日志路径，非空时按原始字节记录所有行情消息（见 src/record/raw_journal.py）
+        """
+        if snapshot_view and not copy_args:
+            print("⚠️ copy_args=False 时快照视图会读到被覆盖的数据，已改用字典发布")
+            snapshot_view = False
 
         self.config_path = str(Path(config_file).resolve())
         self.strategies = strategies
@@ -24,7 +41,10 @@ class QuantClient:
             strategy_group=self.strategies,
             subscribe_codes=subscribe_codes or [],
             subscribe_config=subscribe_config or {},
-            event_engine=self.event_engine
+            event_engine=self.event_engine,
+            snapshot_view=snapshot_view,
+            snapshot_columns=snapshot_columns,
+            tick_gap=tick_gap
         )
 
         # 创建 API 上下文
@@ -35,11 +55,18 @@ class QuantClient:
 
         self.channel = self.api.add_channel_from_file(
             mds_client_spi=self.spi,
-            config_file=self.config_path
+            config_file=self.config_path,
+            copy_args=copy_args
         )
         if not self.channel:
             raise RuntimeError("❌ 无法连接行情服务器")
 
+        self.journal = None
+        if journal:
+            self.journal = RawJournalWriter(journal)
+            self.api.set_mkt_data_journal(self.journal)
+            print(f"📼 原始行情日志: {self.journal.path}")
+
     # 启动
     def start(self):
         print("🚀 启动行情接收器 ...")
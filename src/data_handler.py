@@ -1,32 +1,221 @@
 from pathlib import Path
 from datetime import datetime
+from collections import OrderedDict, deque
 import csv
 import gzip
+import threading
+
+from utils.logger import get_logger
+from src.event_engine.event_type import EventType
+
+logger = get_logger("DataSaver")
+
 
 class MarketDataSaver:
-    def __init__(self, compress=False):
+    """
+    行情落盘
+    - backend="csv"：快照写入 data/snapshot/<代码>/<交易日>.csv[.gz]（只记录快照）
+    - backend="parquet"：快照与逐笔写入分区 Parquet（见 src/record/tick_store.py，需 pyarrow）
+
+    - save_snapshot() / save_tick() 只把行追加到内存队列（deque.append 在 GIL 下原子），不在行情线程上做任何 IO
+    - 后台写线程在积压达到 flush_rows 或每隔 flush_interval 秒批量写出：
+      按 (代码, 交易日) 分组，每个文件保持一个打开的句柄和 DictWriter，一次 writerows，只刷新本批写过的文件
+    - 打开的句柄按 LRU 最多保留 max_open_files 个，被淘汰的文件再次写入时以追加方式重新打开
+      （gzip 追加为多成员文件，gzip / pandas 可直接读取）
+    - 积压超过 max_buffer 行时丢弃新行并计数，避免磁盘过慢拖垮内存
+    - close() 停止写线程、写出剩余数据并关闭所有文件
+    """
+
+    def __init__(self, compress=False, root_dir=None, flush_rows: int = 1000,
+                 flush_interval: float = 1.0, max_buffer: int = 1_000_000,
+                 max_open_files: int = 512, compresslevel: int = 6,
+                 backend: str = "csv", store_options=None):
+        """
+        :param backend: "csv" / "parquet"
+        :param store_options: parquet 时传给 ParquetTickStore 的参数（compression、roll_interval 等）
+        """
         project_root = Path(__file__).resolve().parent.parent
-        self.root_dir = project_root / "data" / "snapshot"
+        self.root_dir = Path(root_dir) if root_dir else project_root / "data" / "snapshot"
         self.compress = compress
         self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_open_files = max_open_files
+        self.compresslevel = compresslevel
+        self.backend = backend
+        self.store = None
+        if backend == "parquet":
+            from src.record.tick_store import ParquetTickStore
+            self.store = ParquetTickStore(self.root_dir, **(store_options or {}))
+        elif backend != "csv":
+            raise ValueError(f"❌ 不支持的落盘格式: {backend}")
+
+        self._buffer: deque = deque()
+        self._files: OrderedDict = OrderedDict()   # (代码, 交易日) -> (文件, DictWriter)
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
 
-    def save_snapshot(self, data: dict):
-        code = data.get("SecurityID")
-        if not code:
+        self.saved = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    # ---------------- 写入入口 ----------------
+    def save_snapshot(self, data):
+        """追加一条快照（字典，或带 to_dict() 的 SnapshotView / SnapshotRow）"""
+        if not isinstance(data, dict):
+            data = data.to_dict()
+        self._append("snapshot", data)
+
+    def save_tick(self, data: dict):
+        """追加一条逐笔（MARKET_TICK 数据字典，kind 为 trade / order）；仅 parquet 格式记录"""
+        if self.store is not None:
+            self._append(data["kind"], data)
+
+    def _append(self, kind: str, data: dict):
+        if self._closed or not data.get("SecurityID"):
             return
+        buffer = self._buffer
+        if len(buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        buffer.append((kind, data))
+        if self._thread is None:
+            self._start()
+        if len(buffer) >= self.flush_rows:
+            self._wakeup.set()
+
+    def on_events(self, events: list):
+        """EventEngine 批量回调入口（MARKET_SNAPSHOT / MARKET_TICK）"""
+        for event in events:
+            if event.type == EventType.MARKET_TICK:
+                self.save_tick(event.data)
+            else:
+                self.save_snapshot(event.data)
 
-        today = datetime.now().strftime("%Y%m%d")
-        filename = f"{today}.csv.gz" if self.compress else f"{today}.csv"
+    # ---------------- 写线程 ----------------
+    def _start(self):
+        with self._write_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="MarketDataSaver", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """写出当前积压的所有行（写线程定期调用，也可手动调用）"""
+        with self._write_lock:
+            buffer = self._buffer
+            n = len(buffer)
+            if not n:
+                return
+            rows = [buffer.popleft() for _ in range(n)]
+            if self.store is not None:
+                self._write_store(rows)
+            else:
+                self._write_csv(rows)
+            self.saved += n
+            self.flushes += 1
+
+    def _write_store(self, rows: list):
+        kinds: dict = {}
+        for kind, data in rows:
+            kinds.setdefault(kind, []).append(data)
+        for kind, group in kinds.items():
+            try:
+                self.store.write(kind, group)
+            except Exception as e:
+                logger.error("❌ 写入 %s 行情失败: %s", kind, e)
+        self.store.flush()
+
+    def _write_csv(self, rows: list):
+        groups: dict = {}
+        today = None
+        for _, data in rows:
+            day = data.get("trade_date")
+            if not day:
+                today = today or datetime.now().strftime("%Y%m%d")
+                day = today
+            groups.setdefault((data["SecurityID"], str(day)), []).append(data)
+
+        for key, group in groups.items():
+            try:
+                self._writer(key, group[0]).writerows(group)
+            except Exception as e:
+                logger.error("❌ 写入快照失败 %s: %s", key, e)
+        # 只刷新本批写过的文件（未写入的句柄没有待刷新的数据；gzip 每次 flush 都会截断压缩块），
+        # 被 LRU 淘汰的文件关闭时已写出，close() 关闭全部文件
+        for key in groups:
+            entry = self._files.get(key)
+            if entry is not None:
+                entry[0].flush()
+
+    def _writer(self, key, first_row: dict) -> csv.DictWriter:
+        entry = self._files.get(key)
+        if entry is not None:
+            self._files.move_to_end(key)
+            return entry[1]
+
+        code, day = key
+        filename = f"{day}.csv.gz" if self.compress else f"{day}.csv"
         path = self.root_dir / code / filename
         path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not path.exists() or path.stat().st_size == 0
+        if self.compress:
+            f = gzip.open(path, mode="at", newline="", encoding="utf-8", compresslevel=self.compresslevel)
+        else:
+            f = open(path, mode="a", newline="", encoding="utf-8")
+
+        if is_new:
+            fieldnames = list(first_row.keys())
+        else:
+            fieldnames = self._read_header(path) or list(first_row.keys())
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        if is_new:
+            writer.writeheader()
 
-        file_exists = path.exists()
+        self._files[key] = (f, writer)
+        while len(self._files) > self.max_open_files:
+            _, (old, _) = self._files.popitem(last=False)
+            old.close()
+        return writer
+
+    def _read_header(self, path: Path):
         open_fn = gzip.open if self.compress else open
+        try:
+            with open_fn(path, mode="rt", newline="", encoding="utf-8") as f:
+                return next(csv.reader(f), None)
+        except (OSError, EOFError):
+            return None
 
-        with open_fn(path, mode="at", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=data.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(data)
+    # ---------------- 关闭 ----------------
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            for f, _ in self._files.values():
+                f.close()
+            self._files.clear()
+            if self.store is not None:
+                self.store.close()
+        logger.info("💾 快照落盘完成 | 写入 %d 行, 丢弃 %d 行, 批次 %d", self.saved, self.dropped, self.flushes)
 
-        print(f"💾 已保存快照至 {path}")
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._buffer),
+            "saved": self.saved,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "open_files": len(self._files),
+        }
@@ -1,6 +1,9 @@
+import heapq
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Union, Optional, Sequence
+
 import pandas as pd
-from typing import Union, Optional
 
 
 class DataLoader:
@@ -39,6 +42,117 @@ class DataLoader:
         df = pd.read_csv(file_path)
         return self._standardize_columns(df)
 
+    def list_symbols(self) -> list[str]:
+        """本地数据目录中的全部标的（<symbol>.csv 文件名）"""
+        return sorted(name[:-4] for name in os.listdir(self.data_path) if name.endswith(".csv"))
+
+    def stream_symbols(self, symbols: Optional[Sequence[str]] = None, chunk_size: int = 5000,
+                       max_workers: int = 8) -> Iterator[dict]:
+        """
+        多标的按 (TradeDate, UpdateTime) 归并的惰性行流（每行一个字典，字段名已标准化）
+        - 每个标的文件按 chunk_size 行分块读取，线程池提前读入下一块：各标的并行加载，
+          内存中每个标的最多保留两块，与全天总行数无关
+        - heapq.merge 做 k 路归并，同一时刻按标的顺序、文件内顺序输出（要求每个文件内已按时间排序）
+        :param symbols: 标的列表，None 表示目录下全部 <symbol>.csv
+        """
+        symbols = [str(s) for s in (symbols or self.list_symbols())]
+        for symbol in symbols:
+            if not os.path.isfile(os.path.join(self.data_path, f"{symbol}.csv")):
+                raise FileNotFoundError(f"找不到股票 {symbol} 的历史数据文件")
+        if not symbols:
+            return
+
+        readers = [self._open_symbol(symbol, chunk_size) for symbol in symbols]
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+                # 先为所有标的提交第一块，heapq.merge 取首行时各标的已在并行读取
+                streams = [self._chunk_rows(pool, k, reader) for k, reader in enumerate(readers)]
+                for item in heapq.merge(*streams):
+                    yield item[-1]
+        finally:
+            for reader in readers:
+                reader.close()
+
+    def _open_symbol(self, symbol: str, chunk_size: int):
+        return pd.read_csv(os.path.join(self.data_path, f"{symbol}.csv"),
+                           dtype={"SecurityID": str, "symbol": str}, chunksize=chunk_size)
+
+    def _chunk_rows(self, pool, k: int, reader) -> Iterator[tuple]:
+        future = pool.submit(self._next_chunk, k, reader, 0)
+
+        def rows():
+            nonlocal future
+            seq = 0
+            while True:
+                chunk = future.result()
+                if chunk is None:
+                    return
+                seq += len(chunk)
+                future = pool.submit(self._next_chunk, k, reader, seq)
+                yield from chunk
+
+        return rows()
+
+    def _next_chunk(self, k: int, reader, seq: int) -> Optional[list]:
+        """读下一块，转成 (交易日, 时间, 标的序号, 行序号, 行字典) 列表；读完返回 None"""
+        df = next(reader, None)
+        if df is None or df.empty:
+            return None
+        df = self._standardize_columns(df)
+        if "UpdateTime" not in df.columns:
+            raise ValueError("❌ 本地行情缺少 UpdateTime 列，无法按时间归并")
+        columns = df.columns.tolist()
+        n = len(df)
+        dates = df["TradeDate"].tolist() if "TradeDate" in df.columns else [0] * n
+        rows = [dict(zip(columns, values)) for values in zip(*[df[c].tolist() for c in columns])]
+        return list(zip(dates, df["UpdateTime"].tolist(), [k] * n, range(seq, seq + n), rows))
+
+    def load_ticks(self, kind: str = "snapshot",
+                   symbols: Optional[Sequence[str]] = None,
+                   start_date: Optional[int] = None, end_date: Optional[int] = None,
+                   start_time: Optional[int] = None, end_time: Optional[int] = None,
+                   columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        从 Parquet 行情存储（data_path 为存储根目录，见 src/record/tick_store.py）读取
+        - start_date / end_date：按 hive 分区（date=）裁剪，不打开无关文件
+        - symbols、start_time / end_time（HHMMSSsss，闭区间）：谓词下推，row group 内按 SecurityID 排序，
+          借助 row group 统计信息跳过不相关的数据块
+        - columns：列投影，只解码需要的列；分区列 date 也可选取
+        :param kind: snapshot / trade / order
+        :return: 按交易日、时间排序的 DataFrame（含所选列）
+        """
+        import pyarrow.dataset as ds
+        from src.record.tick_store import PARTITIONS, TIME_COLUMNS, arrow_schema
+
+        path = os.path.join(self.data_path, kind)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"找不到 {kind} 行情存储目录: {path}")
+
+        dataset = ds.dataset(path, format="parquet",
+                             partitioning=ds.partitioning(arrow_schema(PARTITIONS), flavor="hive"))
+        conditions = []
+        if symbols:
+            conditions.append(ds.field("SecurityID").isin([str(s) for s in symbols]))
+        if start_date is not None:
+            conditions.append(ds.field("date") >= int(start_date))
+        if end_date is not None:
+            conditions.append(ds.field("date") <= int(end_date))
+        time_col = TIME_COLUMNS[kind]
+        if start_time is not None:
+            conditions.append(ds.field(time_col) >= int(start_time))
+        if end_time is not None:
+            conditions.append(ds.field(time_col) <= int(end_time))
+
+        expr = None
+        for cond in conditions:
+            expr = cond if expr is None else expr & cond
+
+        df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+        order = [c for c in ("trade_date", time_col, "ApplSeqNum") if c in df.columns]
+        if order:
+            df = df.sort_values(order, kind="stable", ignore_index=True)
+        return df
+
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         统一字段名为内部格式（如 TradePx, TradeDate, UpdateTime）
@@ -0,0 +1,191 @@
+# src/event_engine/conflating_queue.py
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from .event_type import EventType
+
+
+class _Slot:
+    """某个标的当前待处理的最新行情快照（在队列中占一个位置）；被新快照取代后 event 置 None，出队时跳过"""
+    __slots__ = ("key", "event")
+
+    def __init__(self, key, event):
+        self.key = key
+        self.event = event
+
+
+class ConflatingQueue:
+    """
+    行情合并（conflation）事件队列：积压时同一标的只保留最新一条快照
+
+    - 可合并类型（默认仅 MARKET_SNAPSHOT）的事件按 (类型, 标的) 占一个槽位，
+      槽位尚未被取走时，新快照到达会丢弃旧快照并在队尾重新排队：合并只删除过时的快照，
+      不会把新快照提前到之前已排队的信号 / 成交前面（否则下游会先看到"未来"的行情）
+    - 逐笔成交 / 委托、策略信号、风控等其它事件从不合并，严格 FIFO
+    - maxsize 限制队列中的有效事件数；合并替换不增加有效事件数，队列满时仍可进行，
+      只有新增事件才会阻塞等待（超时抛出 queue.Full 并计数）。
+      被取代的旧槽位留在队列中、出队时跳过，数量超过有效事件数时整体压缩一次
+    - 注意：订阅 MARKET_SNAPSHOT 的策略同样只会看到合并后的快照
+    """
+
+    def __init__(self, maxsize: int = 100000, conflate_types: Optional[list] = None):
+        """
+        :param maxsize: 队列中最多的位置数，<=0 表示不限
+        :param conflate_types: 可合并的事件类型，可为 EventType 或其名称，默认 ["MARKET_SNAPSHOT"]
+        """
+        self.maxsize = maxsize
+        self._conflate = frozenset(
+            EventType[t] if isinstance(t, str) and t in EventType.__members__ else t
+            for t in (conflate_types or [EventType.MARKET_SNAPSHOT])
+        )
+        self._queue: deque = deque()
+        self._pending: dict = {}
+        self._size = 0          # 有效事件数（不含被取代的旧槽位）
+        self._stale = 0         # 队列中被取代、待跳过的旧槽位数
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+        # 统计
+        self.enqueued = 0
+        self.conflated = 0      # 被新快照替换掉的旧快照数
+        self.dropped = 0        # 队列满等待超时的事件数
+        self.high_water = 0
+
+    @staticmethod
+    def _symbol_of(event) -> Optional[str]:
+        get = getattr(event.data, "get", None)
+        if get is None:
+            return None
+        return get("SecurityID") or get("symbol")
+
+    # ---------------- 入队 ----------------
+    def put(self, event, block: bool = True, timeout: float = None):
+        key = None
+        if event.type in self._conflate:
+            symbol = self._symbol_of(event)
+            if symbol is not None:
+                key = (event.type, symbol)
+
+        with self._mutex:
+            self.enqueued += 1
+            if key is not None:
+                slot = self._pending.get(key)
+                if slot is not None:
+                    stale, slot.event = slot.event, None
+                    self.conflated += 1
+                    self._stale += 1
+                    self._discard(stale)
+                    slot = self._pending[key] = _Slot(key, event)
+                    self._queue.append(slot)
+                    if self._stale > self._size and self._stale >= 64:
+                        self._compact()
+                    return
+            self._wait_for_space(block, timeout)
+            if key is not None:
+                slot = self._pending[key] = _Slot(key, event)
+                self._queue.append(slot)
+            else:
+                self._queue.append(event)
+            self._size += 1
+            if self._size > self.high_water:
+                self.high_water = self._size
+            self._not_empty.notify()
+
+    def put_nowait(self, event):
+        self.put(event, block=False)
+
+    def _wait_for_space(self, block: bool, timeout: float):
+        """等待队列有空位（调用方持有锁）"""
+        if self.maxsize <= 0 or self._size < self.maxsize:
+            return
+        if not block:
+            self.dropped += 1
+            raise queue.Full
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._size >= self.maxsize:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self.dropped += 1
+                raise queue.Full
+            self._not_full.wait(remaining)
+
+    @staticmethod
+    def _discard(event):
+        """被合并掉的快照从未分发，可直接归还对象池"""
+        pool = getattr(event, "_pool", None)
+        if pool is not None:
+            pool.release(event)
+
+    def _compact(self):
+        """丢弃队列中被取代的旧槽位（调用方持有锁）；仅在旧槽位多于有效事件时执行，均摊 O(1)"""
+        self._queue = deque(item for item in self._queue if type(item) is not _Slot or item.event is not None)
+        self._stale = 0
+
+    # ---------------- 出队 ----------------
+    def _pop(self):
+        while True:
+            item = self._queue.popleft()
+            if type(item) is _Slot:
+                if item.event is None:
+                    self._stale -= 1
+                    continue
+                del self._pending[item.key]
+                self._size -= 1
+                return item.event
+            self._size -= 1
+            return item
+
+    def _wait(self, block: bool, timeout: float):
+        """等待直到有事件（调用方持有锁）"""
+        if self._size:
+            return
+        if not block:
+            raise queue.Empty
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._size:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            self._not_empty.wait(remaining)
+
+    def get(self, block: bool = True, timeout: float = None):
+        with self._not_empty:
+            self._wait(block, timeout)
+            item = self._pop()
+            self._not_full.notify()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get_many(self, max_items: int, timeout: float = None) -> list:
+        """取出至多 max_items 个事件；为空时最多等待 timeout 秒"""
+        with self._not_empty:
+            self._wait(True, timeout)
+            items = [self._pop() for _ in range(min(max_items, self._size))]
+            self._not_full.notify(len(items))
+            return items
+
+    # ---------------- 统计 ----------------
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return not self._size
+
+    def stats(self) -> dict:
+        with self._mutex:
+            return {
+                "maxsize": self.maxsize,
+                "depth": self._size,
+                "pending_symbols": len(self._pending),
+                "high_water": self.high_water,
+                "enqueued": self.enqueued,
+                "conflated": self.conflated,
+                "dropped": self.dropped,
+            }
@@ -2,12 +2,88 @@
 
 import time
 
+# perf_counter_ns -> 墙钟纳秒的固定偏移（进程启动时校准一次）
+_WALL_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class _EventExtra:
+    """Event 的低频字段，只在首次写入时分配，行情热路径上的事件不携带"""
+    __slots__ = ("ts_ns", "enq_ns", "origin_ns")
+
+    def __init__(self):
+        self.ts_ns = None
+        self.enq_ns = 0
+        self.origin_ns = None
+
+
 class Event:
-    def __init__(self, type_, data=None, timestamp=None, source=None):
+    """
+    事件对象（__slots__，无实例 __dict__）
+    - recv_ns: 单调时钟接收时间戳（time.perf_counter_ns()），用于延迟统计
+    - ts_ns: 显式指定的墙钟时间戳（纳秒）；未指定时由 recv_ns 加固定偏移换算，
+             每个事件只读一次时钟
+    - timestamp: 以秒为单位的墙钟时间，兼容旧代码
+    - enq_ns: 投递进 EventEngine 队列的时间（仅开启延迟统计时记录）
+    - origin_ns: 派生事件（如策略信号）对应的源头行情 recv_ns，用于 tick-to-signal 延迟
+    ts_ns / enq_ns / origin_ns 存放在按需分配的 _extra 中，未设置时事件对象与不做延迟统计时一样小
+    """
+    __slots__ = ("type", "data", "source", "recv_ns", "_pool", "_extra")
+
+    def __init__(self, type_, data=None, timestamp=None, source=None, recv_ns=None, origin_ns=None):
         self.type = type_
         self.data = data
-        self.timestamp = timestamp or time.time()
         self.source = source
+        self.recv_ns = recv_ns or time.perf_counter_ns()
+        self._pool = None
+        self._extra = None
+        if timestamp:
+            self.ts_ns = int(timestamp * 1_000_000_000)
+        if origin_ns:
+            self.origin_ns = origin_ns
+
+    def _extras(self) -> _EventExtra:
+        extra = self._extra
+        if extra is None:
+            extra = self._extra = _EventExtra()
+        return extra
+
+    @property
+    def ts_ns(self):
+        extra = self._extra
+        return None if extra is None else extra.ts_ns
+
+    @ts_ns.setter
+    def ts_ns(self, value):
+        self._extras().ts_ns = value
+
+    @property
+    def enq_ns(self) -> int:
+        extra = self._extra
+        return 0 if extra is None else extra.enq_ns
+
+    @enq_ns.setter
+    def enq_ns(self, value: int):
+        self._extras().enq_ns = value
+
+    @property
+    def origin_ns(self):
+        extra = self._extra
+        return None if extra is None else extra.origin_ns
+
+    @origin_ns.setter
+    def origin_ns(self, value):
+        self._extras().origin_ns = value
+
+    @property
+    def timestamp(self) -> float:
+        ts_ns = self.ts_ns
+        if ts_ns is None:
+            ts_ns = self.recv_ns + _WALL_OFFSET_NS
+        return ts_ns / 1_000_000_000
+
+    @timestamp.setter
+    def timestamp(self, value: float):
+        self.ts_ns = int(value * 1_000_000_000)
 
     def __repr__(self):
         return (
@@ -15,3 +91,49 @@ class Event:
             f"时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.timestamp))}, "
             f"数据: {self.data}>"
         )
+
+
+class EventPool:
+    """
+    Event 空闲链表对象池
+    - acquire() 优先复用空闲 Event，避免行情热路径上逐笔分配
+    - 仅当 EventEngine(recycle_events=True) 时，事件分发完成后由引擎 release() 回收；
+      开启回收后，回调函数不得在返回后继续持有 Event 对象本身（可以持有 event.data）
+    - list.append / list.pop 在 GIL 下是原子操作，多个生产者线程可共享同一个池
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._free: list[Event] = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, type_, data=None, source=None, recv_ns=None) -> Event:
+        try:
+            event = self._free.pop()
+            self.reused += 1
+        except IndexError:
+            event = Event.__new__(Event)
+            self.created += 1
+        event.type = type_
+        event.data = data
+        event.source = source
+        event.recv_ns = recv_ns or time.perf_counter_ns()
+        event._extra = None
+        event._pool = self
+        return event
+
+    def release(self, event: Event):
+        if event._pool is not self:     # 非池化或已回收
+            return
+        event._pool = None
+        event.data = None
+        if len(self._free) < self.maxsize:
+            self._free.append(event)
+
+    def stats(self) -> dict:
+        return {"free": len(self._free), "created": self.created, "reused": self.reused}
+
+
+# 进程级默认对象池（行情热路径使用）
+event_pool = EventPool()
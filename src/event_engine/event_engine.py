@@ -3,70 +3,483 @@
 import threading
 import queue
 import time
-from typing import Callable, DefaultDict
+from typing import Callable, DefaultDict, Optional
 from collections import defaultdict
 
 from .event_type import EventType
 from .event import Event
+from .event_queue import make_queue
+from src.monitor.latency import latency_tracker
 
 
 class EventEngine:
     """全局统一事件引擎，支持注册回调函数并分发事件"""
 
-    def __init__(self, name: str = "default"):
+    def __init__(self, name: str = "default", workers: int = 1,
+                 batch_size: int = 1, batch_budget_us: int = 0,
+                 queue_type: str = "fifo", queue_options: Optional[dict] = None,
+                 recycle_events: bool = False, profile: bool = False,
+                 slow_handler_ms: float = 0, slow_handler_event: str = EventType.LOG_EVENT):
+        """
+        :param name: 引擎名称
+        :param workers: 工作线程数。1 为单线程模式（默认）；
+                        >1 时按标的（event.data 中的 SecurityID / symbol）哈希分片到 N 个队列/线程，
+                        同一标的的事件始终由同一线程按序处理，不同标的之间并行推进。
+                        线程安全约定：普通回调可能被多个分片线程并发调用，只适合按标的隔离状态的回调
+                        （如委托簿重建）；跨标的共享状态的回调（账户、组合、风控、记录器、策略）须以
+                        serial=True 注册，同一对象的所有 serial 回调共用一把锁，任一时刻只在一个线程中执行
+        :param batch_size: 每次唤醒最多取出的事件数。1 为逐条模式（默认），>1 开启批量模式
+        :param batch_budget_us: 批量模式下凑批的时间预算（微秒）。0 表示只取当前已排队的事件，
+                                >0 时批未满会继续等待新事件，直到预算耗尽
+        :param queue_type: 事件队列类型："fifo"（queue.Queue，默认）、"ring"（SPSC 环形缓冲，
+                           行情回调线程投递时不争用锁，生产者线程须调用 bind_producer()）或 "priority"（控制 > 交易 > 行情 > 日志 多车道）
+        :param queue_options: 传给队列构造函数的参数，如 {"capacity": 65536, "policy": "overwrite"}
+        :param recycle_events: 分发完成后把池化事件（EventPool.acquire 创建）归还对象池。
+                               开启后回调函数不得在返回后继续持有 Event 对象
+        :param profile: 统计每个回调的调用次数、累计耗时与最大耗时（handler_stats()）
+        :param slow_handler_ms: 慢回调阈值（毫秒），>0 时自动开启 profile；
+                                单次耗时超过阈值会投递 slow_handler_event 事件（同一回调每秒至多一次）
+        :param slow_handler_event: 慢回调告警的事件类型，LOG_EVENT（默认）或 RISK_ALERT
+        """
         self.name = name
-        self._queue: queue.Queue = queue.Queue()
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.batch_budget_us = max(0, int(batch_budget_us))
+        self.recycle_events = recycle_events
+        self.slow_handler_ms = slow_handler_ms or 0
+        self.slow_handler_event = slow_handler_event
+        self.profile = profile or self.slow_handler_ms > 0
+        self._slow_ns = int(self.slow_handler_ms * 1_000_000)
+        # 回调耗时统计按线程（分片）各记一份，handler_stats() 时合并，分片线程之间不争用计数
+        self._stats_local = threading.local()
+        self._stats_tables: list[dict[Callable, HandlerStats]] = []
+        self.queue_type = queue_type
+        self._queues: list = [make_queue(queue_type, **(queue_options or {}))
+                              for _ in range(self.workers)]
+        self._queue = self._queues[0]
         self._active: bool = False
-        self._thread: threading.Thread = threading.Thread(target=self._run)
+        # 每个分片线程的处理状态（仅由该线程写入）：是否正在分发手头的事件、已处理完的事件/批次数，供 wait_idle 判断排空
+        self._busy: list[bool] = [False] * self.workers
+        self._done: list[int] = [0] * self.workers
+        self._threads: list[threading.Thread] = [
+            threading.Thread(target=self._run, args=(q, i), name=f"EventEngine-{name}-{i}")
+            for i, q in enumerate(self._queues)
+        ]
+        self._thread: threading.Thread = self._threads[0]
         self._handlers: DefaultDict[str, list[Callable[[Event], None]]] = defaultdict(list)
+        # 预编译的只读分发表：event_type -> (专属回调..., 通配回调...)，仅在注册/注销时重建
+        self._dispatch: dict[str, tuple[Callable[[Event], None], ...]] = {}
+        self._wildcard: tuple[Callable[[Event], None], ...] = ()
+        # 批量回调：一次接收同类型的一组事件
+        self._batch_handlers: DefaultDict[str, list[Callable[[list[Event]], None]]] = defaultdict(list)
+        self._batch_dispatch: dict[str, tuple[Callable[[list[Event]], None], ...]] = {}
+        self._batch_wildcard: tuple[Callable[[list[Event]], None], ...] = ()
         self._lock = threading.Lock()
+        # serial 回调：原回调 -> 加锁包装；同一对象（bound method 的 __self__）共用一把锁
+        self._serial: dict[Callable, Callable] = {}
+        self._owner_locks: dict[int, tuple[object, threading.Lock]] = {}
 
     def start(self):
         """启动事件处理线程"""
         self._active = True
-        self._thread.start()
+        for t in self._threads:
+            t.start()
 
-    def stop(self):
-        """停止事件处理线程"""
+    def stop(self, drain: bool = False, timeout: Optional[float] = None):
+        """
+        停止事件处理线程
+        :param drain: 先等待队列排空再停止（wait_idle），回放结束后用它代替固定 sleep，避免丢弃仍在排队的事件
+        :param timeout: 排空最多等待的秒数，None 不限
+        """
+        if drain and not self.wait_idle(timeout):
+            self._log(f"⚠️ 事件队列 {timeout}s 内未排空，剩余 {sum(q.qsize() for q in self._queues)} 条将被丢弃")
         self._active = False
-        self._thread.join()
+        for t in self._threads:
+            t.join()
 
-    def _run(self):
-        """事件处理主循环"""
+    def wait_idle(self, timeout: Optional[float] = None, poll: float = 0.005) -> bool:
+        """
+        等待所有队列取空且工作线程空闲（回调中投递的后续事件，如信号 -> 成交，也一并处理完）
+        连续两次采样都空闲、且期间各分片处理计数不变才视为排空，避开事件刚出队、尚未标记忙碌的间隙
+        :return: True 已排空；False 超时
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last = None
+        while True:
+            if all(q.qsize() == 0 for q in self._queues) and not any(self._busy):
+                done = list(self._done)
+                if done == last:
+                    return True
+                last = done
+            else:
+                last = None
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+
+    def _run(self, q, shard: int = 0):
+        """事件处理主循环（每个分片一个线程）"""
+        if self.batch_size > 1:
+            self._run_batched(q, shard)
+            return
+        recycle = self.recycle_events
+        tracker = latency_tracker
+        busy, done = self._busy, self._done
         while self._active:
             try:
-                event = self._queue.get(timeout=1)
+                event = q.get(timeout=1)
+            except queue.Empty:
+                continue
+            if event is None:       # 防御：队列实现异常时不让工作线程退出
+                continue
+            busy[shard] = True
+            if tracker.enabled:
+                deq_ns = time.perf_counter_ns()
+                self._process(event)
+                tracker.record_event(event, deq_ns, time.perf_counter_ns())
+            else:
                 self._process(event)
+            if recycle and event._pool is not None:
+                event._pool.release(event)
+            done[shard] += 1
+            busy[shard] = False
+
+    def _run_batched(self, q, shard: int = 0):
+        """批量主循环：每次唤醒取出至多 batch_size 个事件，一并分发"""
+        size = self.batch_size
+        budget = self.batch_budget_us / 1_000_000
+        tracker = latency_tracker
+        busy, done = self._busy, self._done
+        while self._active:
+            try:
+                batch = q.get_many(size, timeout=1)
             except queue.Empty:
                 continue
+            busy[shard] = True
+            if None in batch:
+                batch = [event for event in batch if event is not None]
+            if budget and len(batch) < size:
+                deadline = time.perf_counter() + budget
+                while len(batch) < size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch += q.get_many(size - len(batch), timeout=remaining)
+                    except queue.Empty:
+                        break
+            if tracker.enabled:
+                deq_ns = time.perf_counter_ns()
+                self._process_batch(batch)
+                done_ns = time.perf_counter_ns()
+                for event in batch:
+                    tracker.record_event(event, deq_ns, done_ns)
+            else:
+                self._process_batch(batch)
+            if self.recycle_events:
+                for event in batch:
+                    if event._pool is not None:
+                        event._pool.release(event)
+            done[shard] += 1
+            busy[shard] = False
 
     def _process(self, event: Event):
-        """分发事件给所有注册的回调函数"""
-        handlers = self._handlers.get(event.type, [])
-        handlers += self._handlers.get("*", [])  # 通配符支持
-        for handler in handlers:
+        """分发事件给所有注册的回调函数（一次字典查找 + 元组遍历）"""
+        if self.profile:
+            self._process_profiled(event)
+        else:
+            for handler in self._dispatch.get(event.type, self._wildcard):
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"[EventEngine] 处理事件异常: {e}")
+        if self._batch_dispatch or self._batch_wildcard:
+            self._dispatch_batch(event.type, [event])
+
+    def _process_batch(self, batch: list[Event]):
+        """
+        批量分发：按到达顺序切成连续同类型的若干段，逐段先逐条调用普通回调，再调用一次批量回调。
+        不跨段合并，订阅多种事件类型的回调（如风控、组合）看到的顺序与到达顺序一致，
+        不会在处理较早的信号前先看到之后的行情
+        """
+        has_batch = self._batch_dispatch or self._batch_wildcard
+        n = len(batch)
+        start = 0
+        while start < n:
+            event_type = batch[start].type
+            end = start + 1
+            while end < n and batch[end].type is event_type:
+                end += 1
+            run = batch[start:end] if start or end < n else batch
+            if self.profile:
+                for event in run:
+                    self._process_profiled(event)
+            else:
+                handlers = self._dispatch.get(event_type, self._wildcard)
+                if handlers:
+                    for event in run:
+                        for handler in handlers:
+                            try:
+                                handler(event)
+                            except Exception as e:
+                                print(f"[EventEngine] 处理事件异常: {e}")
+            if has_batch:
+                self._dispatch_batch(event_type, run)
+            start = end
+
+    def _dispatch_batch(self, event_type: str, events: list[Event]):
+        for handler in self._batch_dispatch.get(event_type, self._batch_wildcard):
+            if self.profile:
+                self._invoke_profiled(handler, events, event_type)
+                continue
             try:
-                handler(event)
+                handler(events)
             except Exception as e:
-                print(f"[EventEngine] 处理事件异常: {e}")
+                print(f"[EventEngine] 批量处理事件异常: {e}")
+
+    # ---------------- 回调耗时统计 ----------------
+    def _process_profiled(self, event: Event):
+        invoke = self._invoke_profiled
+        for handler in self._dispatch.get(event.type, self._wildcard):
+            invoke(handler, event, event.type)
+
+    def _invoke_profiled(self, handler: Callable, arg, event_type: str):
+        t0 = time.perf_counter_ns()
+        try:
+            handler(arg)
+        except Exception as e:
+            print(f"[EventEngine] 处理事件异常: {e}")
+        elapsed = time.perf_counter_ns() - t0
+
+        table = getattr(self._stats_local, "table", None)
+        if table is None:
+            table = self._stats_table()
+        stats = table.get(handler)
+        if stats is None:
+            stats = table[handler] = HandlerStats(_handler_name(handler))
+        stats.calls += 1
+        stats.total_ns += elapsed
+        if elapsed > stats.max_ns:
+            stats.max_ns = elapsed
+        if self._slow_ns and elapsed >= self._slow_ns:
+            stats.slow += 1
+            self._report_slow(stats, event_type, elapsed)
+
+    def _stats_table(self) -> dict:
+        """当前线程的回调统计表（首次调用时创建并登记）"""
+        table = self._stats_local.table = {}
+        with self._lock:
+            self._stats_tables.append(table)
+        return table
+
+    def _report_slow(self, stats: "HandlerStats", event_type: str, elapsed_ns: int):
+        """投递慢回调告警；告警事件本身的回调变慢时不再告警，避免自激"""
+        if event_type == self.slow_handler_event:
+            return
+        now = time.perf_counter_ns()
+        if now - stats.last_alert_ns < 1_000_000_000:
+            return
+        stats.last_alert_ns = now
+        elapsed_ms = elapsed_ns / 1_000_000
+        label = getattr(event_type, "name", event_type)
+        self.put(Event(
+            type_=self.slow_handler_event,
+            data={
+                "module": f"EventEngine:{self.name}",
+                "message": f"慢回调 {stats.name} 处理 {label} 耗时 {elapsed_ms:.2f}ms"
+                           f"（阈值 {self.slow_handler_ms}ms）",
+                "handler": stats.name,
+                "event_type": label,
+                "elapsed_ms": elapsed_ms,
+                "threshold_ms": self.slow_handler_ms,
+            },
+            source=f"EventEngine:{self.name}"
+        ))
+
+    def handler_stats(self) -> list[dict]:
+        """各回调的调用次数、累计 / 平均 / 最大耗时（毫秒）与慢调用次数，按累计耗时降序"""
+        merged: dict[Callable, HandlerStats] = {}
+        with self._lock:
+            tables = list(self._stats_tables)
+        for table in tables:
+            for handler, stats in list(table.items()):
+                total = merged.get(handler)
+                if total is None:
+                    total = merged[handler] = HandlerStats(stats.name)
+                total.merge(stats)
+        rows = [s.to_dict() for s in merged.values()]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def print_handler_stats(self):
+        self._log("⏱️ [回调耗时统计]")
+        for r in self.handler_stats():
+            self._log(f"  - {r['handler']:<40} 调用 {r['calls']:>8} | 累计 {r['total_ms']:>10.2f}ms | "
+                      f"平均 {r['avg_ms']:>8.3f}ms | 最大 {r['max_ms']:>8.2f}ms | 慢调用 {r['slow']}")
 
     def put(self, event: Event):
-        """向事件队列中注入事件"""
-        self._queue.put(event)
+        """向事件队列中注入事件（分片模式下按标的路由）"""
+        if latency_tracker.enabled:
+            event.enq_ns = time.perf_counter_ns()
+        if self.workers == 1:
+            self._queue.put(event)
+        else:
+            self._queues[self._shard_of(event)].put(event)
 
-    def register(self, event_type: str, handler: Callable[[Event], None]):
-        """注册事件回调函数"""
+    def bind_producer(self):
+        """
+        把调用线程绑定为事件队列的生产者（行情回调线程 / 回放线程调用）
+        ring 队列为单生产者，其它线程的投递走有界旁路；其它队列类型无需绑定
+        """
+        for q in self._queues:
+            bind = getattr(q, "bind_producer", None)
+            if bind is not None:
+                bind()
+
+    def _shard_of(self, event: Event) -> int:
+        """
+        计算事件所属分片：带标的的事件按标的哈希，
+        无标的事件（日志、系统类等）统一落在 0 号分片
+        """
+        key = self._symbol_of(event)
+        if key is None:
+            return 0
+        return hash(key) % self.workers
+
+    @staticmethod
+    def _symbol_of(event: Event) -> Optional[str]:
+        get = getattr(event.data, "get", None)
+        if get is None:
+            return None
+        return get("SecurityID") or get("symbol")
+
+    def register(self, event_type: str, handler: Callable[[Event], None], serial: bool = False):
+        """
+        注册事件回调函数
+        :param serial: 回调持有跨标的共享状态，分片模式（workers>1）下加锁串行调用；单线程模式下无额外开销
+        """
         with self._lock:
+            if serial:
+                self._serialize(handler)
             if handler not in self._handlers[event_type]:
                 self._handlers[event_type].append(handler)
+                self._rebuild_dispatch()
 
     def unregister(self, event_type: str, handler: Callable[[Event], None]):
         """注销事件回调函数"""
         with self._lock:
             if handler in self._handlers[event_type]:
                 self._handlers[event_type].remove(handler)
+                self._release_serial(handler)
+                self._rebuild_dispatch()
+
+    def register_batch(self, event_type: str, handler: Callable[[list[Event]], None], serial: bool = False):
+        """注册批量回调函数：每批中连续到达的同类型事件以列表形式一次性传入（serial 同 register）"""
+        with self._lock:
+            if serial:
+                self._serialize(handler)
+            if handler not in self._batch_handlers[event_type]:
+                self._batch_handlers[event_type].append(handler)
+                self._rebuild_dispatch()
+
+    def unregister_batch(self, event_type: str, handler: Callable[[list[Event]], None]):
+        """注销批量回调函数"""
+        with self._lock:
+            if handler in self._batch_handlers[event_type]:
+                self._batch_handlers[event_type].remove(handler)
+                self._release_serial(handler)
+                self._rebuild_dispatch()
+
+    def _serialize(self, handler: Callable):
+        """为 serial 回调生成加锁包装（调用方需持有 self._lock）；单线程模式下不包装"""
+        if self.workers == 1 or handler in self._serial:
+            return
+        owner = getattr(handler, "__self__", handler)
+        entry = self._owner_locks.get(id(owner))
+        if entry is None:
+            entry = self._owner_locks[id(owner)] = (owner, threading.Lock())
+        lock = entry[1]
+
+        def serialized(arg):
+            with lock:
+                handler(arg)
+
+        serialized.__qualname__ = _handler_name(handler)
+        self._serial[handler] = serialized
+
+    def _release_serial(self, handler: Callable):
+        """回调已从所有事件类型注销时移除其加锁包装，对象不再有 serial 回调时一并释放对象锁（调用方需持有 self._lock）"""
+        if handler not in self._serial:
+            return
+        for registry in (self._handlers, self._batch_handlers):
+            if any(handler in handlers for handlers in registry.values()):
+                return
+        del self._serial[handler]
+        owner = getattr(handler, "__self__", handler)
+        if not any(getattr(h, "__self__", h) is owner for h in self._serial):
+            self._owner_locks.pop(id(owner), None)
+
+    def _rebuild_dispatch(self):
+        """根据注册表重建分发表（调用方需持有 self._lock）"""
+        self._dispatch, self._wildcard = self._compile(self._handlers)
+        self._batch_dispatch, self._batch_wildcard = self._compile(self._batch_handlers)
+
+    def _compile(self, registry: dict) -> tuple[dict, tuple]:
+        serial = self._serial
+        registry = {event_type: [serial.get(h, h) for h in handlers] for event_type, handlers in registry.items()}
+        wildcard = tuple(registry.get("*", ()))
+        dispatch = {
+            event_type: tuple(handlers) + wildcard
+            for event_type, handlers in registry.items()
+            if event_type != "*" and handlers
+        }
+        return dispatch, wildcard
+
+    def queue_stats(self) -> list[dict]:
+        """各分片队列的深度及（环形队列的）覆盖 / 丢弃计数"""
+        stats = []
+        for i, q in enumerate(self._queues):
+            info = q.stats() if hasattr(q, "stats") else {"depth": q.qsize()}
+            stats.append({"shard": i, "queue": self.queue_type, **info})
+        return stats
 
     def _log(self, msg: str):
         print(f"[EventEngine:{self.name}] {msg}")
 
 
+class HandlerStats:
+    """单个回调函数的耗时统计"""
+    __slots__ = ("name", "calls", "total_ns", "max_ns", "slow", "last_alert_ns")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.slow = 0
+        self.last_alert_ns = 0
+
+    def merge(self, other: "HandlerStats"):
+        self.calls += other.calls
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.slow += other.slow
+
+    def to_dict(self) -> dict:
+        return {
+            "handler": self.name,
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1_000_000,
+            "avg_ms": self.total_ns / self.calls / 1_000_000 if self.calls else 0.0,
+            "max_ms": self.max_ns / 1_000_000,
+            "slow": self.slow,
+        }
+
+
+def _handler_name(handler: Callable) -> str:
+    """回调的可读名称；策略等带 name 属性的对象附上实例名"""
+    name = getattr(handler, "__qualname__", None) or repr(handler)
+    owner = getattr(handler, "__self__", None)
+    owner_name = getattr(owner, "name", None)
+    if isinstance(owner_name, str):
+        name = f"{name}[{owner_name}]"
+    return name
@@ -6,6 +6,7 @@ class EventType(str, Enum):
     MARKET_SNAPSHOT = "市场快照"
     MARKET_TICK = "逐笔行情"
     ORDER_BOOK = "委托簿"
+    MARKET_OVERVIEW = "市场总览"
     MARKET_SUBSCRIBE_REQUEST = "请求订阅行情"
     HISTORICAL_DATA_REQUEST = "请求历史数据"
 
@@ -0,0 +1,192 @@
+# src/event_engine/priority_queue.py
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from .event_type import EventType
+
+
+# 默认优先级车道（由高到低）
+DEFAULT_LANES = ("control", "trading", "market", "logging")
+
+# 事件类型 -> 车道；未列出的类型落入 default_lane
+DEFAULT_LANE_MAP = {
+    # 控制 / 风控
+    EventType.RISK_ALERT: "control",
+    EventType.STRATEGY_STOP: "control",
+    EventType.STRATEGY_START: "control",
+    EventType.STRATEGY_DEPLOY: "control",
+    EventType.EXCEPTION: "control",
+    EventType.HEARTBEAT: "control",
+    EventType.BACKTEST_START: "control",
+    EventType.BACKTEST_END: "control",
+    # 交易
+    EventType.STRATEGY_SIGNAL: "trading",
+    EventType.ORDER_SUBMIT: "trading",
+    EventType.ORDER_CANCEL: "trading",
+    EventType.ORDER_FILLED: "trading",
+    # 行情
+    EventType.MARKET_SNAPSHOT: "market",
+    EventType.MARKET_TICK: "market",
+    EventType.ORDER_BOOK: "market",
+    EventType.MARKET_OVERVIEW: "market",
+    EventType.MARKET_SUBSCRIBE_REQUEST: "market",
+    EventType.HISTORICAL_DATA_REQUEST: "market",
+    # 日志
+    EventType.LOG_EVENT: "logging",
+}
+
+# 加权调度下每轮各车道可出队的事件数
+DEFAULT_WEIGHTS = {"control": 8, "trading": 4, "market": 2, "logging": 1}
+
+
+class PriorityLaneQueue:
+    """
+    多车道优先级事件队列：控制/风控事件不必排在成千上万条行情快照之后
+
+    - scheduling="strict"：总是先取最高优先级的非空车道
+    - scheduling="weighted"：加权轮转，每轮各车道最多出队 weight 个事件，低优先级车道不会被饿死
+    - 每个车道内部仍是 FIFO；提供各车道深度、高水位、出入队计数
+    """
+
+    def __init__(self, lanes: Optional[list] = None, scheduling: str = "strict",
+                 weights: Optional[dict] = None, lane_map: Optional[dict] = None,
+                 default_lane: str = "market"):
+        """
+        :param lanes: 车道名称，按优先级由高到低
+        :param scheduling: "strict" 或 "weighted"
+        :param weights: 加权调度的车道权重，如 {"control": 8, "market": 2}
+        :param lane_map: 覆盖默认映射，键可为 EventType 或其名称，如 {"MARKET_TICK": "market"}
+        :param default_lane: 未映射事件类型所在车道
+        """
+        if scheduling not in ("strict", "weighted"):
+            raise ValueError(f"❌ 不支持的调度方式: {scheduling}")
+        self.lanes = tuple(lanes or DEFAULT_LANES)
+        if default_lane not in self.lanes:
+            default_lane = self.lanes[-1]
+        self.scheduling = scheduling
+
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self._weights = [max(1, int(weights.get(lane, 1))) for lane in self.lanes]
+        self._credits = list(self._weights)
+
+        index = {lane: i for i, lane in enumerate(self.lanes)}
+        self._lane_of: dict = {}
+        for event_type, lane in {**DEFAULT_LANE_MAP, **self._parse_lane_map(lane_map)}.items():
+            if lane in index:
+                self._lane_of[event_type] = index[lane]
+        self._default = index[default_lane]
+
+        self._queues = [deque() for _ in self.lanes]
+        self._size = 0
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+
+        # 统计
+        self._enqueued = [0] * len(self.lanes)
+        self._dequeued = [0] * len(self.lanes)
+        self._high_water = [0] * len(self.lanes)
+
+    @staticmethod
+    def _parse_lane_map(lane_map: Optional[dict]) -> dict:
+        parsed = {}
+        for key, lane in (lane_map or {}).items():
+            parsed[EventType[key] if isinstance(key, str) and key in EventType.__members__ else key] = lane
+        return parsed
+
+    # ---------------- 入队 ----------------
+    def put(self, event, block: bool = True, timeout: float = None):
+        i = self._lane_of.get(event.type, self._default)
+        with self._mutex:
+            lane = self._queues[i]
+            lane.append(event)
+            self._size += 1
+            self._enqueued[i] += 1
+            if len(lane) > self._high_water[i]:
+                self._high_water[i] = len(lane)
+            self._not_empty.notify()
+
+    def put_nowait(self, event):
+        self.put(event, block=False)
+
+    # ---------------- 出队 ----------------
+    def _pick(self) -> int:
+        """按调度策略选择车道（调用方持有锁且队列非空）"""
+        queues = self._queues
+        if self.scheduling == "strict":
+            for i, lane in enumerate(queues):
+                if lane:
+                    return i
+        credits = self._credits
+        for i, lane in enumerate(queues):
+            if lane and credits[i] > 0:
+                credits[i] -= 1
+                return i
+        # 本轮有事件的车道额度已用完，开始新一轮
+        self._credits = credits = list(self._weights)
+        for i, lane in enumerate(queues):
+            if lane:
+                credits[i] -= 1
+                return i
+
+    def _pop(self):
+        i = self._pick()
+        self._size -= 1
+        self._dequeued[i] += 1
+        return self._queues[i].popleft()
+
+    def _wait(self, block: bool, timeout: float):
+        """等待直到有事件（调用方持有锁）"""
+        if self._size:
+            return
+        if not block:
+            raise queue.Empty
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._size:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            self._not_empty.wait(remaining)
+
+    def get(self, block: bool = True, timeout: float = None):
+        with self._not_empty:
+            self._wait(block, timeout)
+            return self._pop()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get_many(self, max_items: int, timeout: float = None) -> list:
+        """按调度顺序取出至多 max_items 个事件"""
+        with self._not_empty:
+            self._wait(True, timeout)
+            return [self._pop() for _ in range(min(max_items, self._size))]
+
+    # ---------------- 统计 ----------------
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def depths(self) -> dict:
+        return {lane: len(q) for lane, q in zip(self.lanes, self._queues)}
+
+    def stats(self) -> dict:
+        with self._mutex:
+            return {
+                "depth": self._size,
+                "scheduling": self.scheduling,
+                "lanes": {
+                    lane: {
+                        "depth": len(self._queues[i]),
+                        "high_water": self._high_water[i],
+                        "enqueued": self._enqueued[i],
+                        "dequeued": self._dequeued[i],
+                    }
+                    for i, lane in enumerate(self.lanes)
+                },
+            }
@@ -0,0 +1,216 @@
+# src/event_engine/ring_buffer.py
+
+import queue
+import threading
+import time
+from array import array
+from collections import deque
+
+
+class RingBufferQueue:
+    """
+    预分配、定长的单生产者/单消费者（SPSC）环形缓冲队列，可作为 EventEngine 的事件队列
+
+    - 生产者只推进写序号 _tail，消费者只推进读序号 _head，两端都不使用锁 / Condition，
+      行情回调线程投递事件时不会与事件线程争用锁
+    - 槽位另存一份序号（array('q')），读取时按 seqlock 方式校验，覆盖模式下不会读到被改写的事件
+    - policy="block"：队列满时生产者退避等待（可设 block_timeout，超时则丢弃新事件并计数）；
+      policy="overwrite"：队列满时覆盖最旧的未读事件并计数
+    - 生产者须由 bind_producer() 显式绑定（行情回调线程 / 回放线程）；未绑定时以及其它线程
+      （事件线程回发的信号、风控告警、日志等）的事件走加锁的有界旁路，不破坏单生产者约束
+    - 旁路事件记下投递时的写序号，消费者读完此前写入环形缓冲的事件后才取它，整体保持投递顺序
+    - 旁路满时：block 模式等待（事件线程自身回发时不等待，避免自锁），超时丢弃新事件；
+      overwrite 模式丢弃最旧的旁路事件；均单独计数
+    """
+
+    def __init__(self, capacity: int = 65536, policy: str = "block",
+                 block_timeout: float = None, idle_sleep: float = 0.0005, side_capacity: int = 65536):
+        """
+        :param capacity: 槽位数，向上取整为 2 的幂
+        :param policy: "block" 或 "overwrite"
+        :param block_timeout: block 模式下生产者最长等待秒数，None 表示一直等待
+        :param idle_sleep: 空闲 / 满队列时退避睡眠的上限（秒）
+        :param side_capacity: 旁路（非生产者线程投递）最多缓存的事件数
+        """
+        if policy not in ("block", "overwrite"):
+            raise ValueError(f"❌ 不支持的环形队列策略: {policy}")
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.idle_sleep = idle_sleep
+
+        self._mask = size - 1
+        self._items: list = [None] * size
+        self._seqs = array("q", [-1]) * size
+        self._head = 0          # 已读序号（仅消费者写）
+        self._tail = 0          # 已写序号（仅生产者写）
+        self.side_capacity = side_capacity
+        self._side: deque = deque()     # (投递时的写序号, 事件)
+        self._side_lock = threading.Lock()
+        self._producer: int = None
+        self._consumer: int = None
+
+        # 统计
+        self.overwritten = 0    # overwrite 模式下被覆盖的未读事件数
+        self.dropped = 0        # block 模式下等待超时被丢弃的事件数
+        self.side_put = 0       # 经旁路投递的事件数
+        self.side_overwritten = 0
+        self.side_dropped = 0
+
+    # ---------------- 生产者 ----------------
+    def bind_producer(self, ident: int = None):
+        """把调用线程（或指定线程 ident）绑定为唯一生产者"""
+        self._producer = threading.get_ident() if ident is None else ident
+
+    def put(self, item, block: bool = True, timeout: float = None):
+        if threading.get_ident() != self._producer:
+            self._put_side(item, block, timeout)
+            return
+
+        tail = self._tail
+        if tail - self._head >= self.capacity:
+            if self.policy == "overwrite":
+                self.overwritten += 1
+            elif not self._wait_for_space(tail, block, timeout):
+                self.dropped += 1
+                raise queue.Full
+
+        i = tail & self._mask
+        self._seqs[i] = -1      # 标记写入中
+        self._items[i] = item
+        self._seqs[i] = tail
+        self._tail = tail + 1
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def _put_side(self, item, block: bool, timeout: float):
+        side = self._side
+        with self._side_lock:
+            if len(side) < self.side_capacity:
+                side.append((self._tail, item))
+                self.side_put += 1
+                return
+            if self.policy == "overwrite":
+                side.popleft()
+                side.append((self._tail, item))
+                self.side_put += 1
+                self.side_overwritten += 1
+                return
+        # block：事件线程自身回发时不等待（消费者不会在等待期间取走旁路事件）
+        if block and threading.get_ident() != self._consumer:
+            if timeout is None:
+                timeout = self.block_timeout
+            deadline = None if timeout is None else time.monotonic() + timeout
+            pause = 0.0
+            while deadline is None or time.monotonic() < deadline:
+                time.sleep(pause)
+                pause = min(pause * 2 or 1e-6, self.idle_sleep)
+                with self._side_lock:
+                    if len(side) < self.side_capacity:
+                        side.append((self._tail, item))
+                        self.side_put += 1
+                        return
+        with self._side_lock:
+            self.side_dropped += 1
+        raise queue.Full
+
+    def _wait_for_space(self, tail: int, block: bool, timeout: float) -> bool:
+        if not block:
+            return False
+        if timeout is None:
+            timeout = self.block_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pause = 0.0
+        while tail - self._head >= self.capacity:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(pause)
+            pause = min(pause * 2 or 1e-6, self.idle_sleep)
+        return True
+
+    # ---------------- 消费者 ----------------
+    _EMPTY = object()
+
+    def _try_get(self):
+        side = self._side
+        if side:
+            with self._side_lock:
+                # 旁路事件之前写入环形缓冲的事件均已读完
+                if side and side[0][0] <= self._head:
+                    return side.popleft()[1]
+        while True:
+            head = self._head
+            avail = self._tail - head
+            if avail <= 0:
+                return self._EMPTY
+            if avail > self.capacity:
+                # 被生产者套圈（overwrite 模式），跳到仍然有效的最旧事件
+                head += avail - self.capacity
+            i = head & self._mask
+            s1 = self._seqs[i]
+            item = self._items[i]
+            if s1 != head or self._seqs[i] != head:
+                self._head = head
+                continue        # 读取期间槽位被覆盖，重新定位
+            if self.policy == "block":
+                # 先清空槽位再推进 _head：推进后生产者可能立即写入同一槽位
+                self._items[i] = None
+            self._head = head + 1
+            return item
+
+    def get(self, block: bool = True, timeout: float = None):
+        self._consumer = threading.get_ident()
+        item = self._try_get()
+        if item is not self._EMPTY:
+            return item
+        if not block:
+            raise queue.Empty
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pause = 0.0
+        while True:
+            item = self._try_get()
+            if item is not self._EMPTY:
+                return item
+            if deadline is not None and time.monotonic() >= deadline:
+                raise queue.Empty
+            time.sleep(pause)
+            pause = min(pause * 2 or 1e-6, self.idle_sleep)
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get_many(self, max_items: int, timeout: float = None) -> list:
+        """取出至多 max_items 个事件；为空时最多等待 timeout 秒"""
+        items = [self.get(timeout=timeout)]
+        try_get, empty = self._try_get, self._EMPTY
+        while len(items) < max_items:
+            item = try_get()
+            if item is empty:
+                break
+            items.append(item)
+        return items
+
+    # ---------------- 统计 ----------------
+    def qsize(self) -> int:
+        return min(self._tail - self._head, self.capacity) + len(self._side)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "depth": self.qsize(),
+            "written": self._tail,
+            "overwritten": self.overwritten,
+            "dropped": self.dropped,
+            "side_put": self.side_put,
+            "side_depth": len(self._side),
+            "side_overwritten": self.side_overwritten,
+            "side_dropped": self.side_dropped,
+        }
@@ -1,40 +1,235 @@
-from src.event_engine.event import Event
+import ctypes
+import struct
+from operator import attrgetter
+
+from src.event_engine.event import event_pool
 from src.event_engine.event_type import EventType
+from src.monitor.latency import latency_tracker
+from src.market.snapshot_view import SnapshotView
+from src.market.snapshot_columns import SnapshotColumns
+
+# c_char 字段（方向、委托类型、成交类别等）-> str，避免逐笔 decode
+_CHARS = {bytes([i]): chr(i) for i in range(1, 128)}
+_CHARS[b"\x00"] = ""
+
+# 逐笔消息读取的字段（按结构体内偏移升序）
+_TRADE_FIELDS = ("exchId", "tradeDate", "TransactTime", "ChannelNo", "ApplSeqNum", "SecurityID",
+                 "ExecType", "TradeBSFlag", "SseBizIndex", "TradePrice", "TradeQty", "TradeMoney",
+                 "BidApplSeqNum", "OfferApplSeqNum")
+_ORDER_FIELDS = ("exchId", "tradeDate", "TransactTime", "ChannelNo", "ApplSeqNum", "SecurityID",
+                 "Side", "OrderType", "SseBizIndex", "SseOrderNo", "Price", "OrderQty")
+
+
+def _field_getter(msg_type, names):
+    """
+    返回一次读出多个字段的函数，结果为按 names 顺序的元组
+    - ctypes 结构体：按字段偏移生成 struct 格式，直接对结构体内存 unpack_from（一次调用，无逐字段属性访问）
+    - 其它对象（测试替身等）：退化为 attrgetter
+    """
+    if not issubclass(msg_type, ctypes.Structure):
+        return attrgetter(*names)
+    fmt, pos = ["@"], 0
+    for name in names:
+        field = getattr(msg_type, name)
+        ftype = dict(msg_type._fields_)[name]
+        if field.offset < pos:
+            raise ValueError(f"字段须按偏移升序排列: {name}")
+        if field.offset > pos:
+            fmt.append(f"{field.offset - pos}x")
+        if issubclass(ftype, ctypes.Array):
+            fmt.append(f"{ftype._length_}s")
+        else:
+            fmt.append(ftype._type_)
+        pos = field.offset + field.size
+    return struct.Struct("".join(fmt)).unpack_from
 
 
 class MarketEventHandler:
-    def __init__(self, event_engine):
+    def __init__(self, event_engine, snapshot_view: bool = False, snapshot_columns: int = 0):
+        """
+        :param snapshot_view: L2 快照以只读视图（SnapshotView）发布，不在回调线程上构建字典；
+                              需配合 copy_args=True / "pool"
+        :param snapshot_columns: >0 时 L2 快照整体 memmove 进该行数的 NumPy 列式缓存，
+                                 以 SnapshotRow 发布（含十档盘口数组），任何 copy_args 下均安全
+        """
         self.event_engine = event_engine
+        self.snapshot_view = snapshot_view
+        self.columns = SnapshotColumns(snapshot_columns) if snapshot_columns > 0 else None
+        self._symbols: dict[bytes, str] = {}
+        self._getters: dict = {}
+        self._acquire = event_pool.acquire      # 逐笔热路径直接调用（省去 _publish 一层调用）
 
     # ---------------- Level-2 快照 ----------------
-    def handle_l2_snapshot(self, msg):
+    def handle_l2_snapshot(self, msg, recv_ns=None):
         try:
-            data = self._extract_common_snapshot(msg.l2Stock, msg.head)
-            self._publish(EventType.MARKET_SNAPSHOT, data, "L2_SNAPSHOT")
+            if latency_tracker.enabled:
+                latency_tracker.record_exchange(msg.head.updateTime)
+            if self.columns is not None:
+                data = self.columns.append(msg)
+            elif self.snapshot_view:
+                data = SnapshotView(msg, "l2Stock")
+            else:
+                data = self._extract_common_snapshot(msg.l2Stock, msg.head)
+            self._publish(EventType.MARKET_SNAPSHOT, data, "L2_SNAPSHOT", recv_ns)
         except Exception as e:
             self._log_error("L2快照", e)
 
-    # -------- 其它 handler 保持结构，只要需要字段就改同样方式 --------
-    # （下面代码省略，只示范一处——其余 handle_* 方法留在原文件即可）
+    # ---------------- Level-2 逐笔 ----------------
+    def handle_l2_tick_trade(self, msg, recv_ns=None):
+        """逐笔成交（MdsL2TradeT）-> MARKET_TICK"""
+        try:
+            (exch_id, trade_date, time_, channel, seq, raw_symbol, exec_type, bs_flag,
+             biz_index, price, qty, money, bid_seq, offer_seq) = self._getter(msg, _TRADE_FIELDS)(msg)
+            symbol = self._symbols.get(raw_symbol) or self._symbol(raw_symbol)
+            self.event_engine.put(self._acquire(EventType.MARKET_TICK, {
+                "kind":            "trade",
+                "symbol":          symbol,
+                "SecurityID":      symbol,
+                "exch_id":         exch_id,
+                "trade_date":      trade_date,
+                "time":            time_,
+                "ChannelNo":       channel,
+                "ApplSeqNum":      seq,
+                "SseBizIndex":     biz_index,
+                "ExecType":        _CHARS.get(exec_type, ""),
+                "TradeBSFlag":     _CHARS.get(bs_flag, ""),
+                "TradePx":         price,
+                "TradeQty":        qty,
+                "TradeMoney":      money,
+                "BidApplSeqNum":   bid_seq,
+                "OfferApplSeqNum": offer_seq,
+                "last_price":      price,
+            }, "L2_TRADE", recv_ns))
+        except Exception as e:
+            self._log_error("逐笔成交", e)
+
+    def handle_l2_tick_order(self, msg, recv_ns=None):
+        """逐笔委托（MdsL2OrderT，沪深通用）-> MARKET_TICK"""
+        try:
+            (exch_id, trade_date, time_, channel, seq, raw_symbol, side, order_type,
+             biz_index, order_no, price, qty) = self._getter(msg, _ORDER_FIELDS)(msg)
+            symbol = self._symbols.get(raw_symbol) or self._symbol(raw_symbol)
+            self.event_engine.put(self._acquire(EventType.MARKET_TICK, {
+                "kind":        "order",
+                "symbol":      symbol,
+                "SecurityID":  symbol,
+                "exch_id":     exch_id,
+                "trade_date":  trade_date,
+                "time":        time_,
+                "ChannelNo":   channel,
+                "ApplSeqNum":  seq,
+                "SseBizIndex": biz_index,
+                "SseOrderNo":  order_no,
+                "Side":        _CHARS.get(side, ""),
+                "OrderType":   _CHARS.get(order_type, ""),
+                "Price":       price,
+                "OrderQty":    qty,
+            }, "L2_ORDER", recv_ns))
+        except Exception as e:
+            self._log_error("逐笔委托", e)
+
+    # ---------------- Level-2 委托队列 / 市场总览 ----------------
+    def handle_l2_best_orders_snapshot(self, msg, recv_ns=None):
+        """买一 / 卖一前五十笔委托明细（MdsL2BestOrdersSnapshotBodyT）-> ORDER_BOOK"""
+        try:
+            body, head = msg.l2BestOrders, msg.head
+            symbol = self._symbol(body.SecurityID)
+            n_bid, n_offer = body.NoBidOrders, body.NoOfferOrders
+            self._publish(EventType.ORDER_BOOK, {
+                "kind":           "best_orders",
+                "symbol":         symbol,
+                "SecurityID":     symbol,
+                "trade_date":     head.tradeDate,
+                "update_time":    head.updateTime,
+                "BestBidPrice":   body.BestBidPrice,
+                "BestOfferPrice": body.BestOfferPrice,
+                "volume":         body.TotalVolumeTraded,
+                "BidOrderQty":    body.BidOrderQty[:n_bid],
+                "OfferOrderQty":  body.OfferOrderQty[:n_offer],
+            }, "L2_BEST_ORDERS", recv_ns)
+        except Exception as e:
+            self._log_error("L2委托队列", e)
+
+    def handle_l2_market_overview(self, msg, recv_ns=None):
+        """上交所市场总览（MdsL2MarketOverviewT）-> MARKET_OVERVIEW（行情车道，用作行情时钟；HEARTBEAT 仅留给链路存活检测）"""
+        try:
+            body = msg.l2MarketOverview
+            self._publish(EventType.MARKET_OVERVIEW, {
+                "kind":            "market_overview",
+                "OrigDate":        body.OrigDate,
+                "OrigTime":        body.OrigTime,
+                "exchSendingTime": getattr(body, "exchSendingTime", 0),
+                "mdsRecvTime":     getattr(body, "mdsRecvTime", 0),
+            }, "L2_MARKET_OVERVIEW", recv_ns)
+        except Exception as e:
+            self._log_error("市场总览", e)
+
+    # ---------------- Level-1 / 指数 / 期权快照 ----------------
+    def handle_l1_stock_snapshot(self, msg, recv_ns=None):
+        try:
+            data = self._extract_common_snapshot(msg.stock, msg.head)
+            self._publish(EventType.MARKET_SNAPSHOT, data, "L1_SNAPSHOT", recv_ns)
+        except Exception as e:
+            self._log_error("L1快照", e)
+
+    def handle_index_snapshot(self, msg, recv_ns=None):
+        try:
+            body = msg.index
+            data = self._extract_common_snapshot(body, msg.head)
+            data["OpenPx"] = body.OpenPx
+            data["HighPx"] = body.HighPx
+            data["LowPx"] = body.LowPx
+            data["ClosePx"] = body.ClosePx
+            self._publish(EventType.MARKET_SNAPSHOT, data, "INDEX_SNAPSHOT", recv_ns)
+        except Exception as e:
+            self._log_error("指数快照", e)
+
+    def handle_option_snapshot(self, msg, recv_ns=None):
+        try:
+            data = self._extract_common_snapshot(msg.option, msg.head)
+            self._publish(EventType.MARKET_SNAPSHOT, data, "OPTION_SNAPSHOT", recv_ns)
+        except Exception as e:
+            self._log_error("期权快照", e)
 
     # ---------------- 公共工具函数 ----------------
+    def _getter(self, msg, names):
+        """按消息类型缓存的多字段读取函数（见 _field_getter）"""
+        key = (type(msg), names)
+        getter = self._getters.get(key)
+        if getter is None:
+            getter = self._getters[key] = _field_getter(type(msg), names)
+        return getter
+
+    def _symbol(self, raw: bytes) -> str:
+        """证券代码 bytes -> str，按原始字节缓存，逐笔行情不再重复 decode（兼容末尾补 \\0 的定长字节）"""
+        symbol = self._symbols.get(raw)
+        if symbol is None:
+            symbol = self._symbols[raw] = raw.split(b"\0", 1)[0].decode()
+        return symbol
+
     def _extract_common_snapshot(self, body, head):
         """抽取快照共有字段——统一成英文小写，下划线命名"""
+        symbol = self._symbol(body.SecurityID)
+        price = body.TradePx
         return {
             # --- 主要字段 ---
-            "symbol":      body.SecurityID.decode(),
-            "last_price":  body.TradePx,
+            "symbol":      symbol,
+            "last_price":  price,
             "volume":      body.TotalVolumeTraded,
             "trade_date":  head.tradeDate,
             "update_time": head.updateTime,
 
+            # --- 原始字段名（策略 / 账户按此读取） ---
+            "SecurityID":  symbol,
+            "TradePx":     price,
+
             # --- 兼容旧字段（可后续移除） ---
-            "SecurityID": body.SecurityID.decode(),
-            "最新价":      body.TradePx,
+            "最新价":       price,
         }
 
-    def _publish(self, event_type, data, source):
-        self.event_engine.put(Event(type_=event_type, data=data, source=source))
+    def _publish(self, event_type, data, source, recv_ns=None):
+        """recv_ns: SPI 回调入口处的 perf_counter_ns，缺省为当前时间"""
+        self.event_engine.put(event_pool.acquire(event_type, data, source, recv_ns))
 
     def _log_error(self, name, e):
         print(f"[MarketEventHandler] ❌ 处理{name}时异常: {e}")
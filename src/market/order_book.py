@@ -0,0 +1,402 @@
+# src/market/order_book.py
+
+from array import array
+from math import gcd
+
+from src.event_engine.event import event_pool
+from src.event_engine.event_type import EventType
+
+# 交易所代码（eMdsExchangeIdT）
+EXCH_SSE = 1
+EXCH_SZSE = 2
+
+# 逐笔委托方向（eMdsL2OrderSideT）
+SIDE_BUY = "1"
+SIDE_SELL = "2"
+
+# 深交所订单类型（eMdsL2OrderTypeT）
+SZSE_ORDER_MKT = "1"
+SZSE_ORDER_LMT = "2"
+SZSE_ORDER_SAMEPARTY_BEST = "U"
+
+# 上交所订单类型（eMdsL2SseOrderTypeT）
+SSE_ORDER_ADD = "A"
+SSE_ORDER_DELETE = "D"
+SSE_ORDER_STATUS = "S"
+
+# 深交所成交类别（eMdsL2TradeExecTypeT）
+EXEC_CANCELED = "4"
+
+_WINDOW = 512          # 首次建档时以首个价格为中心预留的档位数（单侧）
+
+
+class _Side:
+    """
+    单侧价位数组：按 (价格 - base) // tick 索引的档位数组，记录每档总量与委托笔数
+    - best 为最优档位下标，最优价 / 最优量读取为 O(1)
+    - 最优档被吃空时向劣方向扫描下一个非空档（摊还开销与被吃掉的价位跨度成正比）
+    - 价格超出数组范围时按需扩展；价格不在网格上时按最大公约数细化 tick
+    """
+    __slots__ = ("is_bid", "tick", "base", "qty", "count", "best", "levels")
+
+    def __init__(self, is_bid: bool, tick: int):
+        self.is_bid = is_bid
+        self.tick = tick
+        self.base = 0
+        self.qty = array("q")
+        self.count = array("i")
+        self.best = -1
+        self.levels = 0
+
+    # ---------------- 档位索引 ----------------
+    def _index(self, price: int) -> int:
+        offset = price - self.base
+        if offset % self.tick:
+            self._regrid(gcd(self.tick, offset))
+            offset = price - self.base
+        i = offset // self.tick
+        if 0 <= i < len(self.qty):
+            return i
+        return self._grow(price)
+
+    def _grow(self, price: int) -> int:
+        n = len(self.qty)
+        if n == 0:
+            self.base = max(price - _WINDOW * self.tick, 0)
+            size = (price - self.base) // self.tick + _WINDOW
+            self.qty = array("q", [0]) * size
+            self.count = array("i", [0]) * size
+            return (price - self.base) // self.tick
+        i = (price - self.base) // self.tick
+        if i < 0:
+            extra = max(-i, n)
+            self.qty = array("q", [0]) * extra + self.qty
+            self.count = array("i", [0]) * extra + self.count
+            self.base -= extra * self.tick
+            if self.best >= 0:
+                self.best += extra
+            return i + extra
+        extra = max(i - n + 1, n)
+        self.qty.extend(array("q", [0]) * extra)
+        self.count.extend(array("i", [0]) * extra)
+        return i
+
+    def _regrid(self, tick: int):
+        factor = self.tick // tick
+        qty = array("q", [0]) * (len(self.qty) * factor)
+        count = array("i", [0]) * (len(self.count) * factor)
+        qty[::factor] = self.qty
+        count[::factor] = self.count
+        self.qty, self.count, self.tick = qty, count, tick
+        if self.best >= 0:
+            self.best *= factor
+
+    # ---------------- 增减 ----------------
+    def add(self, price: int, qty: int):
+        i = self._index(price)
+        if self.qty[i] == 0:
+            self.levels += 1
+        self.qty[i] += qty
+        self.count[i] += 1
+        best = self.best
+        if best < 0 or (i > best if self.is_bid else i < best):
+            self.best = i
+
+    def remove(self, price: int, qty: int, order_done: bool):
+        i = self._index(price)
+        if self.qty[i] == 0:
+            return
+        left = self.qty[i] - qty
+        if order_done:
+            self.count[i] -= 1
+        if left > 0:
+            self.qty[i] = left
+            return
+        self.qty[i] = 0
+        self.count[i] = 0
+        self.levels -= 1
+        if i == self.best:
+            self.best = self._next(i)
+
+    def _next(self, i: int) -> int:
+        if self.levels <= 0:
+            return -1
+        qty = self.qty
+        if self.is_bid:
+            for j in range(i - 1, -1, -1):
+                if qty[j]:
+                    return j
+        else:
+            for j in range(i + 1, len(qty)):
+                if qty[j]:
+                    return j
+        return -1
+
+    # ---------------- 查询 ----------------
+    def best_price(self) -> int:
+        return self.base + self.best * self.tick if self.best >= 0 else 0
+
+    def best_qty(self) -> int:
+        return self.qty[self.best] if self.best >= 0 else 0
+
+    def depth(self, n: int):
+        """前 n 档 (价格列表, 数量列表)"""
+        prices, qtys = [], []
+        i, qty = self.best, self.qty
+        if i < 0:
+            return prices, qtys
+        step = -1 if self.is_bid else 1
+        end = -1 if self.is_bid else len(qty)
+        base, tick = self.base, self.tick
+        while i != end and len(prices) < n:
+            q = qty[i]
+            if q:
+                prices.append(base + i * tick)
+                qtys.append(q)
+            i += step
+        return prices, qtys
+
+
+class OrderBook:
+    """
+    单只标的的逐笔重建委托簿（价格单位与 MDS 一致，即元 * 10000）
+
+    - 深交所：委托以 ApplSeqNum 标识；限价单按 Price 挂单，本方最优按到达时本方最优价挂单；
+      成交（ExecType='F'）按 BidApplSeqNum / OfferApplSeqNum 扣减双方委托，
+      撤单以成交类别 '4' 的逐笔成交推送，扣减被撤委托
+    - 上交所：委托以 SseOrderNo 标识；'A' 推送的是撮合后剩余挂单量，'D' 删除委托，
+      'S' 为产品状态订单（Side 为状态码，记录在 status）；成交只扣减簿上存在的委托
+    - 市价单（及无本方最优价的本方最优单）不进入价位数组，仅登记以便成交时扣减，
+      其剩余部分（如深交所剩余转限价）不会挂入委托簿
+    """
+
+    def __init__(self, symbol: str, exch_id: int = 0, price_tick: int = 100):
+        """
+        :param price_tick: 价位网格间距（MDS 价格单位），默认 100 即 0.01 元；遇到不在网格上的价格自动细化
+        """
+        self.symbol = symbol
+        self.exch_id = exch_id
+        self.bids = _Side(True, price_tick)
+        self.asks = _Side(False, price_tick)
+        self.orders: dict = {}          # 委托号 -> [_Side, 价格(0 表示不在簿上), 剩余量]
+        self.last_price = 0
+        self.volume = 0
+        self.time = 0
+        self.seq = 0
+        self.status = ""
+
+    # ---------------- 逐笔处理 ----------------
+    def apply(self, tick: dict):
+        """处理一条逐笔（MarketEventHandler 发布的 MARKET_TICK 数据字典）"""
+        if tick["kind"] == "trade":
+            self.on_trade(tick)
+        else:
+            self.on_order(tick)
+
+    def on_order(self, tick: dict):
+        self.exch_id = tick.get("exch_id", self.exch_id)
+        self.time = tick["time"]
+        self.seq = tick["ApplSeqNum"]
+        order_type = tick["OrderType"]
+        if self.exch_id == EXCH_SSE:
+            if order_type == SSE_ORDER_ADD:
+                self._add(tick["SseOrderNo"], tick["Side"], tick["Price"], tick["OrderQty"])
+            elif order_type == SSE_ORDER_DELETE:
+                self._reduce(tick["SseOrderNo"], None)
+            elif order_type == SSE_ORDER_STATUS:
+                self.status = tick["Side"]
+            return
+
+        price = tick["Price"]
+        if order_type == SZSE_ORDER_MKT:
+            price = 0
+        elif order_type == SZSE_ORDER_SAMEPARTY_BEST:
+            side = self._side(tick["Side"])
+            price = side.best_price() if side is not None else 0
+        self._add(tick["ApplSeqNum"], tick["Side"], price, tick["OrderQty"])
+
+    def on_trade(self, tick: dict):
+        self.exch_id = tick.get("exch_id", self.exch_id)
+        self.time = tick["time"]
+        self.seq = tick["ApplSeqNum"]
+        qty = tick["TradeQty"]
+        if tick.get("ExecType") == EXEC_CANCELED:
+            self._reduce(tick["BidApplSeqNum"] or tick["OfferApplSeqNum"], qty)
+            return
+        self._reduce(tick["BidApplSeqNum"], qty)
+        self._reduce(tick["OfferApplSeqNum"], qty)
+        self.last_price = tick["TradePx"]
+        self.volume += qty
+
+    def _side(self, side: str):
+        if side == SIDE_BUY:
+            return self.bids
+        if side == SIDE_SELL:
+            return self.asks
+        return None     # 借入 / 出借等不进入委托簿
+
+    def _add(self, order_id, side_flag: str, price: int, qty: int):
+        side = self._side(side_flag)
+        if side is None or qty <= 0:
+            return
+        if price > 0:
+            side.add(price, qty)
+        self.orders[order_id] = [side, price, qty]
+
+    def _reduce(self, order_id, qty):
+        """扣减委托剩余量；qty 为 None 表示删除整笔委托"""
+        order = self.orders.get(order_id)
+        if order is None:
+            return
+        side, price, left = order
+        if qty is None or qty > left:
+            qty = left
+        left -= qty
+        if price > 0:
+            side.remove(price, qty, left == 0)
+        if left == 0:
+            del self.orders[order_id]
+        else:
+            order[2] = left
+
+    # ---------------- 查询 ----------------
+    def top(self) -> tuple:
+        """(买一价, 买一量, 卖一价, 卖一量)，O(1)"""
+        bids, asks = self.bids, self.asks
+        return bids.best_price(), bids.best_qty(), asks.best_price(), asks.best_qty()
+
+    def depth(self, n: int = 10) -> dict:
+        bid_px, bid_qty = self.bids.depth(n)
+        ask_px, ask_qty = self.asks.depth(n)
+        return {
+            "kind":       "book",
+            "symbol":     self.symbol,
+            "SecurityID": self.symbol,
+            "exch_id":    self.exch_id,
+            "time":       self.time,
+            "ApplSeqNum": self.seq,
+            "last_price": self.last_price,
+            "volume":     self.volume,
+            "bid_px":     bid_px,
+            "bid_qty":    bid_qty,
+            "ask_px":     ask_px,
+            "ask_qty":    ask_qty,
+        }
+
+    def verify(self, bid_px, bid_qty, ask_px, ask_qty) -> int:
+        """
+        与交易所十档快照比对，返回不一致的档位数（0 表示完全一致）
+        - 只比对快照中价格非 0 的档位；快照与逐笔的时间点需一致，比对才有意义
+        """
+        mismatched = 0
+        for side, prices, qtys in ((self.bids, bid_px, bid_qty), (self.asks, ask_px, ask_qty)):
+            n = sum(1 for p in prices if p)
+            book_px, book_qty = side.depth(n)
+            for k in range(n):
+                if k >= len(book_px) or book_px[k] != prices[k] or book_qty[k] != qtys[k]:
+                    mismatched += 1
+        return mismatched
+
+    def __repr__(self):
+        bid, bid_qty, ask, ask_qty = self.top()
+        return f"<OrderBook {self.symbol} | {bid}x{bid_qty} / {ask}x{ask_qty} | 委托 {len(self.orders)}>"
+
+
+def _snapshot_levels(data):
+    """
+    从快照事件数据取十档 (买价, 买量, 卖价, 卖量)
+    - SnapshotRow：NumPy 档位数组；SnapshotView：BidLevels / OfferLevels 结构体数组
+    - 普通快照字典不含档位，返回 None
+    """
+    if hasattr(data, "bid_px"):
+        return data.bid_px.tolist(), data.bid_qty.tolist(), data.ask_px.tolist(), data.ask_qty.tolist()
+    bids = data.get("BidLevels")
+    asks = data.get("OfferLevels")
+    if bids is None or asks is None:
+        return None
+    return ([lv.Price for lv in bids], [lv.OrderQty for lv in bids],
+            [lv.Price for lv in asks], [lv.OrderQty for lv in asks])
+
+
+class OrderBookManager:
+    """
+    按标的维护 OrderBook：消费 MARKET_TICK 逐笔事件，发布 ORDER_BOOK 深度事件
+
+    - 批量入口 on_events()：一批逐笔处理完后，每个有变化的标的只发布一次 ORDER_BOOK（天然合并）
+    - on_snapshot()：收到带十档盘口的快照（SnapshotRow / SnapshotView）时与重建结果比对，计入统计
+    """
+
+    def __init__(self, event_engine=None, depth: int = 10, price_tick: int = 100, publish: bool = True):
+        """
+        :param depth: ORDER_BOOK 事件中每侧的档位数
+        :param price_tick: 价位网格间距（MDS 价格单位）
+        :param publish: 是否发布 ORDER_BOOK 事件（False 时只维护委托簿，供主动查询）
+        """
+        self.event_engine = event_engine
+        self.depth = depth
+        self.price_tick = price_tick
+        self.publish = publish and event_engine is not None
+        self.books: dict[str, OrderBook] = {}
+        self.ticks = 0
+        self.verified = 0
+        self.mismatched = 0
+
+    def register(self, event_engine=None):
+        ee = event_engine or self.event_engine
+        ee.register_batch(EventType.MARKET_TICK, self.on_events)
+        ee.register_batch(EventType.MARKET_SNAPSHOT, self.on_snapshots)
+
+    def book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol, price_tick=self.price_tick)
+        return book
+
+    # ---------------- 事件入口 ----------------
+    def on_event(self, event):
+        self.on_events([event])
+
+    def on_events(self, events: list):
+        touched = {}
+        books = self.books
+        applied = 0
+        for event in events:
+            tick = event.data
+            kind = tick.get("kind")
+            if kind != "trade" and kind != "order":
+                continue
+            symbol = tick["symbol"]
+            book = books.get(symbol) or self.book(symbol)
+            book.apply(tick)
+            touched[symbol] = event.recv_ns
+            applied += 1
+        self.ticks += applied
+        if self.publish:
+            for symbol, recv_ns in touched.items():
+                self.event_engine.put(event_pool.acquire(
+                    EventType.ORDER_BOOK, books[symbol].depth(self.depth), "ORDER_BOOK_BUILDER", recv_ns))
+
+    def on_snapshot(self, event):
+        self.on_snapshots([event])
+
+    def on_snapshots(self, events: list):
+        for event in events:
+            data = event.data
+            book = self.books.get(data.get("symbol"))
+            if book is None:
+                continue
+            levels = _snapshot_levels(data)
+            if levels is None:
+                continue
+            self.verified += 1
+            if book.verify(*levels):
+                self.mismatched += 1
+
+    def stats(self) -> dict:
+        return {
+            "books": len(self.books),
+            "orders": sum(len(b.orders) for b in self.books.values()),
+            "ticks": self.ticks,
+            "verified": self.verified,
+            "mismatched": self.mismatched,
+        }
@@ -0,0 +1,226 @@
+# src/market/snapshot_columns.py
+
+import ctypes
+from array import array
+
+import numpy as np
+
+_MISSING = object()
+
+
+def ctypes_dtype(ctype) -> np.dtype:
+    """
+    按 ctypes 类型生成内存布局完全一致的 NumPy dtype（字段偏移、对齐、总长度均与 C 结构体相同）
+    - 结构体 / 联合体 -> 结构化 dtype（联合体成员共享偏移 0）
+    - c_char 数组 -> 定长字节串 'S<n>'，其它数组 -> 子数组
+    """
+    if issubclass(ctype, (ctypes.Structure, ctypes.Union)):
+        names, formats, offsets = [], [], []
+        for field in ctype._fields_:
+            name, ftype = field[0], field[1]
+            names.append(name)
+            formats.append(ctypes_dtype(ftype))
+            offsets.append(getattr(ctype, name).offset)
+        return np.dtype({"names": names, "formats": formats, "offsets": offsets,
+                         "itemsize": ctypes.sizeof(ctype)})
+    if issubclass(ctype, ctypes.Array):
+        if ctype._type_ is ctypes.c_char:
+            return np.dtype(f"S{ctype._length_}")
+        return np.dtype((ctypes_dtype(ctype._type_), (ctype._length_,)))
+    return np.dtype(ctype)
+
+
+def snapshot_dtype(snapshot_type, body_name: str = "l2Stock") -> np.dtype:
+    """
+    MdsMktDataSnapshotT 的记录 dtype：快照头 head + 指定的快照体（默认 l2Stock 即 MdsL2StockSnapshotBodyT）
+    - 两个字段的偏移与 C 结构体一致，一次 memmove 即可整体拷贝
+    """
+    sample = snapshot_type()
+    head_type = type(sample.head)
+    body_type = type(getattr(sample, body_name))
+    offset = getattr(snapshot_type, body_name).offset
+    return np.dtype({
+        "names": ["head", body_name],
+        "formats": [ctypes_dtype(head_type), ctypes_dtype(body_type)],
+        "offsets": [0, offset],
+        "itemsize": offset + ctypes.sizeof(body_type),
+    })
+
+
+class SnapshotColumns:
+    """
+    L2 快照列式缓存：每条快照一次 memmove 拷贝进预分配的 NumPy 结构化数组的一行
+
+    - dtype 由 ctypes 结构体（MdsMktDataSnapshotHeadT + MdsL2StockSnapshotBodyT）自动生成，
+      不逐字段读取 ctypes 属性，也不构建字典
+    - 行按环形方式复用（capacity 行），append() 返回该行的只读视图 SnapshotRow
+    - 拷贝发生在 SPI 回调内，因此在 copy_args=False 时同样安全，且可省去分派器的整体 memcpy
+    - column() 以数组形式读取整列，便于向量化计算
+    """
+
+    def __init__(self, capacity: int = 65536, snapshot_type=None, body_name: str = "l2Stock"):
+        """
+        :param capacity: 环形缓存行数；排队中的事件多于该值时旧行会被覆盖（读取时报错）
+        :param snapshot_type: 快照 ctypes 类型，缺省时在第一条快照到达时按其类型生成 dtype
+        :param body_name: 快照体在联合体中的成员名
+        """
+        self.capacity = capacity
+        self.body_name = body_name
+        self.dtype = None
+        self.records = None
+        self.count = 0
+        self._seqs = array("q", [-1]) * capacity
+        self._columns: dict = {}
+        if snapshot_type is not None:
+            self._allocate(snapshot_type)
+
+    def _allocate(self, snapshot_type):
+        self.dtype = snapshot_dtype(snapshot_type, self.body_name)
+        self.records = np.zeros(self.capacity, dtype=self.dtype)
+        self._itemsize = self.dtype.itemsize
+        self._base = self.records.ctypes.data
+        self._head = self.records["head"]
+        self._body = self.records[self.body_name]
+
+    def append(self, snapshot) -> "SnapshotRow":
+        if self.records is None:
+            self._allocate(type(snapshot))
+        seq = self.count
+        row = seq % self.capacity
+        # seqlock：memmove 期间会释放 GIL，先标记写入中，读取方拷贝后校验序号
+        self._seqs[row] = -1
+        ctypes.memmove(self._base + row * self._itemsize, ctypes.addressof(snapshot), self._itemsize)
+        self._seqs[row] = seq
+        self.count = seq + 1
+        return SnapshotRow(self, row, seq)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _column(self, name: str):
+        """按字段名取整列（快照体优先，其次快照头）；不存在时返回 None"""
+        col = self._columns.get(name, _MISSING)
+        if col is _MISSING:
+            col = None
+            for part in (self._body, self._head):
+                if name in part.dtype.names:
+                    col = part[name]
+                    break
+            self._columns[name] = col
+        return col
+
+    def _level_column(self, side: str, field: str):
+        """盘口档位列，形状 (capacity, 10)"""
+        key = (side, field)
+        col = self._columns.get(key)
+        if col is None:
+            col = self._columns[key] = self._body[side][field]
+        return col
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        整列数组（按写入先后排序，仅包含仍在缓存中的行），如 column("TradePx")、column("updateTime")
+        """
+        col = self._column(name)
+        if col is None:
+            raise KeyError(name)
+        n = len(self)
+        start = self.count % self.capacity if self.count > self.capacity else 0
+        if start == 0:
+            return col[:n]
+        return np.concatenate((col[start:], col[:start]))
+
+
+def _scalar(value):
+    value = value.item() if hasattr(value, "item") and getattr(value, "ndim", 0) == 0 else value
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# 与 MarketEventHandler._extract_common_snapshot 生成的字典键保持一致
+_ALIASES = {
+    "symbol":      "SecurityID",
+    "last_price":  "TradePx",
+    "最新价":       "TradePx",
+    "volume":      "TotalVolumeTraded",
+    "trade_date":  "tradeDate",
+    "update_time": "updateTime",
+}
+
+
+class SnapshotRow:
+    """
+    SnapshotColumns 中一行的只读视图
+
+    - get() / [] 与快照字典键一致，并可按原始字段名读取（TradePx、NumTrades、updateTime 等）
+    - bid_px / bid_qty / ask_px / ask_qty 为十档盘口数组（每次读取拷贝一份，无逐档属性访问）
+    - 每次读取先拷贝值再校验行序号：行正在被写入或已被环形缓存覆盖时抛出 LookupError，不会返回半新半旧的数据
+    """
+    __slots__ = ("_table", "_row", "_seq")
+
+    def __init__(self, table: SnapshotColumns, row: int, seq: int):
+        self._table = table
+        self._row = row
+        self._seq = seq
+
+    def _check(self):
+        if self._table._seqs[self._row] != self._seq:
+            raise LookupError("快照行已被环形缓存覆盖，请增大 SnapshotColumns.capacity")
+
+    # ---------------- 字典接口 ----------------
+    def get(self, key, default=None):
+        col = self._table._column(_ALIASES.get(key, key))
+        if col is None:
+            return default
+        value = col[self._row]      # NumPy 标量 / bytes，已与缓存脱离
+        self._check()
+        return _scalar(value)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self._table._column(_ALIASES.get(key, key)) is not None
+
+    def __setitem__(self, key, value):
+        raise TypeError("SnapshotRow 为只读视图，如需修改请先调用 to_dict()")
+
+    def keys(self):
+        return ("symbol", "last_price", "volume", "trade_date", "update_time", "SecurityID", "TradePx", "最新价")
+
+    def to_dict(self) -> dict:
+        return {key: self.get(key) for key in self.keys()}
+
+    # ---------------- 盘口数组 ----------------
+    @property
+    def record(self):
+        """整行结构化记录（NumPy void，字段与 C 结构体一致）"""
+        record = self._table.records[self._row].copy()
+        self._check()
+        return record
+
+    def _levels(self, side: str, field: str) -> np.ndarray:
+        levels = self._table._level_column(side, field)[self._row].copy()
+        self._check()
+        return levels
+
+    @property
+    def bid_px(self) -> np.ndarray:
+        return self._levels("BidLevels", "Price")
+
+    @property
+    def bid_qty(self) -> np.ndarray:
+        return self._levels("BidLevels", "OrderQty")
+
+    @property
+    def ask_px(self) -> np.ndarray:
+        return self._levels("OfferLevels", "Price")
+
+    @property
+    def ask_qty(self) -> np.ndarray:
+        return self._levels("OfferLevels", "OrderQty")
+
+    def __repr__(self):
+        return f"<SnapshotRow | row={self._row} seq={self._seq}>"
@@ -0,0 +1,106 @@
+# src/market/snapshot_view.py
+
+_MISSING = object()
+
+
+def _symbol(view):
+    symbol = view._symbol
+    if symbol is None:
+        symbol = view._symbol = view._body.SecurityID.decode()
+    return symbol
+
+
+# 与 MarketEventHandler._extract_common_snapshot 生成的字典键保持一致
+_FIELDS = {
+    "symbol":      _symbol,
+    "SecurityID":  _symbol,
+    "last_price":  lambda v: v._body.TradePx,
+    "最新价":       lambda v: v._body.TradePx,
+    "volume":      lambda v: v._body.TotalVolumeTraded,
+    "trade_date":  lambda v: v._head.tradeDate,
+    "update_time": lambda v: v._head.updateTime,
+    "TradePx":     lambda v: v._body.TradePx,
+}
+
+
+class SnapshotView:
+    """
+    行情快照只读视图：直接读取底层 ctypes 快照结构体，不在 SPI 回调线程上构建字典
+
+    - 提供与快照字典相同的 get() / [] 接口，常用键（symbol、last_price、SecurityID 等）
+      与 _extract_common_snapshot 一致；其它键按原始字段名读取（如 TradePx、BidLevels），
+      先查快照体再查快照头，bytes 字段自动解码
+    - 视图持有快照结构体，进而持有分派器缓冲池中的缓冲（ctypes 成员通过 _b_base_ 引用所属缓冲）：
+      构造时（SPI 回调内）对缓冲 retain()，事件在队列中排队期间缓冲不会被后续行情覆盖；
+      视图释放时 release()，缓冲归还缓冲池
+    - 只能配合 copy_args=True / "pool" 使用：copy_args=False 时结构体指向 API 异步队列内存，
+      延后读取会读到被覆盖的数据
+    """
+    __slots__ = ("_snap", "_head", "_body", "_symbol", "_root")
+
+    def __init__(self, snapshot, body_name: str = "l2Stock"):
+        self._snap = snapshot
+        self._head = snapshot.head
+        self._body = getattr(snapshot, body_name)
+        self._symbol = None
+        root = snapshot
+        while getattr(root, "_b_base_", None) is not None:
+            root = root._b_base_
+        pool = getattr(root, "_pool", None)
+        self._root = pool.retain(root) if pool is not None else None
+
+    # ---------------- 字典接口 ----------------
+    def get(self, key, default=None):
+        getter = _FIELDS.get(key)
+        if getter is not None:
+            return getter(self)
+        if key.startswith("_"):
+            return default
+        value = getattr(self._body, key, _MISSING)
+        if value is _MISSING:
+            value = getattr(self._head, key, _MISSING)
+            if value is _MISSING:
+                return default
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        raise TypeError("SnapshotView 为只读视图，如需修改请先调用 to_dict()")
+
+    def keys(self):
+        return _FIELDS.keys()
+
+    def to_dict(self) -> dict:
+        """物化为普通字典（与 _extract_common_snapshot 的结果相同）"""
+        return {key: getter(self) for key, getter in _FIELDS.items()}
+
+    # ---------------- 缓冲回收 ----------------
+    def release(self):
+        """
+        释放对快照结构体的引用，并释放对分派器缓冲的所有权，最后一个持有者释放时缓冲归还缓冲池
+        （由 __del__ 自动调用，一般无需手动调用）
+        """
+        if self._snap is None:
+            return
+        root = self._root
+        self._snap = self._head = self._body = self._root = None
+        if root is not None:
+            root._pool.release(root)
+
+    def __del__(self):
+        self.release()
+
+    def __repr__(self):
+        if self._snap is None:
+            return "<SnapshotView | 已释放>"
+        return f"<SnapshotView | {self.to_dict()}>"
@@ -0,0 +1,3 @@
+# ------------- src/monitor/__init__.py -------------
+from .latency import LatencyHistogram, LatencyTracker, latency_tracker
+# --------------------------------------------------------
@@ -0,0 +1,215 @@
+# src/monitor/latency.py
+
+import csv
+import os
+import threading
+import time
+from array import array
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger("Latency")
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的对数-线性延迟直方图（纳秒）
+    - 每个 2 的幂区间再细分 2**sub_bits 个子桶，相对误差约 1/2**sub_bits
+    - 计数存放在预分配的 array('q') 中，record() 为 O(1) 且不分配对象
+    """
+
+    def __init__(self, sub_bits: int = 5, max_ns: int = 1 << 40):
+        self.sub_bits = sub_bits
+        self._sub = 1 << sub_bits
+        self._max_ns = max_ns
+        self._counts = array("q", [0]) * (self._index(max_ns) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, v: int) -> int:
+        sub = self._sub
+        if v < sub:
+            return v
+        shift = v.bit_length() - self.sub_bits - 1
+        return (shift + 1) * sub + (v >> shift) - sub
+
+    def _lower_bound(self, idx: int) -> int:
+        sub = self._sub
+        if idx < sub:
+            return idx
+        shift = idx // sub - 1
+        return (idx % sub + sub) << shift
+
+    def _upper_bound(self, idx: int) -> int:
+        return self._lower_bound(idx + 1) - 1
+
+    def record(self, ns: int):
+        if ns < 0:
+            ns = 0
+        elif ns > self._max_ns:
+            ns = self._max_ns
+        self._counts[self._index(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p: float) -> int:
+        """返回第 p 百分位（0~100）所在桶的上界"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * p / 100 + 0.5))
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    return min(self._upper_bound(idx), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram"):
+        for idx, c in enumerate(other._counts):
+            if c:
+                self._counts[idx] += c
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "min": self.min or 0,
+            "mean": round(self.mean()),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p99.9": self.percentile(99.9),
+            "max": self.max,
+        }
+
+
+class LatencyTracker:
+    """
+    逐跳延迟统计：行情从 SPI 回调到策略 / 账户处理完成的各阶段耗时
+
+    阶段命名:
+    - exchange->receive              交易所行情时间（head.updateTime）到本地接收（毫秒精度）
+    - receive->enqueue               SPI 接收到事件投递进 EventEngine 队列
+    - enqueue->dequeue               队列等待
+    - dispatch:<事件类型>             事件线程调用所有回调的耗时
+    - receive->done:<事件类型>        接收到回调全部完成（端到端）
+    - tick->done:<事件类型>           派生事件（如策略信号）从源头行情接收到处理完成
+    """
+
+    def __init__(self):
+        self.enabled = False
+        # 每个线程一份直方图（分片事件线程、行情回调线程并发记录时互不争用），汇总时合并
+        self._local = threading.local()
+        self._shards: list[dict[str, LatencyHistogram]] = []
+        self._lock = threading.Lock()
+        self._names: dict = {}
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        """当前线程的该阶段直方图"""
+        stages = getattr(self._local, "stages", None)
+        if stages is None:
+            stages = self._local.stages = {}
+            with self._lock:
+                self._shards.append(stages)
+        h = stages.get(stage)
+        if h is None:
+            h = stages[stage] = LatencyHistogram()
+        return h
+
+    def merged(self) -> dict[str, LatencyHistogram]:
+        """合并各线程的直方图"""
+        merged: dict[str, LatencyHistogram] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for stages in shards:
+            for stage, h in list(stages.items()):
+                if stage not in merged:
+                    merged[stage] = LatencyHistogram(h.sub_bits, h._max_ns)
+                merged[stage].merge(h)
+        return merged
+
+    def record(self, stage: str, ns: int):
+        self.histogram(stage).record(ns)
+
+    def record_exchange(self, update_time: int, wall_ns: Optional[int] = None):
+        """记录交易所行情时间（HHMMSSsss）到本地接收的延迟"""
+        if not update_time:
+            return
+        wall_ns = wall_ns or time.time_ns()
+        hh, rem = divmod(update_time, 10_000_000)
+        mm, rem = divmod(rem, 100_000)
+        ss, ms = divmod(rem, 1000)
+        exch_ms = ((hh * 60 + mm) * 60 + ss) * 1000 + ms
+        lt = time.localtime(wall_ns // 1_000_000_000)
+        local_ms = ((lt.tm_hour * 60 + lt.tm_min) * 60 + lt.tm_sec) * 1000 \
+            + (wall_ns // 1_000_000) % 1000
+        self.record("exchange->receive", (local_ms - exch_ms) * 1_000_000)
+
+    def _stage_names(self, event_type) -> tuple[str, str, str]:
+        names = self._names.get(event_type)
+        if names is None:
+            label = getattr(event_type, "name", str(event_type))
+            names = (f"dispatch:{label}", f"receive->done:{label}", f"tick->done:{label}")
+            self._names[event_type] = names
+        return names
+
+    def record_event(self, event, deq_ns: int, done_ns: int):
+        """由 EventEngine 在事件分发完成后调用"""
+        dispatch, e2e, tick_e2e = self._stage_names(event.type)
+        enq_ns = event.enq_ns
+        if enq_ns:
+            self.record("receive->enqueue", enq_ns - event.recv_ns)
+            self.record("enqueue->dequeue", deq_ns - enq_ns)
+        self.record(dispatch, done_ns - deq_ns)
+        if event.origin_ns:
+            self.record(tick_e2e, done_ns - event.origin_ns)
+        else:
+            self.record(e2e, done_ns - event.recv_ns)
+
+    def summaries(self) -> dict[str, dict]:
+        return {stage: h.summary() for stage, h in sorted(self.merged().items()) if h.count}
+
+    def report(self):
+        logger.info("⏱️  [延迟统计] 单位: 微秒")
+        for stage, s in self.summaries().items():
+            logger.info("  - %-28s n=%-8d p50=%-9.1f p99=%-9.1f p99.9=%-9.1f max=%.1f",
+                        stage, s["count"], s["p50"] / 1000, s["p99"] / 1000,
+                        s["p99.9"] / 1000, s["max"] / 1000)
+
+    def to_csv(self, path: str):
+        """导出各阶段分位数（纳秒）到 CSV"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fields = ["stage", "count", "min", "mean", "p50", "p90", "p99", "p99.9", "max"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for stage, s in self.summaries().items():
+                writer.writerow({"stage": stage, **s})
+        logger.info("💾 延迟统计已导出至 %s", path)
+
+    def reset(self):
+        with self._lock:
+            for stages in self._shards:
+                stages.clear()
+
+
+# 进程级延迟统计（默认关闭，由 settings.yaml latency.enabled 打开）
+latency_tracker = LatencyTracker()
@@ -0,0 +1,210 @@
+# src/record/raw_journal.py
+"""
+原始行情日志：按到达顺序记录 MDS 行情回调收到的消息头 + 消息体原始字节，回放时原样送回 MdsMsgDispatcher
+
+文件结构（小端）:
+    <path>      文件头 16 字节（MAGIC + 版本） + 记录...
+                记录: [u32 记录总长][i64 接收时间 ns][u16 msgId][u16 消息头长度][u32 消息体长度][消息头][消息体]
+                      记录按 8 字节对齐，总长为 0 表示数据结束（预分配区域全为 0）
+    <path>.idx  索引，每条记录一项: [i64 接收时间 ns][u16 msgId][i64 记录偏移]（numpy 可直接按 INDEX_DTYPE 读取）
+
+- 写入端用 mmap 追加，容量不足时按 chunk_size 扩容并重新映射；close() 时截断到实际长度
+- 消息体长度取消息头 msgSize，只记录有效字节（不是整个联合体）
+- 读取端 mmap 整个文件，逐条把字节拷回复用的消息头 / 消息体缓冲后调用派发器，不经过网络
+"""
+
+import ctypes
+import mmap
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"MDSJRNL\0"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sII")          # MAGIC, 版本, 保留
+RECORD = struct.Struct("<IqHHI")             # 记录总长, 接收时间 ns, msgId, 消息头长度, 消息体长度
+INDEX = struct.Struct("<qHq")                # 接收时间 ns, msgId, 记录偏移
+INDEX_DTYPE = np.dtype([("ts", "<i8"), ("msg_id", "<u2"), ("offset", "<i8")])
+ALIGN = 8
+
+
+class RawJournalWriter:
+    """
+    原始行情日志写入器（挂到 MdsMsgDispatcher.set_journal，在行情回调线程中调用 record）
+
+    - record() 从回调指针直接 memmove 到映射内存，消息体不经过 bytes 中转
+    - 多个通道（多个回调线程）可共用一个写入器，内部加锁
+    - 索引先写入带缓冲的文件，flush() / close() 时落盘
+    """
+
+    def __init__(self, path, chunk_size: int = 64 << 20):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w+b")
+        self._index = open(f"{self.path}.idx", "wb")
+        self._capacity = 0
+        self._mm = None
+        self._base = 0
+        self._pos = FILE_HEADER.size
+        self._grow(chunk_size)
+        FILE_HEADER.pack_into(self._mm, 0, MAGIC, VERSION, 0)
+        self.records = 0
+        self.closed = False
+
+    def _grow(self, need: int):
+        if self._mm is not None:
+            self._anchor = None
+            self._mm.flush()
+            self._mm.close()
+        self._capacity = max(self._capacity + self.chunk_size, need)
+        self._file.truncate(self._capacity)
+        self._mm = mmap.mmap(self._file.fileno(), self._capacity)
+        self._anchor = ctypes.c_char.from_buffer(self._mm)
+        self._base = ctypes.addressof(self._anchor)
+
+    def record(self, p_msg_head, p_msg_item, recv_ns: int = None):
+        """
+        记录一条行情消息
+        :param p_msg_head: 消息头指针（POINTER(SMsgHeadT)）
+        :param p_msg_item: 消息体指针，长度取消息头 msgSize
+        :param recv_ns: 接收时间（默认 time.time_ns()）
+        """
+        head = p_msg_head.contents
+        head_len = ctypes.sizeof(head)
+        body_len = head.msgSize if p_msg_item else 0
+        if body_len < 0:
+            body_len = 0
+        size = (RECORD.size + head_len + body_len + ALIGN - 1) & ~(ALIGN - 1)
+        if recv_ns is None:
+            recv_ns = time.time_ns()
+
+        with self._lock:
+            if self.closed:
+                return
+            pos = self._pos
+            if pos + size + RECORD.size > self._capacity:
+                self._grow(pos + size + RECORD.size)
+            addr = self._base + pos + RECORD.size
+            ctypes.memmove(addr, p_msg_head, head_len)
+            if body_len:
+                ctypes.memmove(addr + head_len, p_msg_item, body_len)
+            RECORD.pack_into(self._mm, pos, size, recv_ns, head.msgId, head_len, body_len)
+            self._index.write(INDEX.pack(recv_ns, head.msgId, pos))
+            self._pos = pos + size
+            self.records += 1
+
+    def flush(self):
+        with self._lock:
+            if not self.closed:
+                self._mm.flush()
+                self._index.flush()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._anchor = None
+            self._mm.flush()
+            self._mm.close()
+            self._file.truncate(self._pos)
+            self._file.close()
+            self._index.close()
+
+    def stats(self) -> dict:
+        return {"records": self.records, "bytes": self._pos, "capacity": self._capacity}
+
+
+class RawJournalReader:
+    """
+    原始行情日志读取 / 回放
+
+    - 整个文件只读映射（写时复制），消息头 / 消息体从映射内存直接 memmove 到复用缓冲
+    - replay() 调用 dispatcher.replay_mkt_data_msg(消息头指针, 消息体指针)，
+      与实盘回调一样经过 MdsMsgDispatcher 的派发表和 SPI 的解码逻辑
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, _ = FILE_HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            self._file.close()
+            raise ValueError(f"❌ 不是原始行情日志文件: {self.path}")
+        self.version = version
+        self._anchor = ctypes.c_char.from_buffer(self._mm)
+        self._base = ctypes.addressof(self._anchor)
+
+    def __iter__(self):
+        """逐条返回 (接收时间 ns, msgId, 消息头偏移, 消息头长度, 消息体长度)"""
+        mm = self._mm
+        end = len(mm)
+        pos = FILE_HEADER.size
+        unpack_from = RECORD.unpack_from
+        while pos + RECORD.size <= end:
+            size, recv_ns, msg_id, head_len, body_len = unpack_from(mm, pos)
+            if not size or pos + size > end:
+                break
+            yield recv_ns, msg_id, pos + RECORD.size, head_len, body_len
+            pos += size
+
+    def index(self) -> np.ndarray:
+        """读取索引（INDEX_DTYPE 结构化数组）；索引文件缺失或不完整时扫描日志重建"""
+        idx_path = Path(f"{self.path}.idx")
+        if idx_path.exists():
+            n = idx_path.stat().st_size // INDEX.size
+            index = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=n)
+            if n and index["offset"][-1] + RECORD.size <= len(self._mm):
+                return index
+        return np.array([(ts, msg_id, off - RECORD.size) for ts, msg_id, off, _, _ in self],
+                        dtype=INDEX_DTYPE)
+
+    def replay(self, dispatcher, speed: float = 0.0, msg_ids=None, head_type=None, body_type=None) -> int:
+        """
+        回放全部记录，返回回放条数
+        :param dispatcher: 提供 replay_mkt_data_msg(p_msg_head, p_msg_item) 的派发器（MdsMsgDispatcher）
+        :param speed: 0 表示尽快回放；>0 按接收时间间隔 / speed 控制节奏（1 为实时）
+        :param msg_ids: 只回放这些 msgId（None 表示全部）
+        :param head_type / body_type: 消息头 / 消息体缓冲类型，默认 SMsgHeadT / MdsMktRspMsgBodyT
+        """
+        if head_type is None or body_type is None:
+            from quote_api.model import SMsgHeadT, MdsMktRspMsgBodyT
+            head_type = head_type or SMsgHeadT
+            body_type = body_type or MdsMktRspMsgBodyT
+        head, body = head_type(), body_type()
+        p_head, p_body = ctypes.pointer(head), ctypes.pointer(body)
+        head_addr, body_addr = ctypes.addressof(head), ctypes.addressof(body)
+        head_cap, body_cap = ctypes.sizeof(head), ctypes.sizeof(body)
+        memmove, base = ctypes.memmove, self._base
+        wanted = set(msg_ids) if msg_ids is not None else None
+        handle = dispatcher.replay_mkt_data_msg
+
+        count = 0
+        first_ns = start = None
+        for recv_ns, msg_id, off, head_len, body_len in self:
+            if wanted is not None and msg_id not in wanted:
+                continue
+            if speed > 0:
+                if first_ns is None:
+                    first_ns, start = recv_ns, time.perf_counter_ns()
+                wait = (recv_ns - first_ns) / speed - (time.perf_counter_ns() - start)
+                if wait > 0:
+                    time.sleep(wait / 1e9)
+            memmove(head_addr, base + off, min(head_len, head_cap))
+            if body_len:
+                memmove(body_addr, base + off + head_len, min(body_len, body_cap))
+            handle(p_head, p_body)
+            count += 1
+        return count
+
+    def close(self):
+        self._anchor = None
+        self._mm.close()
+        self._file.close()
@@ -22,22 +22,33 @@ class SignalRecorder:
             csv.writer(f).writerow(self.CSV_HEADER)
 
     def on_event(self, event):
-        if event.type != EventType.STRATEGY_SIGNAL:
+        self.on_events([event])
+
+    def on_events(self, events: list):
+        """批量入口：整批信号一次打开文件写入"""
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for event in events:
+            if event.type != EventType.STRATEGY_SIGNAL:
+                continue
+            sig = event.data
+            rows.append([
+                ts,
+                sig.get("action"),
+                sig.get("symbol"),
+                sig.get("price"),
+                event.source
+            ])
+        if not rows:
             return
-        sig = event.data
-        row = [
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            sig.get("action"),
-            sig.get("symbol"),
-            sig.get("price"),
-            event.source
-        ]
-        self.records.append(row)
+
+        self.records.extend(rows)
         with open(self.output_path, "a", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerow(row)
+            csv.writer(f).writerows(rows)
 
         if self.verbose:
-            logger.info("📝 信号记录 %s", row)
+            for row in rows:
+                logger.info("📝 信号记录 %s", row)
 
     def print_signals(self):
         logger.info("🗒️  [信号记录]")
@@ -0,0 +1,169 @@
+# src/record/tick_store.py
+"""
+列式行情存储：按消息类型固定 schema，按交易日分区追加写 Parquet
+
+目录结构（hive 分区，DataLoader.load_ticks 可按交易日裁剪）:
+    <root>/<kind>/date=<交易日>/part-<序号>.parquet
+    kind: snapshot（MARKET_SNAPSHOT）/ trade（逐笔成交）/ order（逐笔委托）
+每个 row group 内按 SecurityID、时间排序，按标的过滤时借助 row group 统计信息跳过无关数据块
+（不再按标的分目录：全市场数千个标的会产生海量小文件与小 row group）
+
+依赖 pyarrow（可选依赖，pip install pyarrow）；未安装时构造 ParquetTickStore 会报错，CSV 落盘不受影响
+"""
+
+import itertools
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# 各消息类型的固定 schema（字段名与 MarketEventHandler 发布的字典键一致；缺失字段写空值，多余字段忽略）
+SCHEMAS = {
+    "snapshot": [
+        ("SecurityID", "string"), ("trade_date", "int32"), ("update_time", "int32"),
+        ("last_price", "int64"), ("volume", "int64"),
+    ],
+    "trade": [
+        ("SecurityID", "string"), ("exch_id", "int8"), ("trade_date", "int32"), ("time", "int32"),
+        ("ChannelNo", "int32"), ("ApplSeqNum", "int64"), ("SseBizIndex", "int64"),
+        ("ExecType", "string"), ("TradeBSFlag", "string"), ("TradePx", "int64"), ("TradeQty", "int64"),
+        ("TradeMoney", "int64"), ("BidApplSeqNum", "int64"), ("OfferApplSeqNum", "int64"),
+    ],
+    "order": [
+        ("SecurityID", "string"), ("exch_id", "int8"), ("trade_date", "int32"), ("time", "int32"),
+        ("ChannelNo", "int32"), ("ApplSeqNum", "int64"), ("SseBizIndex", "int64"), ("SseOrderNo", "int64"),
+        ("Side", "string"), ("OrderType", "string"), ("Price", "int64"), ("OrderQty", "int64"),
+    ],
+}
+
+# 各消息类型的时间列（按时间范围过滤时使用）
+TIME_COLUMNS = {"snapshot": "update_time", "trade": "time", "order": "time"}
+
+# row group 内的排序列（SecurityID 之后按时间、序号）
+SORT_COLUMNS = {
+    "snapshot": ["SecurityID", "update_time"],
+    "trade": ["SecurityID", "time", "ApplSeqNum"],
+    "order": ["SecurityID", "time", "ApplSeqNum"],
+}
+
+# 分区字段
+PARTITIONS = [("date", "int32")]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet 行情存储需要 pyarrow，请先 pip install pyarrow")
+
+
+def arrow_schema(fields) -> "pa.Schema":
+    _require_pyarrow()
+    return pa.schema([(name, getattr(pa, type_)()) for name, type_ in fields])
+
+
+class ParquetTickStore:
+    """
+    分区 Parquet 追加写入器
+
+    - write(kind, rows) 按交易日把行追加到该分区的列缓冲，累计到 row_group_size 行才按
+      SecurityID、时间排序后写成一个 row group，不会每批写一个小 row group
+    - 每个分区保持一个打开的 ParquetWriter，按 LRU 最多保留 max_open_files 个；
+      被淘汰（或滚动关闭后再次写入）的分区写入新的 part 文件，不改写已完成的文件
+    - Parquet 文件关闭时才写出 footer，每隔 roll_interval 秒写出缓冲并关闭全部 writer，盘中即可读到已完成的文件
+    - 只在 MarketDataSaver 的写线程中调用，不需要加锁
+    """
+
+    def __init__(self, root_dir, compression: str = "zstd", max_open_files: int = 256,
+                 roll_interval: float = 60.0, row_group_size: int = 65536):
+        """
+        :param row_group_size: 每个分区缓冲到多少行写出一个 row group；滚动 / 关闭时写出不足的部分
+        """
+        _require_pyarrow()
+        self.root_dir = Path(root_dir)
+        self.compression = compression
+        self.max_open_files = max_open_files
+        self.roll_interval = roll_interval
+        self.row_group_size = max(1, int(row_group_size))
+        self._rolled_at = time.monotonic()
+        self._schemas = {kind: arrow_schema(fields) for kind, fields in SCHEMAS.items()}
+        self._writers: OrderedDict = OrderedDict()     # (kind, 交易日) -> ParquetWriter
+        self._buffers: dict = {}                        # (kind, 交易日) -> {列名: 值列表}
+        self._seq = itertools.count()
+        self.rows = 0
+        self.files = 0
+        self.row_groups = 0
+
+    def write(self, kind: str, rows: list):
+        schema = self._schemas.get(kind)
+        if schema is None:
+            raise KeyError(f"未知的行情类型: {kind}")
+        groups: dict = {}
+        for row in rows:
+            groups.setdefault(row.get("trade_date") or 0, []).append(row)
+        names = schema.names
+        for day, group in groups.items():
+            key = (kind, day)
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = {name: [] for name in names}
+            for name, values in buffer.items():
+                values.extend([row.get(name) for row in group])
+            if len(buffer[names[0]]) >= self.row_group_size:
+                self._write_buffer(key, full_only=True)
+        self.rows += len(rows)
+
+    def flush(self):
+        """到达滚动间隔时写出缓冲并关闭全部 writer（写线程每批写完后调用）"""
+        if time.monotonic() - self._rolled_at >= self.roll_interval:
+            self.close()
+
+    def _write_buffer(self, key, full_only: bool = False):
+        """
+        把分区缓冲按 SecurityID、时间排序后写成 row group（每 row_group_size 行一个）
+        :param full_only: 只写出整 row group 的部分（按到达顺序），余下的行留在缓冲中
+        """
+        buffer = self._buffers.pop(key, None)
+        if not buffer:
+            return
+        kind, day = key
+        schema = self._schemas[kind]
+        if full_only:
+            n = len(buffer[schema.names[0]])
+            cut = n - n % self.row_group_size
+            if cut < n:
+                self._buffers[key] = {name: values[cut:] for name, values in buffer.items()}
+                buffer = {name: values[:cut] for name, values in buffer.items()}
+        table = pa.Table.from_pydict(buffer, schema=schema)
+        if not table.num_rows:
+            return
+        table = table.sort_by([(name, "ascending") for name in SORT_COLUMNS[kind]])
+        self._writer(kind, day, schema).write_table(table, row_group_size=self.row_group_size)
+        self.row_groups += -(-table.num_rows // self.row_group_size)
+
+    def _writer(self, kind: str, day, schema) -> "pq.ParquetWriter":
+        key = (kind, day)
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+        path = self.root_dir / kind / f"date={day}"
+        path.mkdir(parents=True, exist_ok=True)
+        filename = f"part-{time.time_ns()}-{next(self._seq)}.parquet"
+        writer = self._writers[key] = pq.ParquetWriter(path / filename, schema, compression=self.compression)
+        self.files += 1
+        while len(self._writers) > self.max_open_files:
+            _, old = self._writers.popitem(last=False)
+            old.close()
+        return writer
+
+    def close(self):
+        for key in list(self._buffers):
+            self._write_buffer(key)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        self._rolled_at = time.monotonic()
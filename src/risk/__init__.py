@@ -0,0 +1,3 @@
+# ------------- src/risk/__init__.py -------------
+from .risk_engine import PreTradeRiskEngine
+# --------------------------------------------------------
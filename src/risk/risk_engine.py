@@ -0,0 +1,238 @@
+# src/risk/risk_engine.py
+"""
+事前风控：订阅 STRATEGY_SIGNAL，逐笔检查后放行为 ORDER_SUBMIT 或拒绝并发出 RISK_ALERT
+
+- 每个标的一份缓存状态（最新价 / 持仓 / 持仓名义金额 / 在途买单 / 限速令牌），检查只做字典查找与算术，O(1)，与标的数、历史委托数无关
+- 持仓按账户的成交回报（ORDER_FILLED）对账：买入按成交数量 / 金额增加，卖出按持仓均价释放金额；
+  已放行、尚未回报的买单记为在途，持仓类限额按 持仓 + 在途 检查，回报到达（含未成交、部分成交）时释放在途额度
+- 单标的限额可在 symbols 中覆盖，创建该标的状态时一次解析
+- 自身耗时（信号进入到放行 / 拒绝事件投递完成）记入 LatencyHistogram，stats() / report() 输出分位数
+"""
+
+import time
+from typing import Optional
+
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+from src.monitor.latency import LatencyHistogram, latency_tracker
+from utils.logger import get_logger
+
+logger = get_logger("Risk")
+
+# 可在 symbols 中按标的覆盖的限额
+SYMBOL_LIMITS = ("max_order_qty", "max_order_notional", "max_position", "max_position_notional",
+                 "max_symbol_orders_per_sec", "price_band_pct")
+
+
+class _SymbolState:
+    """单标的风控缓存"""
+
+    __slots__ = ("last_price", "position", "notional", "pending_qty", "pending_notional", "tokens", "refill_ns",
+                 "max_order_qty", "max_order_notional", "max_position", "max_position_notional",
+                 "max_symbol_orders_per_sec", "price_band_pct")
+
+    def __init__(self, limits: dict, now_ns: int):
+        self.last_price = None
+        self.position = 0
+        self.notional = 0.0
+        self.pending_qty = 0            # 已放行未回报的买入数量 / 金额
+        self.pending_notional = 0.0
+        for key in SYMBOL_LIMITS:
+            setattr(self, key, limits.get(key) or 0)
+        self.tokens = float(self.max_symbol_orders_per_sec)
+        self.refill_ns = now_ns
+
+
+class PreTradeRiskEngine:
+    """
+    事前风控引擎（限额为 0 表示不检查）
+
+    - max_order_qty / max_order_notional：单笔委托数量 / 金额上限
+    - max_position / max_position_notional：单标的 持仓 + 在途买单 的数量 / 名义金额上限（只检查买入）
+    - max_gross_notional：全部标的 持仓 + 在途买单 名义金额合计上限（只检查买入）
+    - max_orders_per_sec / max_symbol_orders_per_sec：全局 / 单标的令牌桶限速，桶容量为 1 秒的额度
+    - price_band_pct：委托价偏离最新成交价超过该比例时拒绝；reject_without_price 为真时，没有参考价的标的也拒绝
+    - symbols：{代码: {上述单标的限额}} 覆盖全局值
+    - price_scale：价格单位（信号 / 行情为 MDS 原始价格，即元 × 10000 时填 10000）；
+      金额一律按 价格 × 数量 / price_scale 折算成元后与限额比较
+    """
+
+    def __init__(self, event_engine, config: Optional[dict] = None, name: str = "PreTradeRisk"):
+        config = dict(config or {})
+        self.event_engine = event_engine
+        self.name = name
+        self.limits = {key: config.get(key, 0) for key in SYMBOL_LIMITS}
+        self.symbol_limits = {str(sym): {**self.limits, **(overrides or {})}
+                              for sym, overrides in (config.get("symbols") or {}).items()}
+        self.max_gross_notional = config.get("max_gross_notional", 0)
+        self.max_orders_per_sec = config.get("max_orders_per_sec", 0)
+        self.reject_without_price = config.get("reject_without_price", False)
+        self.price_scale = config.get("price_scale") or 1
+
+        self._states: dict[str, _SymbolState] = {}
+        self.gross_notional = 0.0
+        self.pending_notional = 0.0
+        self._open: dict[int, tuple] = {}      # id(信号) -> (信号, 标的状态, 在途数量, 在途金额)
+        self._tokens = float(self.max_orders_per_sec)
+        self._refill_ns = time.perf_counter_ns()
+
+        self.passed = 0
+        self.rejected = 0
+        self.rejects: dict[str, int] = {}
+        self.latency = LatencyHistogram()
+
+    # ========== 事件入口 ==========
+    def on_event(self, event: Event):
+        if event.type == EventType.STRATEGY_SIGNAL:
+            self.on_signal(event)
+        elif event.type == EventType.MARKET_SNAPSHOT:
+            self._on_price(event.data)
+        elif event.type == EventType.ORDER_FILLED:
+            self.on_fill(event.data)
+
+    def on_events(self, events: list):
+        for event in events:
+            self.on_event(event)
+
+    def _on_price(self, md: dict):
+        sym, price = md.get("SecurityID"), md.get("TradePx")
+        if sym and price:
+            self._state(sym, time.perf_counter_ns()).last_price = price
+
+    def _state(self, sym: str, now_ns: int) -> _SymbolState:
+        state = self._states.get(sym)
+        if state is None:
+            state = self._states[sym] = _SymbolState(self.symbol_limits.get(sym, self.limits), now_ns)
+        return state
+
+    # ========== 检查 ==========
+    def on_signal(self, event: Event) -> bool:
+        """检查一笔信号：通过则投递 ORDER_SUBMIT（买单计入在途），否则投递 RISK_ALERT，返回是否放行"""
+        t0 = time.perf_counter_ns()
+        sig = event.data
+        sym = sig["symbol"]
+        state = self._state(sym, t0)
+        rule, detail = self.check(sig, state, t0)
+        origin_ns = event.origin_ns or event.recv_ns
+        if rule is None:
+            if sig["action"] == "buy":
+                qty = int(sig.get("volume", 100))
+                notional = sig["price"] * qty / self.price_scale
+                state.pending_qty += qty
+                state.pending_notional += notional
+                self.pending_notional += notional
+                self._open[id(sig)] = (sig, state, qty, notional)
+            self.passed += 1
+            self.event_engine.put(Event(EventType.ORDER_SUBMIT, sig, source=event.source, origin_ns=origin_ns))
+        else:
+            self.rejected += 1
+            self.rejects[rule] = self.rejects.get(rule, 0) + 1
+            self.event_engine.put(Event(
+                type_=EventType.RISK_ALERT,
+                data={
+                    "module": self.name,
+                    "message": f"风控拒绝 {sym} {sig['action']} {sig.get('volume', 100)}@{sig['price']}：{detail}",
+                    "rule": rule,
+                    "symbol": sym,
+                    "signal": sig,
+                },
+                source=event.source,
+                origin_ns=origin_ns,
+            ))
+        elapsed = time.perf_counter_ns() - t0
+        self.latency.record(elapsed)
+        if latency_tracker.enabled:
+            latency_tracker.record("risk:check", elapsed)
+        return rule is None
+
+    def on_fill(self, fill: dict):
+        """
+        成交回报对账（ORDER_FILLED，账户每处理一笔委托发出一次，未成交时 volume 为 0）：
+        释放该委托的在途额度，再按实际成交更新持仓 / 金额
+        """
+        opened = self._open.pop(id(fill.get("order")), None)
+        if opened is not None:
+            _, state, qty, notional = opened
+            state.pending_qty -= qty
+            state.pending_notional -= notional
+            self.pending_notional -= notional
+        qty = fill["volume"]
+        if not qty:
+            return
+        state = self._state(fill["symbol"], time.perf_counter_ns())
+        if fill["action"] == "buy":
+            notional = fill["price"] * qty / self.price_scale
+            state.position += qty
+            state.notional += notional
+            self.gross_notional += notional
+        else:
+            # 卖出按持仓均价释放名义金额
+            released = state.notional * min(qty, state.position) / state.position if state.position else 0.0
+            state.position = max(state.position - qty, 0)
+            state.notional -= released
+            self.gross_notional -= released
+
+    def check(self, sig: dict, state: _SymbolState, now_ns: int) -> tuple[Optional[str], str]:
+        """返回 (规则名, 说明)，通过时规则名为 None；限速令牌只在其余检查都通过后扣减"""
+        price = sig["price"]
+        qty = int(sig.get("volume", 100))
+        notional = price * qty / self.price_scale
+        is_buy = sig["action"] == "buy"
+
+        if state.max_order_qty and qty > state.max_order_qty:
+            return "order_qty", f"单笔数量 {qty} 超过 {state.max_order_qty}"
+        if state.max_order_notional and notional > state.max_order_notional:
+            return "order_notional", f"单笔金额 {notional:.2f} 超过 {state.max_order_notional}"
+
+        last = state.last_price
+        if last is None:
+            if self.reject_without_price:
+                return "no_price", "无参考价"
+        elif state.price_band_pct and abs(price - last) > last * state.price_band_pct:
+            return "price_band", f"委托价偏离最新价 {last} 超过 {state.price_band_pct:.2%}"
+
+        if is_buy:
+            position = state.position + state.pending_qty + qty
+            if state.max_position and position > state.max_position:
+                return "position", f"持仓 + 在途 {position} 超过 {state.max_position}"
+            position_notional = state.notional + state.pending_notional + notional
+            if state.max_position_notional and position_notional > state.max_position_notional:
+                return "position_notional", f"持仓金额 {position_notional:.2f} 超过 {state.max_position_notional}"
+            gross = self.gross_notional + self.pending_notional + notional
+            if self.max_gross_notional and gross > self.max_gross_notional:
+                return "gross_notional", f"总持仓金额 {gross:.2f} 超过 {self.max_gross_notional}"
+
+        rate = state.max_symbol_orders_per_sec
+        if rate:
+            state.tokens = min(rate, state.tokens + (now_ns - state.refill_ns) * rate / 1e9)
+            state.refill_ns = now_ns
+            if state.tokens < 1:
+                return "symbol_rate", f"单标的委托频率超过 {rate} 笔/秒"
+        rate_all = self.max_orders_per_sec
+        if rate_all:
+            self._tokens = min(rate_all, self._tokens + (now_ns - self._refill_ns) * rate_all / 1e9)
+            self._refill_ns = now_ns
+            if self._tokens < 1:
+                return "rate", f"全局委托频率超过 {rate_all} 笔/秒"
+            self._tokens -= 1
+        if rate:
+            state.tokens -= 1
+        return None, ""
+
+    # ========== 输出 ==========
+    def position(self, symbol: str) -> int:
+        """按成交回报对账后的持仓（不含在途买单）"""
+        state = self._states.get(symbol)
+        return state.position if state else 0
+
+    def stats(self) -> dict:
+        return {"passed": self.passed, "rejected": self.rejected, "rejects": dict(self.rejects),
+                "gross_notional": self.gross_notional, "pending_notional": self.pending_notional,
+                "open_orders": len(self._open), "latency_ns": self.latency.summary()}
+
+    def report(self):
+        s = self.latency.summary()
+        logger.info("🛡️ [事前风控] 放行 %d | 拒绝 %d%s | 总持仓金额 %.2f | 在途 %d 笔 %.2f", self.passed, self.rejected,
+                    f" {self.rejects}" if self.rejects else "", self.gross_notional, len(self._open), self.pending_notional)
+        logger.info("  - 风控耗时（微秒） n=%d p50=%.1f p99=%.1f p99.9=%.1f max=%.1f",
+                    s["count"], s["p50"] / 1000, s["p99"] / 1000, s["p99.9"] / 1000, s["max"] / 1000)
@@ -1,8 +1,17 @@
+import time
+
 from vendor_api.quote_sample.my_spi import MdsClientMySpi
+from quote_api import eMdsMsgTypeT, MdsTickResendRequestReqT
 from typing import List, Optional
 
 from src.data_handler import MarketDataSaver
 from src.market.market_event_handler import MarketEventHandler
+from src.spi.tick_gap_tracker import TickGapTracker
+
+_MSG_L2_TRADE = eMdsMsgTypeT.MDS_MSGTYPE_L2_TRADE
+_MSG_L2_ORDER = eMdsMsgTypeT.MDS_MSGTYPE_L2_ORDER
+_MSG_L2_SSE_ORDER = eMdsMsgTypeT.MDS_MSGTYPE_L2_SSE_ORDER
+_MSG_TICK_RESEND = eMdsMsgTypeT.MDS_MSGTYPE_TICK_RESEND_REQUEST
 
 
 class MdsSpiHandler(MdsClientMySpi):
@@ -12,14 +21,35 @@ class MdsSpiHandler(MdsClientMySpi):
         subscribe_codes: Optional[list[str]] = None,
         subscribe_config: Optional[dict] = None,
         event_engine=None,
+        snapshot_view: bool = False,
+        snapshot_columns: int = 0,
+        tick_gap: Optional[dict] = None,
     ):
+        """
+        :param tick_gap: 逐笔缺口检测配置，None 表示不检测；
+                         {"resend": True, "gap_timeout_ms": 3000, "batch_ms": 5, "max_pending": 100000}
+        """
         super().__init__()
         self.strategy_group = strategy_group or []
         self.subscribe_config = subscribe_config or {}
         self.subscribe_codes = [str(code) for code in (subscribe_codes or [])]
         self.data_saver = MarketDataSaver(compress=True)
         self.event_engine = event_engine
-        self.market_event_handler = MarketEventHandler(event_engine)
+        self.market_event_handler = MarketEventHandler(
+            event_engine, snapshot_view=snapshot_view, snapshot_columns=snapshot_columns)
+        self._producer_bound = False
+        self.tick_gap_tracker = None
+        if tick_gap is not None:
+            options = dict(tick_gap)
+            resend = self._send_tick_resend if options.pop("resend", True) else None
+            self.tick_gap_tracker = TickGapTracker(resend=resend, **options)
+            self.tick_gap_tracker.start()
+
+    def _bind_producer(self):
+        """首个行情回调所在的 MDS 线程绑定为事件队列生产者（ring 队列的单生产者）"""
+        self._producer_bound = True
+        if self.event_engine is not None:
+            self.event_engine.bind_producer()
 
     def on_connect(self, channel, user_info):
         print("✅ SPI 已连接，准备订阅行情...")
@@ -90,57 +120,126 @@ class MdsSpiHandler(MdsClientMySpi):
             print("❌ 订阅调用异常:", e)
 
     def on_l2_market_data_snapshot(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_l2_snapshot(msg_body)
+            if self.tick_gap_tracker is not None:
+                self.tick_gap_tracker.flush()     # 发布重传 / 超时放弃后就绪的逐笔（行情线程）
+            self.market_event_handler.handle_l2_snapshot(msg_body, recv_ns)
         except Exception as e:
             print("❌ L2 快照事件处理异常:", e)
         return 0
 
     def on_l2_tick_trade(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_l2_tick_trade(msg_body)
+            tracker = self.tick_gap_tracker
+            if tracker is None:
+                self.market_event_handler.handle_l2_tick_trade(msg_body, recv_ns)
+            else:
+                tracker.on_tick((msg_body.exchId, msg_body.ChannelNo, 0), msg_body.ApplSeqNum, msg_body,
+                                self.market_event_handler.handle_l2_tick_trade, recv_ns)
         except Exception as e:
             print("❌ 逐笔成交事件处理异常:", e)
         return 0
 
     def on_l2_tick_order(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_l2_tick_order(msg_body)
+            tracker = self.tick_gap_tracker
+            if tracker is None:
+                self.market_event_handler.handle_l2_tick_order(msg_body, recv_ns)
+            else:
+                stream = 1 if msg_head.msgId == _MSG_L2_SSE_ORDER else 0
+                tracker.on_tick((msg_body.exchId, msg_body.ChannelNo, stream), msg_body.ApplSeqNum, msg_body,
+                                self.market_event_handler.handle_l2_tick_order, recv_ns)
         except Exception as e:
             print("❌ 逐笔委托事件处理异常:", e)
         return 0
 
+    # ---------------- 逐笔重传 ----------------
+    def _send_tick_resend(self, exch_id, channel_no, begin, end, stream):
+        """由 TickGapTracker 的重传线程调用；请求经查询通道发送，应答回调 on_tick_resend_rsp"""
+        req = MdsTickResendRequestReqT(
+            exchId=exch_id, isSseOldTickOrder=stream, channelNo=channel_no,
+            beginApplSeqNum=begin, endApplSeqNum=end)
+        return self.mds_api.send_tick_resend_request2(tick_resend_req=req)
+
+    def on_tick_resend_rsp(self, channel, msg_head, msg_body, qry_cursor, user_info):
+        recv_ns = time.perf_counter_ns()
+        tracker = self.tick_gap_tracker
+        if tracker is None:
+            return 0
+        try:
+            msg_id = msg_head.msgId
+            if msg_id == _MSG_L2_TRADE:
+                tick = msg_body.trade
+                tracker.on_resend((tick.exchId, tick.ChannelNo, 0), tick.ApplSeqNum, tick,
+                                  self.market_event_handler.handle_l2_tick_trade, recv_ns)
+            elif msg_id == _MSG_L2_ORDER or msg_id == _MSG_L2_SSE_ORDER:
+                tick = msg_body.order
+                stream = 1 if msg_id == _MSG_L2_SSE_ORDER else 0
+                tracker.on_resend((tick.exchId, tick.ChannelNo, stream), tick.ApplSeqNum, tick,
+                                  self.market_event_handler.handle_l2_tick_order, recv_ns)
+            elif msg_id == _MSG_TICK_RESEND:
+                rsp = msg_body.tickResendRsp
+                tracker.on_resend_status((rsp.exchId, rsp.channelNo, rsp.isSseOldTickOrder),
+                                         rsp.beginApplSeqNum, rsp.endApplSeqNum, rsp.resendStatus)
+        except Exception as e:
+            print("❌ 逐笔重传应答处理异常:", e)
+        return 0
+
     def on_l2_best_orders_snapshot(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_l2_best_orders_snapshot(msg_body)
+            self.market_event_handler.handle_l2_best_orders_snapshot(msg_body, recv_ns)
         except Exception as e:
             print("❌ L2 委托簿事件处理异常:", e)
         return 0
 
     def on_l2_market_overview(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_l2_market_overview(msg_body)
+            self.market_event_handler.handle_l2_market_overview(msg_body, recv_ns)
         except Exception as e:
             print("❌ 市场总览事件处理异常:", e)
         return 0
 
     def on_market_data_snapshot_full_refresh(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_l1_stock_snapshot(msg_body)
+            self.market_event_handler.handle_l1_stock_snapshot(msg_body, recv_ns)
         except Exception as e:
             print("❌ L1 快照事件处理异常:", e)
         return 0
 
     def on_market_index_snapshot_full_refresh(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_index_snapshot(msg_body)
+            self.market_event_handler.handle_index_snapshot(msg_body, recv_ns)
         except Exception as e:
             print("❌ 指数快照事件处理异常:", e)
         return 0
 
     def on_market_option_snapshot_full_refresh(self, channel, msg_head, msg_body, user_info):
+        recv_ns = time.perf_counter_ns()
+        if not self._producer_bound:
+            self._bind_producer()
         try:
-            self.market_event_handler.handle_option_snapshot(msg_body)
+            self.market_event_handler.handle_option_snapshot(msg_body, recv_ns)
         except Exception as e:
             print("❌ 期权快照事件处理异常:", e)
         return 0
@@ -0,0 +1,304 @@
+# src/spi/tick_gap_tracker.py
+
+import ctypes
+import threading
+import time
+from collections import deque
+
+from utils.logger import get_logger
+from src.monitor.latency import LatencyHistogram, latency_tracker
+
+logger = get_logger("TickGap")
+
+MAX_RESEND_ITEMS = 1000         # 单次重传请求的最大条数（MDS_MAX_TICK_RESEND_ITEM_COUNT）
+
+# 重传应答状态（eMdsTickResendStatusT）
+RESEND_COMPLETED = 1
+RESEND_PARTIALLY = 2
+RESEND_NO_PERMISSION = 3
+RESEND_NO_DATA = 4
+
+
+def _copy(msg):
+    """缓存乱序逐笔前复制 ctypes 结构体（copy_args=False 时回调返回后原内存会被覆盖）"""
+    if isinstance(msg, ctypes.Structure):
+        return type(msg).from_buffer_copy(msg)
+    return msg
+
+
+class _Channel:
+    """单个逐笔频道的序号状态"""
+    __slots__ = ("key", "expected", "high", "pending", "gaps")
+
+    def __init__(self, key, seq: int):
+        self.key = key
+        self.expected = seq         # 下一条应发布的 ApplSeqNum
+        self.high = seq - 1         # 已收到的最大序号
+        self.pending: dict = {}     # 缺口之后先到的逐笔: seq -> (msg, emit, recv_ns)
+        self.gaps = deque()         # 未补齐的缺口: [begin, end, 发现时间 ns]
+
+
+class TickGapTracker:
+    """
+    逐笔序号连续性跟踪与自动重传
+
+    - 按 (exch_id, ChannelNo, stream) 跟踪 ApplSeqNum，stream=1 表示上交所老版竞价逐笔委托
+      （与逐笔成交分属两套序号，重传请求需设置 isSseOldTickOrder）
+    - 序号连续时直接调用 emit 发布（快路径只多一次字典查找和加锁）；出现缺口时，
+      缺口之后的逐笔先缓存，缺口补齐（实时流迟到或重传返回）后按序号顺序发布
+    - 缺口区间由后台线程按 batch_ms 攒批、合并相邻区间、按 1000 条拆分后调用 resend 发送，
+      不阻塞行情回调线程
+    - 超过 gap_timeout_ms 未补齐、缓存超过 max_pending 或重传被拒绝时放弃该缺口，继续发布后续逐笔
+    - 锁内只做序号判断，可发布的逐笔按序放入就绪队列，释放锁后再调用 emit；emit 只在行情回调线程上
+      执行（on_tick / flush），重传应答（查询通道线程）与超时放弃（重传线程）只入就绪队列，
+      由行情线程下一次 on_tick 或 flush 按序发布。同一频道的逐笔须来自同一行情线程
+    - 统计缺口数、缺失 / 补齐 / 放弃条数，以及缺口发现到补齐的耗时直方图
+    """
+
+    def __init__(self, resend=None, gap_timeout_ms: int = 3000, batch_ms: int = 5,
+                 max_pending: int = 100000):
+        """
+        :param resend: 重传函数 resend(exch_id, channel_no, begin, end, stream) -> int（<0 表示失败）；
+                       None 时只检测缺口、等待实时流补齐或超时
+        :param gap_timeout_ms: 缺口最长等待时间
+        :param batch_ms: 重传请求攒批间隔
+        :param max_pending: 单个频道缺口后最多缓存的逐笔条数
+        """
+        self.resend = resend
+        self.gap_timeout_ns = gap_timeout_ms * 1_000_000
+        self.batch_ms = batch_ms
+        self.max_pending = max_pending
+        self._channels: dict = {}
+        self._lock = threading.Lock()
+        self._ready = deque()       # 已按序就绪、待行情线程发布的逐笔: (msg, emit, recv_ns)
+
+        self._requests: list = []
+        self._wakeup = threading.Event()
+        self._active = False
+        self._thread = None
+
+        # 统计
+        self.gaps = 0
+        self.missing = 0
+        self.recovered = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.resent = 0
+        self.resend_requests = 0
+        self.resend_failed = 0
+        self.recovery = LatencyHistogram()
+
+    # ---------------- 生命周期 ----------------
+    def start(self):
+        if self._active or self.resend is None:
+            return
+        self._active = True
+        self._thread = threading.Thread(target=self._run, name="TickResend", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._active = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # ---------------- 逐笔入口 ----------------
+    def on_tick(self, key, seq: int, msg, emit, recv_ns=None):
+        """
+        实时逐笔入口（行情回调线程），emit 在释放锁之后调用
+        :param key: (exch_id, ChannelNo, stream)
+        :param emit: 发布函数 emit(msg, recv_ns)，如 MarketEventHandler.handle_l2_tick_trade
+        """
+        with self._lock:
+            direct = self._accept(key, seq, msg, emit, recv_ns, True)
+        if direct:
+            emit(msg, recv_ns)
+        elif self._ready:
+            self.flush()
+
+    def on_resend(self, key, seq: int, msg, emit, recv_ns=None):
+        """重传返回的逐笔（on_tick_resend_rsp，查询通道线程）：只入缓存 / 就绪队列，由行情线程发布"""
+        self.resent += 1
+        with self._lock:
+            self._accept(key, seq, msg, emit, recv_ns, False)
+
+    def flush(self):
+        """按序发布就绪队列中的逐笔（行情回调线程调用；on_tick 已自动调用）"""
+        ready = self._ready
+        while ready:
+            msg, emit, recv_ns = ready.popleft()
+            emit(msg, recv_ns)
+
+    def on_resend_status(self, key, begin: int, end: int, status: int):
+        """重传请求应答；被拒绝或数据不可用时立即放弃对应缺口"""
+        if status not in (RESEND_NO_PERMISSION, RESEND_NO_DATA):
+            return
+        with self._lock:
+            ch = self._channels.get(key)
+            if ch is not None and ch.pending and begin <= ch.expected <= end:
+                self._skip(ch)
+
+    def poll(self):
+        """放弃超时的缺口（由重传线程定期调用；无重传线程时可由外部定时调用），后续逐笔由 flush 发布"""
+        now = time.perf_counter_ns()
+        with self._lock:
+            for ch in self._channels.values():
+                if ch.gaps and now - ch.gaps[0][2] > self.gap_timeout_ns:
+                    self._skip(ch)
+
+    # ---------------- 缺口处理（调用方持有锁） ----------------
+    def _accept(self, key, seq: int, msg, emit, recv_ns, direct: bool) -> bool:
+        """
+        处理一条逐笔；返回 True 表示可由调用方在锁外直接发布
+        （direct 为真、序号连续且没有缓存 / 就绪逐笔的快路径），否则已放入缓存或就绪队列
+        """
+        ch = self._channels.get(key)
+        if ch is None:
+            ch = self._channels[key] = _Channel(key, seq)
+        if seq == ch.expected:
+            if ch.gaps:
+                self.recovered += 1
+            ch.expected = seq + 1
+            if seq > ch.high:
+                ch.high = seq
+            if direct and not ch.pending and not self._ready:
+                return True
+            self._ready.append((_copy(msg), emit, recv_ns))
+            if ch.pending:
+                self._drain(ch)
+            return False
+        if seq < ch.expected or seq in ch.pending:
+            self.duplicates += 1
+            return False
+        self._buffer(ch, seq, msg, emit, recv_ns)
+        return False
+
+    def _buffer(self, ch: _Channel, seq: int, msg, emit, recv_ns):
+        ch.pending[seq] = (_copy(msg), emit, recv_ns)
+        if seq < ch.high:
+            self.recovered += 1     # 乱序补齐了缺口中间的序号
+        elif seq > ch.high + 1:
+            begin, end = ch.high + 1, seq - 1
+            ch.gaps.append([begin, end, time.perf_counter_ns()])
+            self.gaps += 1
+            self.missing += end - begin + 1
+            logger.debug("⚠️ 逐笔缺口 %s [%d, %d]", ch.key, begin, end)
+            if self.resend is not None:
+                self._requests.append((ch.key, begin, end))
+                self._wakeup.set()
+        if seq > ch.high:
+            ch.high = seq
+        if len(ch.pending) > self.max_pending \
+                or time.perf_counter_ns() - ch.gaps[0][2] > self.gap_timeout_ns:
+            self._skip(ch)
+
+    def _drain(self, ch: _Channel):
+        """把缺口补齐后已连续的缓存逐笔移入就绪队列，并结算已补齐的缺口"""
+        pending = ch.pending
+        expected = ch.expected
+        append = self._ready.append
+        item = pending.pop(expected, None)
+        while item is not None:
+            append(item)
+            expected += 1
+            item = pending.pop(expected, None)
+        ch.expected = expected
+
+        gaps = ch.gaps
+        if gaps and gaps[0][1] < expected:
+            now = time.perf_counter_ns()
+            while gaps and gaps[0][1] < expected:
+                elapsed = now - gaps.popleft()[2]
+                self.recovery.record(elapsed)
+                if latency_tracker.enabled:
+                    latency_tracker.record("tick_gap->recovered", elapsed)
+
+    def _skip(self, ch: _Channel):
+        """放弃当前缺口：跳到下一条已缓存的逐笔，后续连续逐笔移入就绪队列"""
+        if not ch.pending:
+            return
+        nxt = min(ch.pending)
+        self.lost += nxt - ch.expected
+        logger.warning("⚠️ 放弃逐笔缺口 %s [%d, %d]", ch.key, ch.expected, nxt - 1)
+        while ch.gaps and ch.gaps[0][1] < nxt:
+            ch.gaps.popleft()
+        ch.expected = nxt
+        self._drain(ch)
+
+    # ---------------- 重传线程 ----------------
+    def _run(self):
+        while self._active:
+            self._wakeup.wait(timeout=0.1)
+            self._wakeup.clear()
+            if not self._active:
+                break
+            if self._requests:
+                time.sleep(self.batch_ms / 1000)
+                self._send(self._collect())
+            self.poll()
+
+    def _collect(self) -> list:
+        """取出待发送的缺口，按频道合并相邻 / 重叠区间，并剔除已补齐的部分"""
+        with self._lock:
+            requests, self._requests = self._requests, []
+        merged: dict = {}
+        for key, begin, end in sorted(requests):
+            ranges = merged.setdefault(key, [])
+            if ranges and begin <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([begin, end])
+
+        batches = []
+        with self._lock:
+            for key, ranges in merged.items():
+                ch = self._channels.get(key)
+                expected = ch.expected if ch is not None else 0
+                for begin, end in ranges:
+                    begin = max(begin, expected)
+                    while begin <= end:
+                        stop = min(end, begin + MAX_RESEND_ITEMS - 1)
+                        batches.append((key, begin, stop))
+                        begin = stop + 1
+        return batches
+
+    def _send(self, batches: list):
+        for (exch_id, channel_no, stream), begin, end in batches:
+            self.resend_requests += 1
+            try:
+                ret = self.resend(exch_id, channel_no, begin, end, stream)
+            except Exception as e:
+                ret = -1
+                logger.error("❌ 逐笔重传请求异常 (%s, %s) [%d, %d]: %s", exch_id, channel_no, begin, end, e)
+            if ret is not None and ret < 0:
+                self.resend_failed += 1
+
+    # ---------------- 统计 ----------------
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(len(ch.pending) for ch in self._channels.values())
+            open_gaps = sum(len(ch.gaps) for ch in self._channels.values())
+        return {
+            "channels": len(self._channels),
+            "gaps": self.gaps,
+            "open_gaps": open_gaps,
+            "missing": self.missing,
+            "recovered": self.recovered,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "pending": pending,
+            "ready": len(self._ready),
+            "resent": self.resent,
+            "resend_requests": self.resend_requests,
+            "resend_failed": self.resend_failed,
+            "recovery_ns": self.recovery.summary(),
+        }
+
+    def report(self):
+        s = self.stats()
+        r = s.pop("recovery_ns")
+        logger.info("🧩 [逐笔缺口] %s", s)
+        if r["count"]:
+            logger.info("  - 缺口补齐耗时(ms) n=%d p50=%.1f p99=%.1f max=%.1f",
+                        r["count"], r["p50"] / 1e6, r["p99"] / 1e6, r["max"] / 1e6)
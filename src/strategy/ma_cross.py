@@ -54,5 +54,6 @@ class MaCrossStrategy(BaseStrategy):
             self.event_engine.put(Event(
                 type_=EventType.STRATEGY_SIGNAL,
                 data=signal,
-                source=self.name
+                source=self.name,
+                origin_ns=event.origin_ns or event.recv_ns
             ))
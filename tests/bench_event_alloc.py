@@ -0,0 +1,92 @@
+# tests/bench_event_alloc.py
+"""
+快照回放路径上 Event 分配 / GC 压力基准：
+  旧版 __dict__ Event  vs  __slots__ Event  vs  EventPool 池化 + 分发后回收
+运行: python -m tests.bench_event_alloc
+"""
+
+import gc
+import time
+import tracemalloc
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event, EventPool
+from src.event_engine.event_type import EventType
+
+
+class LegacyEvent:
+    """复刻旧版 Event：带 __dict__，time.time() 时间戳"""
+
+    def __init__(self, type_, data=None, timestamp=None, source=None):
+        self.type = type_
+        self.data = data
+        self.timestamp = timestamp or time.time()
+        self.source = source
+
+
+N_TICKS = 200_000
+BACKLOG = 50_000
+SNAPSHOT = {"SecurityID": "600519", "TradePx": 1580000, "TotalVolumeTraded": 24000}
+
+
+def _engine() -> EventEngine:
+    engine = EventEngine("bench", recycle_events=True)
+    engine.register(EventType.MARKET_SNAPSHOT, lambda e: None)
+    return engine
+
+
+def replay(make, release=None, repeat: int = 5) -> tuple[float, int]:
+    """逐笔创建 -> 分发 -> (回收)，返回 (最佳 事件/秒, 单轮 gen0 GC 次数)"""
+    engine = _engine()
+    process = engine._process
+    best, gen0 = 0.0, 0
+    for _ in range(repeat):
+        gc.collect()
+        gen0_before = gc.get_stats()[0]["collections"]
+        t0 = time.perf_counter()
+        for _ in range(N_TICKS):
+            event = make()
+            process(event)
+            if release is not None:
+                release(event)
+        elapsed = time.perf_counter() - t0
+        best = max(best, N_TICKS / elapsed)
+        gen0 = gc.get_stats()[0]["collections"] - gen0_before
+    return best, gen0
+
+
+def backlog(make) -> tuple[int, int]:
+    """
+    队列积压 BACKLOG 个事件：返回 (事件对象本身占用的内存（不含共享的 data）, 积压期间的 GC 次数)
+    事件存活在队列中时，分配会推动分代 GC 反复扫描积压对象
+    """
+    gc.collect()
+    before = sum(s["collections"] for s in gc.get_stats())
+    tracemalloc.start()
+    events = [make() for _ in range(BACKLOG)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = sum(s["collections"] for s in gc.get_stats()) - before
+    del events
+    return current, collections
+
+
+def main():
+    print(f"🚀 Event 分配基准 | ticks={N_TICKS:,} backlog={BACKLOG:,}")
+    pool = EventPool()
+
+    cases = {
+        "旧版 __dict__ Event": (lambda: LegacyEvent(EventType.MARKET_SNAPSHOT, SNAPSHOT, source="bench"), None),
+        "__slots__ Event": (lambda: Event(EventType.MARKET_SNAPSHOT, SNAPSHOT, source="bench"), None),
+        "EventPool + 回收": (lambda: pool.acquire(EventType.MARKET_SNAPSHOT, SNAPSHOT, "bench"), pool.release),
+    }
+    for name, (make, release) in cases.items():
+        rate, gen0 = replay(make, release)
+        mem, collections = backlog(make)
+        print(f"  {name:<20} | 回放 {rate:>11,.0f} ev/s, gen0 GC {gen0:>4} 次"
+              f" | 积压 {mem / BACKLOG:>5.0f} B/事件, GC {collections:>4} 次")
+    print(f"  对象池统计: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# tests/bench_event_dispatch.py
+"""
+EventEngine._process 分发性能微基准：旧版（每次拼接列表）vs 预编译分发表
+运行: python -m tests.bench_event_dispatch
+"""
+
+import time
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+class LegacyEventEngine(EventEngine):
+    """复刻旧版 _process：两次字典查找 + 原地 += 通配回调"""
+
+    def _process(self, event: Event):
+        handlers = self._handlers.get(event.type, [])
+        handlers += self._handlers.get("*", [])
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"[EventEngine] 处理事件异常: {e}")
+
+
+def _noop(event):
+    pass
+
+
+def _wildcard(event):
+    pass
+
+
+def bench(engine_cls, n_events: int) -> tuple[float, int]:
+    engine = engine_cls("bench")
+    for _ in range(3):
+        engine.register(EventType.MARKET_SNAPSHOT, lambda e: None)
+    engine.register("*", _wildcard)
+
+    event = Event(type_=EventType.MARKET_SNAPSHOT,
+                  data={"SecurityID": "600519", "TradePx": 100}, source="bench")
+
+    t0 = time.perf_counter()
+    for _ in range(n_events):
+        engine._process(event)
+    elapsed = time.perf_counter() - t0
+    return n_events / elapsed, len(engine._handlers[EventType.MARKET_SNAPSHOT])
+
+
+def main():
+    print("🚀 EventEngine 分发基准")
+    for n in (10_000, 50_000):
+        legacy_rate, legacy_len = bench(LegacyEventEngine, n)
+        new_rate, new_len = bench(EventEngine, n)
+        print(f"  events={n:>6} | 旧版: {legacy_rate:>12,.0f} ev/s (回调列表增长到 {legacy_len})"
+              f" | 分发表: {new_rate:>12,.0f} ev/s (回调列表 {new_len})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# tests/bench_market_handlers.py
+"""
+逐笔行情转换回放基准：MarketEventHandler.handle_l2_tick_trade / handle_l2_tick_order
+- 用与 MdsL2TradeT / MdsL2OrderT 同名同类型字段的 ctypes 结构体合成全市场逐笔（4000 只标的，成交 / 委托交替）
+- 转换：handler 投递到只计数的引擎，衡量回调线程上的转换开销（ctypes 结构体按字段偏移一次 struct.unpack_from）
+- 端到端：经 EventEngine（批量模式）分发到一个空回调；生产 / 消费共享 GIL，结果波动较大，
+  实测约 16.5 万 ~ 21 万条/秒，未稳定达到 TARGET_RATE 时输出 ⚠️ 与实际倍数
+运行: python -m tests.bench_market_handlers
+"""
+
+import ctypes
+import time
+
+from src.event_engine.event import event_pool
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event_type import EventType
+from src.market.market_event_handler import MarketEventHandler
+
+N_TICKS = 400_000
+N_SYMBOLS = 4000
+TARGET_RATE = 200_000      # 沪深两市 L2 逐笔开盘峰值量级（条/秒）
+
+
+class Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_int32), ("tv_nsec", ctypes.c_int32)]
+
+
+class L2Trade(ctypes.Structure):
+    _fields_ = [
+        ("exchId", ctypes.c_uint8), ("mdProductType", ctypes.c_uint8),
+        ("_isRepeated", ctypes.c_int8), ("origMdSource", ctypes.c_uint8),
+        ("tradeDate", ctypes.c_int32), ("TransactTime", ctypes.c_int32),
+        ("instrId", ctypes.c_int32), ("ChannelNo", ctypes.c_uint16), ("__reserve", ctypes.c_uint16),
+        ("ApplSeqNum", ctypes.c_uint32), ("SecurityID", ctypes.c_char * 9),
+        ("ExecType", ctypes.c_char), ("TradeBSFlag", ctypes.c_char), ("subStreamType", ctypes.c_uint8),
+        ("SseBizIndex", ctypes.c_uint32), ("__filler", ctypes.c_uint64),
+        ("TradePrice", ctypes.c_int32), ("TradeQty", ctypes.c_int32), ("TradeMoney", ctypes.c_int64),
+        ("BidApplSeqNum", ctypes.c_int64), ("OfferApplSeqNum", ctypes.c_int64),
+        ("origNetTime", Timespec), ("recvTime", Timespec), ("collectedTime", Timespec),
+        ("processedTime", Timespec), ("pushingTime", Timespec),
+    ]
+
+
+class L2Order(ctypes.Structure):
+    _fields_ = [
+        ("exchId", ctypes.c_uint8), ("mdProductType", ctypes.c_uint8),
+        ("_isRepeated", ctypes.c_int8), ("origMdSource", ctypes.c_uint8),
+        ("tradeDate", ctypes.c_int32), ("TransactTime", ctypes.c_int32),
+        ("instrId", ctypes.c_int32), ("ChannelNo", ctypes.c_uint16), ("__reserve", ctypes.c_uint16),
+        ("ApplSeqNum", ctypes.c_uint32), ("SecurityID", ctypes.c_char * 9),
+        ("Side", ctypes.c_char), ("OrderType", ctypes.c_char), ("subStreamType", ctypes.c_uint8),
+        ("SseBizIndex", ctypes.c_uint32), ("SseOrderNo", ctypes.c_int64),
+        ("Price", ctypes.c_int32), ("OrderQty", ctypes.c_int32),
+        ("origNetTime", Timespec), ("recvTime", Timespec), ("collectedTime", Timespec),
+        ("processedTime", Timespec), ("pushingTime", Timespec),
+    ]
+
+
+def make_ticks() -> list:
+    ticks = []
+    for i in range(2 * N_SYMBOLS):
+        symbol = f"{i % N_SYMBOLS:06d}".encode()
+        if i & 1:
+            t = L2Trade(exchId=2, tradeDate=20250424, TransactTime=93000000 + i, ChannelNo=2011,
+                        ApplSeqNum=i, SecurityID=symbol, ExecType=b"F", TradeBSFlag=b"N",
+                        TradePrice=100000 + i, TradeQty=100, TradeMoney=10000000,
+                        BidApplSeqNum=i - 1, OfferApplSeqNum=i - 2)
+        else:
+            t = L2Order(exchId=2, tradeDate=20250424, TransactTime=93000000 + i, ChannelNo=2011,
+                        ApplSeqNum=i, SecurityID=symbol, Side=b"1", OrderType=b"2",
+                        Price=100000 + i, OrderQty=200)
+        ticks.append(t)
+    return ticks
+
+
+class CountingEngine:
+    """只计数并立即回收事件的引擎替身"""
+
+    def __init__(self):
+        self.count = 0
+
+    def put(self, event):
+        self.count += 1
+        event_pool.release(event)
+
+
+def replay(handler: MarketEventHandler, ticks: list, n: int) -> float:
+    on_trade, on_order = handler.handle_l2_tick_trade, handler.handle_l2_tick_order
+    m = len(ticks)
+    t0 = time.perf_counter()
+    for i in range(n):
+        tick = ticks[i % m]
+        if i & 1:
+            on_trade(tick)
+        else:
+            on_order(tick)
+    return n / (time.perf_counter() - t0)
+
+
+def bench_convert(ticks: list, repeat: int = 3) -> float:
+    best = 0.0
+    for _ in range(repeat):
+        engine = CountingEngine()
+        rate = replay(MarketEventHandler(engine), ticks, N_TICKS)
+        assert engine.count == N_TICKS, f"丢失事件: {engine.count}"
+        best = max(best, rate)
+    return best
+
+
+def bench_end_to_end(ticks: list) -> float:
+    engine = EventEngine("bench", batch_size=256, recycle_events=True)
+    done = []
+    engine.register_batch(EventType.MARKET_TICK, lambda events: done.append(len(events)))
+    engine.start()
+    t0 = time.perf_counter()
+    replay(MarketEventHandler(engine), ticks, N_TICKS)
+    while sum(done) < N_TICKS:
+        time.sleep(0.001)
+    rate = N_TICKS / (time.perf_counter() - t0)
+    engine.stop()
+    return rate
+
+
+def main():
+    print(f"🚀 逐笔行情回放基准（{N_TICKS:,} 条，{N_SYMBOLS} 只标的，成交 / 委托交替）")
+    ticks = make_ticks()
+
+    convert = bench_convert(ticks)
+    print(f"  转换（回调线程）: {convert:>12,.0f} 条/秒")
+    e2e = bench_end_to_end(ticks)
+    print(f"  端到端（EventEngine 批量分发）: {e2e:>12,.0f} 条/秒")
+
+    ok = "✅" if e2e >= TARGET_RATE else "⚠️"
+    print(f"{ok} 目标 {TARGET_RATE:,} 条/秒，端到端为目标的 {e2e / TARGET_RATE:.2f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# tests/bench_mds_dispatch.py
+"""
+MdsMsgDispatcher 行情派发微基准：旧版逐条路径 vs 快速派发表
+- 旧版：每条消息经 ctypes 查询通道、新建 MdsQryCursorT、经 lambda 派发并整体 memcpy 消息体联合体
+- 快速派发：会话通道缓存 + 复用游标 + 初始化时绑定的 spi 方法表（copy_args=True / "pool" / False）
+用合成的 SMsgHeadT / 消息体指针直接调用 _handle_mkt_data_msg，不需要连接行情服务器（需要行情动态库）
+运行: python -m tests.bench_mds_dispatch
+"""
+
+import time
+from ctypes import pointer, sizeof
+
+import vendor_api  # noqa: F401  将 quote_api 加入 sys.path
+
+from quote_api import (
+    SMsgHeadT, MdsMktRspMsgBodyT, MdsMktDataSnapshotT, MdsL2TradeT, eMdsMsgTypeT,
+    MdsQryCursorT, MdsClientSpi, memcpy,
+)
+from quote_api.c_api_wrapper.mds_msg_dispatcher import (
+    MdsMsgDispatcher, _MDS_MSG_ID_TO_CALLBACK,
+)
+from quote_api.c_api_wrapper.mds_func_loader import CMdsApiFuncLoader
+
+
+class CountingSpi(MdsClientSpi):
+    """只读取一个字段并计数的回调类"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def on_l2_market_data_snapshot(self, channel, msg_head, msg_body, user_info):
+        self.count += msg_body.l2Stock.TradePx > 0
+        return 0
+
+    def on_l2_tick_trade(self, channel, msg_head, msg_body, user_info):
+        self.count += msg_body.TradeQty > 0
+        return 0
+
+
+def legacy_dispatch(dispatcher: MdsMsgDispatcher, p_session, p_msg_head, p_msg_item, user_info):
+    """复刻旧版 _handle_mkt_data_msg（copy_args=True）"""
+    msg_id = int(p_msg_head.contents.msgId)
+    p_channel = CMdsApiFuncLoader().c_mds_async_api_get_channel_by_session(p_session)
+    callback = _MDS_MSG_ID_TO_CALLBACK[msg_id][1]
+    return callback(p_channel.contents if p_channel else None, dispatcher.get_spi(),
+                    memcpy(p_msg_head.contents),
+                    memcpy(p_msg_item.contents),
+                    MdsQryCursorT(),
+                    user_info)
+
+
+def make_messages():
+    """合成 L2 快照与逐笔成交两类消息，返回 [(消息头指针, 消息体指针)]"""
+    messages = []
+
+    body = MdsMktRspMsgBodyT()
+    snap = body.mktDataSnapshot
+    snap.head.tradeDate, snap.head.updateTime = 20250424, 93100000
+    snap.l2Stock.SecurityID, snap.l2Stock.TradePx = b"600519", 15800000
+    head = SMsgHeadT(msgId=eMdsMsgTypeT.MDS_MSGTYPE_L2_MARKET_DATA_SNAPSHOT,
+                     msgSize=sizeof(MdsMktDataSnapshotT))
+    messages.append((pointer(head), pointer(body)))
+
+    body = MdsMktRspMsgBodyT()
+    body.trade.SecurityID, body.trade.TradePrice, body.trade.TradeQty = b"000001", 115000, 100
+    head = SMsgHeadT(msgId=eMdsMsgTypeT.MDS_MSGTYPE_L2_TRADE, msgSize=sizeof(MdsL2TradeT))
+    messages.append((pointer(head), pointer(body)))
+    return messages
+
+
+def bench(name: str, dispatch, spi: CountingSpi, n: int) -> float:
+    messages = make_messages()
+    t0 = time.perf_counter()
+    for i in range(n):
+        p_head, p_body = messages[i & 1]
+        dispatch(None, p_head, p_body, None, None)
+    elapsed = time.perf_counter() - t0
+    assert spi.count == n, f"{name}: 回调次数 {spi.count} != {n}"
+    rate = n / elapsed
+    print(f"  {name:<24} {rate:>12,.0f} callbacks/s")
+    return rate
+
+
+def main(n: int = 200_000):
+    print(f"🚀 MdsMsgDispatcher 行情派发基准（{n:,} 条，L2 快照 / 逐笔成交交替）")
+
+    spi = CountingSpi()
+    dispatcher = MdsMsgDispatcher(spi, True)
+    legacy = bench("旧版 (copy_args=True)", lambda *a: legacy_dispatch(dispatcher, *a[:3], a[4]), spi, n)
+
+    results = {}
+    for copy_args in (True, "pool", False):
+        spi = CountingSpi()
+        dispatcher = MdsMsgDispatcher(spi, copy_args)
+        results[copy_args] = bench(f"快速派发 (copy_args={copy_args})",
+                                   lambda *a, d=dispatcher: d._handle_mkt_data_msg(*a[:4], partial_user_info=a[4]),
+                                   spi, n)
+        if copy_args == "pool":
+            print(f"    缓冲池: {dispatcher.buffer_pool_stats()}")
+
+    print(f"✅ copy_args=True 提速 {results[True] / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
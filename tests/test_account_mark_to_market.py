@@ -0,0 +1,87 @@
+# tests/test_account_mark_to_market.py
+
+import datetime
+import math
+import random
+import time
+
+from src.account.account_simulator import AccountSimulator
+from src.account.ledger import EXCHANGE_TZ
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+def tick(sym: str, price) -> Event:
+    return Event(EventType.MARKET_SNAPSHOT, {"SecurityID": sym, "TradePx": price})
+
+
+def signal(sym: str, action: str, price, volume: int = 100) -> Event:
+    return Event(EventType.STRATEGY_SIGNAL, {"symbol": sym, "action": action, "price": price, "volume": volume})
+
+
+def test_incremental_matches_full():
+    account = AccountSimulator(initial_cash=1_000_000)
+    account.on_event(tick("600519", 100))
+    assert len(account.history_ts) == 0, "未持仓的行情不记资产曲线"
+    account.on_event(signal("600519", "buy", 100, 200))
+    account.on_event(signal("000001", "buy", 10, 1000))
+    account.on_event(tick("600519", 105))
+    account.on_events([tick("000001", 11), tick("600519", 104), tick("300750", 50)])
+    account.on_event(signal("600519", "sell", 106, 100))
+    account.on_event(signal("600519", "sell", 106, 500))      # 持仓不足，忽略
+
+    assert account.position == {"600519": 100, "000001": 1000}
+    assert account.market_value == 106 * 100 + 11 * 1000
+    assert account.equity == account.revalue() == 1_000_000 + 200 * 6 + 1000 * 1
+    assert list(account.history_equity) == [1_000_000, 1_000_000, 1_001_000, 1_001_800, 1_002_200]
+    assert len(account.position_history) == 3, "持仓只在成交时快照"
+    assert account.position_at(3) == {"600519": 200, "000001": 1000}
+    assert account.position_at(4) == {"600519": 100, "000001": 1000}
+    account.print_history()
+    print("✅ 增量市值与全量重算一致")
+
+
+def test_many_positions(n_symbols: int = 1000, n_ticks: int = 100_000):
+    account = AccountSimulator(initial_cash=10**12)
+    symbols = [f"{600000 + k:06d}" for k in range(n_symbols)]
+    for sym in symbols:
+        account.on_event(signal(sym, "buy", 10.0))
+    rng = random.Random(7)
+    ticks = [tick(rng.choice(symbols), round(rng.uniform(9, 11), 2)) for _ in range(n_ticks)]
+
+    t0 = time.perf_counter()
+    for event in ticks:
+        account.on_event(event)
+    per_tick_us = (time.perf_counter() - t0) / n_ticks * 1e6
+    incremental = account.equity
+    assert abs(incremental - account.revalue()) < 1e-3, (incremental, account.equity)
+    assert len(account.history_ts) == n_symbols + n_ticks
+    print(f"✅ {n_symbols} 个持仓: 每个行情 {per_tick_us:.2f} 微秒")
+
+
+def test_market_time():
+    """回放时资产曲线与成交按行情时间记账，跨多个交易日可计算夏普"""
+    account = AccountSimulator(initial_cash=1_000_000)
+    account.on_event(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "TradePx": 100,
+                                                       "TradeDate": 20250422, "UpdateTime": 93000000}))
+    account.on_event(signal("600519", "buy", 100, 1000))
+    for day, price in zip((20250422, 20250423, 20250424, 20250425), (101, 99, 104, 103)):
+        account.on_events([Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "TradePx": price,
+                                                             "trade_date": day, "update_time": 145959500})])
+    ts = [datetime.datetime.fromtimestamp(t, EXCHANGE_TZ).replace(tzinfo=None) for t in account.history_ts]
+    assert ts[0] == datetime.datetime(2025, 4, 22, 9, 30) and ts[-1] == datetime.datetime(2025, 4, 25, 14, 59, 59, 500000), ts
+    assert account.trades["ts"][0] == account.history_ts[0]
+    stats = account.report()
+    assert len(stats["daily_returns"]) == 3 and not math.isnan(stats["sharpe"]), stats["sharpe"]
+    print(f"✅ 按行情时间记账: {ts[0]} ~ {ts[-1]}，夏普 {stats['sharpe']:.2f}")
+
+
+def main():
+    print("🚀 启动账户增量估值测试")
+    test_incremental_matches_full()
+    test_many_positions()
+    test_market_time()
+
+
+if __name__ == "__main__":
+    main()
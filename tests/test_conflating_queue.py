@@ -0,0 +1,91 @@
+# tests/test_conflating_queue.py
+
+import queue
+import time
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event, EventPool
+from src.event_engine.event_type import EventType
+from src.event_engine.conflating_queue import ConflatingQueue
+
+
+def test_conflate():
+    q = ConflatingQueue()
+    for i in range(100):
+        q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": i}))
+        q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "000001", "seq": i}))
+        if i % 10 == 0:
+            q.put(Event(EventType.MARKET_TICK, {"SecurityID": "600519", "seq": i}))
+    q.put(Event(EventType.STRATEGY_SIGNAL, {"symbol": "600519", "action": "BUY"}))
+
+    events = q.get_many(1000, timeout=0)
+    snaps = [(e.data["SecurityID"], e.data["seq"]) for e in events if e.type == EventType.MARKET_SNAPSHOT]
+    ticks = [e.data["seq"] for e in events if e.type == EventType.MARKET_TICK]
+    assert snaps == [("600519", 99), ("000001", 99)], snaps
+    assert ticks == list(range(0, 100, 10)), "逐笔事件不应被合并"
+    assert events[-1].type == EventType.STRATEGY_SIGNAL
+    assert q.stats()["conflated"] == 198 and q.stats()["pending_symbols"] == 0
+    print(f"✅ 合并后剩 {len(events)} 个事件, stats={q.stats()}")
+
+
+def test_bound_and_pool():
+    pool = EventPool()
+    q = ConflatingQueue(maxsize=2)
+    q.put(pool.acquire(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": 0}))
+    q.put(Event(EventType.MARKET_TICK, {"SecurityID": "600519"}))
+    # 队列已满：替换已有槽位仍然可以，新位置则失败
+    q.put(pool.acquire(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": 1}), block=False)
+    try:
+        q.put(Event(EventType.MARKET_TICK, {"SecurityID": "600519"}), timeout=0.01)
+        raise AssertionError("队列满时应抛出 queue.Full")
+    except queue.Full:
+        pass
+    assert q.get().type == EventType.MARKET_TICK, "新快照排在之前已入队的逐笔之后"
+    assert q.get().data["seq"] == 1
+    assert pool.stats()["free"] == 1, "被合并的池化事件应归还对象池"
+    print(f"✅ 容量上限生效, stats={q.stats()}")
+
+
+def test_arrival_order():
+    """快照 -> 信号 -> 快照：合并后新快照排在信号之后，信号不会先看到之后的行情"""
+    q = ConflatingQueue()
+    q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": 0}))
+    q.put(Event(EventType.STRATEGY_SIGNAL, {"symbol": "600519", "action": "BUY"}))
+    q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": 1}))
+    q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": 2}))
+    assert q.qsize() == 2
+    events = q.get_many(10, timeout=0)
+    assert [e.type for e in events] == [EventType.STRATEGY_SIGNAL, EventType.MARKET_SNAPSHOT], events
+    assert events[1].data["seq"] == 2 and q.empty()
+
+    # 大量合并后旧槽位被压缩，不随合并次数增长
+    for i in range(10000):
+        q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": i}))
+    assert len(q._queue) < 100 and q.qsize() == 1
+    assert q.get().data["seq"] == 9999
+    print(f"✅ 合并保持到达顺序, stats={q.stats()}")
+
+
+def test_engine():
+    engine = EventEngine("conflate_test", queue_type="conflating")
+    seen = []
+    engine.register(EventType.MARKET_SNAPSHOT, lambda e: seen.append(e.data["seq"]))
+    for i in range(1000):
+        engine.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": i}))
+    engine.start()
+    time.sleep(1.5)
+    engine.stop()
+    assert seen == [999], seen
+    print(f"✅ EventEngine(queue_type='conflating'): 积压 1000 条只处理最新一条, {engine.queue_stats()}")
+
+
+def main():
+    print("🚀 启动行情合并队列测试")
+    test_conflate()
+    test_bound_and_pool()
+    test_arrival_order()
+    test_engine()
+
+
+if __name__ == "__main__":
+    main()
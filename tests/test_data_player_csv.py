@@ -0,0 +1,79 @@
+# tests/test_data_player_csv.py
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src.backtest.data_player import DataPlayer, _time_ms
+
+
+class Collector:
+    def __init__(self):
+        self.rows = []
+        self.times = []
+
+    def bind_producer(self):
+        pass
+
+    def put(self, event):
+        self.rows.append(event.data)
+        self.times.append(time.perf_counter())
+
+
+def write_csv(path: str):
+    # 3 个时刻：09:30:00.000、09:30:00.100（两行）、09:30:00.300
+    pd.DataFrame({
+        "SecurityID": ["000001", "600519", "000001", "600519"],
+        "TradePx": [100, 200, 101, 201],
+        "UpdateTime": [93000000, 93000100, 93000100, 93000300],
+    }).to_csv(path, index=False)
+
+
+def test_time_ms():
+    assert list(_time_ms([93000000, 113059999, 150000001])) == [34_200_000, 41_459_999, 54_000_001]
+    print("✅ HHMMSSsss -> 毫秒")
+
+
+def check_afap(path: str):
+    engine = Collector()
+    DataPlayer(engine, data_source="csv", config={"path": path, "speed": 0, "chunk_size": 3}).start()
+    assert [r["TradePx"] for r in engine.rows] == [100, 200, 101, 201]
+    assert engine.rows[0] == {"SecurityID": "000001", "TradePx": 100, "UpdateTime": 93000000}, engine.rows[0]
+    assert type(engine.rows[0]["TradePx"]) is int, "应为 Python 原生类型"
+    print("✅ 尽快回放：顺序、字段、代码前导零")
+
+
+def check_speed(path: str, speed: float):
+    engine = Collector()
+    t0 = time.perf_counter()
+    DataPlayer(engine, data_source="csv", config={"path": path, "speed": speed}).start()
+    offsets = [t - t0 for t in engine.times]
+    expected = [0, 0.1 / speed, 0.1 / speed, 0.3 / speed]
+    assert all(e - 0.005 <= o < e + 0.05 for o, e in zip(offsets, expected)), offsets
+    print(f"✅ {speed:g} 倍速: 发布时刻 {[round(o * 1000) for o in offsets]} ms")
+
+
+def check_fixed_delay(path: str):
+    engine = Collector()
+    t0 = time.perf_counter()
+    DataPlayer(engine, data_source="csv", config={"path": path}, delay=0.02).start()
+    assert len(engine.rows) == 4 and time.perf_counter() - t0 >= 0.08
+    print("✅ 未设置 speed 时按 delay 逐行回放")
+
+
+def main():
+    print("🚀 启动 DataPlayer CSV 回放测试")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.csv")
+        write_csv(path)
+        test_time_ms()
+        check_afap(path)
+        check_speed(path, 1)
+        check_speed(path, 3)
+        check_fixed_delay(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# tests/test_data_saver.py
+
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_handler import MarketDataSaver
+
+
+def snapshot(i: int, code: str) -> dict:
+    return {"symbol": code, "last_price": 100000 + i, "volume": i * 100, "trade_date": 20250424,
+            "update_time": 93000000 + i, "SecurityID": code, "TradePx": 100000 + i}
+
+
+def run(compress: bool, n: int = 20000, n_symbols: int = 50):
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = MarketDataSaver(compress=compress, root_dir=tmp, flush_rows=500,
+                                flush_interval=0.05, max_open_files=8)
+        codes = [f"{600000 + k:06d}" for k in range(n_symbols)]
+
+        t0 = time.perf_counter()
+        for i in range(n):
+            saver.save_snapshot(snapshot(i, codes[i % n_symbols]))
+        per_call_us = (time.perf_counter() - t0) / n * 1e6
+        time.sleep(0.2)
+        saver.close()
+
+        stats = saver.stats()
+        assert stats["saved"] == n and stats["dropped"] == 0 and stats["open_files"] == 0, stats
+        suffix = ".csv.gz" if compress else ".csv"
+        files = sorted(Path(tmp).glob(f"*/20250424{suffix}"))
+        assert len(files) == n_symbols, len(files)
+        df = pd.read_csv(files[0], dtype={"SecurityID": str, "symbol": str})
+        assert len(df) == n // n_symbols, "LRU 淘汰后重新打开不应重复写表头"
+        assert df["update_time"].is_monotonic_increasing and df["SecurityID"].eq(codes[0]).all()
+        print(f"✅ compress={compress}: {n} 行 / {n_symbols} 个文件, save_snapshot {per_call_us:.2f} 微秒/次, "
+              f"{stats['flushes']} 个批次")
+
+
+def test_drop_when_full():
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = MarketDataSaver(root_dir=tmp, flush_rows=10**9, flush_interval=60, max_buffer=10)
+        for i in range(15):
+            saver.save_snapshot(snapshot(i, "000001"))
+        saver.save_snapshot({"last_price": 1})      # 无代码的行忽略
+        assert saver.stats()["pending"] == 10 and saver.dropped == 5
+        saver.close()
+        assert saver.saved == 10
+        saver.save_snapshot(snapshot(99, "000001"))  # 关闭后忽略
+        assert saver.stats()["pending"] == 0
+        print("✅ 积压上限生效，关闭时写出剩余数据")
+
+
+def test_flush_touched_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = MarketDataSaver(root_dir=tmp, flush_rows=10**9, flush_interval=60)
+        saver._write_csv([(None, snapshot(0, "000001")), (None, snapshot(0, "000002"))])
+        flushed = []
+        for (code, _), (f, _) in saver._files.items():
+            f.flush = lambda code=code, flush=f.flush: (flushed.append(code), flush())[1]
+        saver._write_csv([(None, snapshot(1, "000001"))])
+        assert flushed == ["000001"], f"只应刷新本批写过的文件: {flushed}"
+        saver.close()
+        assert len(pd.read_csv(Path(tmp, "000002", "20250424.csv"))) == 1
+        print("✅ 每批只刷新写过的文件")
+
+
+def main():
+    print("🚀 启动快照落盘测试")
+    run(compress=False)
+    run(compress=True)
+    test_drop_when_full()
+    test_flush_touched_only()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# tests/test_event_engine_batch.py
+
+import time
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+def main():
+    print("🚀 启动批量事件引擎测试")
+
+    engine = EventEngine("batch_test", batch_size=64, batch_budget_us=200)
+    singles, batches = [], []
+
+    engine.register(EventType.MARKET_SNAPSHOT, lambda e: singles.append(e.data["seq"]))
+    engine.register_batch(EventType.MARKET_SNAPSHOT, lambda evs: batches.append([e.data["seq"] for e in evs]))
+    engine.start()
+
+    for seq in range(1000):
+        engine.put(Event(type_=EventType.MARKET_SNAPSHOT,
+                         data={"SecurityID": "600519", "seq": seq}, source="TEST"))
+
+    time.sleep(1.5)
+    engine.stop()
+
+    assert singles == list(range(1000)), "逐条回调顺序错乱"
+    assert [s for b in batches for s in b] == list(range(1000)), "批量回调顺序错乱"
+    assert max(len(b) for b in batches) <= 64
+    print(f"✅ 1000 个事件分 {len(batches)} 批处理，最大批 {max(len(b) for b in batches)}")
+
+
+
+def test_cross_type_order():
+    """订阅多种事件类型的批量回调按到达顺序看到事件：较早的信号先于之后的行情"""
+    engine = EventEngine("batch_order_test", batch_size=256, batch_budget_us=2000)
+    seen, runs = [], []
+
+    def on_events(events):
+        runs.append(len(events))
+        seen.extend((e.type, e.data["seq"]) for e in events)
+
+    engine.register_batch(EventType.MARKET_SNAPSHOT, on_events)
+    engine.register_batch(EventType.STRATEGY_SIGNAL, on_events)
+    expected = []
+    for seq in range(300):
+        event_type = EventType.STRATEGY_SIGNAL if seq % 10 == 9 else EventType.MARKET_SNAPSHOT
+        expected.append((event_type, seq))
+        engine.put(Event(type_=event_type, data={"SecurityID": "600519", "seq": seq}))
+    engine.start()
+    time.sleep(1.5)
+    engine.stop()
+
+    assert seen == expected, "跨类型顺序错乱"
+    assert max(runs) == 9, "连续同类型事件仍合并为一批"
+    print(f"✅ 多类型批量回调保持到达顺序，共 {len(runs)} 段")
+
+
+def test_stop_drain():
+    """stop(drain=True) 先排空队列：积压的行情与回调中投递的后续信号都处理完才停止"""
+    for options in ({}, {"batch_size": 32}, {"workers": 2}):
+        engine = EventEngine("drain_test", **options)
+        snapshots, signals = [], []
+
+        def on_snapshot(event):
+            time.sleep(0.0005)
+            snapshots.append(event.data["seq"])
+            if event.data["seq"] % 10 == 0:
+                engine.put(Event(type_=EventType.STRATEGY_SIGNAL, data=dict(event.data)))
+
+        engine.register(EventType.MARKET_SNAPSHOT, on_snapshot, serial=True)
+        engine.register(EventType.STRATEGY_SIGNAL, lambda e: signals.append(e.data["seq"]), serial=True)
+        engine.start()
+        for seq in range(1000):
+            engine.put(Event(type_=EventType.MARKET_SNAPSHOT,
+                             data={"SecurityID": f"60051{seq % 4}", "seq": seq}))
+        engine.stop(drain=True)
+
+        assert sorted(snapshots) == list(range(1000)), f"{options}: 停止时丢弃了 {1000 - len(snapshots)} 条行情"
+        assert sorted(signals) == list(range(0, 1000, 10)), f"{options}: 回调中投递的信号未处理完"
+    print("✅ stop(drain=True) 排空积压与后续事件后再停止")
+
+
+if __name__ == "__main__":
+    main()
+    test_cross_type_order()
+    test_stop_drain()
@@ -0,0 +1,113 @@
+# tests/test_event_engine_sharded.py
+
+import threading
+import time
+from collections import defaultdict
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+def main():
+    print("🚀 启动分片事件引擎测试")
+
+    engine = EventEngine("shard_test", workers=4)
+    received = defaultdict(list)
+    threads = defaultdict(set)
+
+    def handle_snapshot(event: Event):
+        sym = event.data["SecurityID"]
+        received[sym].append(event.data["seq"])
+        threads[sym].add(threading.get_ident())
+        time.sleep(0.001)       # 模拟慢策略
+
+    engine.register(EventType.MARKET_SNAPSHOT, handle_snapshot)
+    engine.start()
+
+    symbols = ["600519", "000858", "300750", "601318", "000001", "688981"]
+    for seq in range(50):
+        for sym in symbols:
+            engine.put(Event(type_=EventType.MARKET_SNAPSHOT,
+                             data={"SecurityID": sym, "seq": seq}, source="TEST"))
+
+    time.sleep(1)
+    engine.stop()
+
+    for sym in symbols:
+        assert received[sym] == list(range(50)), f"{sym} 顺序错乱: {received[sym]}"
+        assert len(threads[sym]) == 1, f"{sym} 被多个线程处理"
+    print(f"✅ 每个标的均按序处理，共使用线程 {len({t for s in threads.values() for t in s})} 个")
+
+
+class _Account:
+    """跨标的共享状态的回调：同一对象的逐条 / 批量回调均以 serial 注册"""
+
+    def __init__(self):
+        self.cash = 0
+        self.active = 0
+        self.overlaps = 0
+        self.threads = set()
+
+    def _apply(self, n: int):
+        self.active += 1
+        if self.active > 1:
+            self.overlaps += 1
+        self.threads.add(threading.get_ident())
+        cash = self.cash
+        time.sleep(0)           # 让出 GIL，无锁时并发的读-改-写会丢失更新
+        self.cash = cash + n
+        self.active -= 1
+
+    def on_event(self, event: Event):
+        self._apply(1)
+
+    def on_events(self, events: list):
+        self._apply(len(events))
+
+
+def test_serial_handlers():
+    engine = EventEngine("serial_test", workers=4)
+    account = _Account()
+    engine.register(EventType.MARKET_SNAPSHOT, account.on_event, serial=True)
+    engine.register_batch(EventType.MARKET_SNAPSHOT, account.on_events, serial=True)
+    engine.start()
+    symbols = [f"{600000 + i}" for i in range(16)]
+    for seq in range(200):
+        for sym in symbols:
+            engine.put(Event(type_=EventType.MARKET_SNAPSHOT, data={"SecurityID": sym, "seq": seq}))
+    time.sleep(1)
+    engine.stop()
+    assert account.cash == 2 * 200 * len(symbols), account.cash
+    assert account.overlaps == 0 and len(account.threads) > 1
+    print(f"✅ serial 回调在 {len(account.threads)} 个分片线程间串行执行，无丢失更新")
+
+
+def test_sharded_profiling_and_unregister():
+    engine = EventEngine("profile_test", workers=4, profile=True)
+    account = _Account()
+    seen = []
+    engine.register(EventType.MARKET_SNAPSHOT, account.on_event, serial=True)
+    engine.register(EventType.MARKET_SNAPSHOT, lambda event: seen.append(event))
+    engine.start()
+    engine._queues[0].put(None)         # 工作线程遇到空事件时跳过而不退出
+    symbols = [f"{600000 + i}" for i in range(16)]
+    for seq in range(500):
+        for sym in symbols:
+            engine.put(Event(type_=EventType.MARKET_SNAPSHOT, data={"SecurityID": sym, "seq": seq}))
+    time.sleep(1)
+    engine.stop()
+    calls = {r["handler"]: r["calls"] for r in engine.handler_stats()}
+    assert len(seen) == 500 * len(symbols), len(seen)
+    assert sorted(calls.values()) == [500 * len(symbols)] * 2, calls
+    assert len(engine._stats_tables) > 1, "各分片线程各记一份统计"
+
+    engine.unregister(EventType.MARKET_SNAPSHOT, account.on_event)
+    assert not engine._serial and not engine._owner_locks, "注销后移除加锁包装与对象锁"
+    print(f"✅ 分片模式回调统计合并无丢失: {calls}")
+
+
+if __name__ == "__main__":
+    main()
+    test_serial_handlers()
+    test_sharded_profiling_and_unregister()
@@ -0,0 +1,148 @@
+# tests/test_fill_simulator.py
+
+import math
+import time
+
+from src.account.account_simulator import AccountSimulator
+from src.account.fill_simulator import FillSimulator
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+def book(symbol="600519", day=20250424, bid=(99, 98), bid_qty=(300, 500), ask=(100, 101, 102), ask_qty=(200, 300, 400)):
+    """ORDER_BOOK 深度事件数据"""
+    return {"kind": "book", "SecurityID": symbol, "trade_date": day, "last_price": 100,
+            "bid_px": list(bid), "bid_qty": list(bid_qty), "ask_px": list(ask), "ask_qty": list(ask_qty)}
+
+
+class Levels:
+    """SnapshotView 替身：BidLevels / OfferLevels 为档位结构"""
+
+    class Level:
+        def __init__(self, price, qty):
+            self.Price, self.OrderQty = price, qty
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+
+def signal(action, volume, price=100, **extra):
+    return {"symbol": "600519", "action": action, "price": price, "volume": volume, **extra}
+
+
+def no_fees(**kwargs):
+    return FillSimulator(commission_rate=0, min_commission=0, stamp_duty=0, transfer_fee=0, **kwargs)
+
+
+def test_walk_book():
+    sim = no_fees()
+    sim.on_market(book())
+    fill = sim.execute(signal("buy", 400), position=0, cash=1e9)
+    assert fill.qty == 400 and fill.price == (200 * 100 + 200 * 101) / 400 and not fill.reason
+    assert sim.book("600519")[3] == [0, 100, 400], "成交后扣减缓存盘口"
+
+    fill = sim.execute(signal("buy", 1000), position=0, cash=1e9)
+    assert fill.qty == 500 and fill.reason == "部分成交 500/1000", fill.reason
+    assert sim.execute(signal("buy", 100), position=0, cash=1e9).qty == 0, "对手盘已吃完"
+
+    sim.on_market(book())
+    fill = sim.execute(signal("buy", 900, price=101, order_type="limit"), position=0, cash=1e9)
+    assert fill.qty == 500 and fill.price == (200 * 100 + 300 * 101) / 500, "限价单不吃劣于限价的档位"
+    print("✅ 逐档吃单 / 部分成交 / 限价")
+
+
+def test_snapshot_levels_and_slippage():
+    sim = no_fees(slippage_bps=10)
+    L = Levels.Level
+    sim.on_market(Levels({"SecurityID": "600519", "trade_date": 20250424,
+                          "BidLevels": [L(99, 1000), L(0, 0)], "OfferLevels": [L(100, 1000), L(0, 0)]}))
+    fill = sim.execute(signal("sell", 300), position=300, cash=0)
+    assert math.isclose(fill.price, 99 * (1 - 0.001)) and fill.qty == 300
+    sim.on_market({"SecurityID": "000001", "TradePx": 10})        # 无档位的字典快照不缓存
+    assert sim.book("000001") is None
+    fill = sim.execute({"symbol": "000001", "action": "buy", "price": 10, "volume": 100}, position=0, cash=1e9)
+    assert fill.qty == 100 and math.isclose(fill.price, 10 * 1.001), "无盘口按信号价加滑点成交"
+    print("✅ L2 十档快照 / 滑点")
+
+
+def test_fees_lots_and_t_plus_one():
+    sim = FillSimulator()
+    sim.on_market(book(ask_qty=(10000, 0, 0), bid_qty=(10000, 0)))
+    fill = sim.execute(signal("buy", 250), position=0, cash=1e9)
+    assert fill.qty == 200, "买入向下取整到整手"
+    assert math.isclose(fill.fee, 5 + 20000 * 0.00001), "佣金不低于最低佣金"
+    assert sim.execute(signal("buy", 50), position=0, cash=1e9).qty == 0
+
+    assert sim.execute(signal("sell", 100), position=200, cash=0).reason.startswith("可卖数量不足"), "T+1"
+    sim.on_market(book(day=20250425, ask_qty=(10000, 0, 0), bid_qty=(10000, 0)))
+    fill = sim.execute(signal("sell", 150), position=250, cash=0)
+    assert fill.qty == 100, "卖出非整手向下取整"
+    fill = sim.execute(signal("sell", 150), position=150, cash=0)
+    assert fill.qty == 150, "卖出全部剩余持仓允许零股"
+    amount = 150 * 99
+    assert math.isclose(fill.fee, 5 + amount * (0.0005 + 0.00001)), "卖出收印花税"
+
+    fill = sim.execute(signal("buy", 1000), position=0, cash=50_000)
+    assert fill.qty == 400 and fill.price * fill.qty + fill.fee <= 50_000, "资金不足时缩减到买得起的整手"
+    print(f"✅ 费用 / 整手 / T+1: {sim.stats()}")
+
+
+def test_cash_limit_and_best_orders():
+    sim = no_fees()
+    sim.on_market(book())
+    fill = sim.execute(signal("buy", 1000), position=0, cash=30_000)
+    assert fill.qty == 200 and fill.price == 100, "资金只够买一档"
+    assert sim.book("600519")[3] == [0, 300, 400], "资金不足时只扣减实际成交的数量"
+
+    sim = no_fees(slippage_bps=10, t_plus_one=False)
+    sim.on_market(book())
+    fill = sim.execute(signal("buy", 300, price=100.05, order_type="limit"), position=0, cash=1e9)
+    assert fill.qty == 200 and fill.price == 100.05, "加滑点后的均价不超过限价"
+    fill = sim.execute(signal("sell", 300, price=99, order_type="limit"), position=300, cash=0)
+    assert fill.qty == 300 and fill.price == 99, "卖出均价不低于限价"
+
+    sim.on_market({"kind": "best_orders", "SecurityID": "600519", "trade_date": 20250424,
+                   "BestBidPrice": 99, "BestOfferPrice": 100, "BidOrderQty": [100], "OfferOrderQty": [100]})
+    assert sim.book("600519")[3] == [0, 300, 400], "委托队列不覆盖已缓存的盘口"
+    print("✅ 资金不足回补盘口 / 限价封顶 / 忽略委托队列")
+
+
+def test_account_integration():
+    account = AccountSimulator(initial_cash=100_000, fill_simulator=FillSimulator())
+    account.on_events([Event(EventType.ORDER_BOOK, book()),
+                       Event(EventType.STRATEGY_SIGNAL, signal("buy", 300))])
+    fee = (200 * 100 + 100 * 101) * (0.00025 + 0.00001)
+    assert account.position == {"600519": 300}
+    assert math.isclose(account.cash, 100_000 - 200 * 100 - 100 * 101 - fee)
+    assert math.isclose(account.trades["fee"][0], fee)
+    account.on_event(Event(EventType.STRATEGY_SIGNAL, signal("sell", 300)))
+    assert account.position == {"600519": 300}, "当日买入不可卖"
+    print("✅ AccountSimulator 按盘口撮合")
+
+
+def test_speed(n: int = 100_000):
+    sim = FillSimulator()
+    data = book(ask_qty=(10**9, 10**9, 10**9), bid_qty=(10**9, 10**9))
+    sim.on_market(data)
+    sig = signal("buy", 300)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        sim.execute(sig, position=0, cash=1e12)
+    print(f"✅ 撮合 {(time.perf_counter() - t0) / n * 1e6:.2f} 微秒/笔")
+
+
+def main():
+    print("🚀 启动撮合模拟测试")
+    test_walk_book()
+    test_snapshot_levels_and_slippage()
+    test_fees_lots_and_t_plus_one()
+    test_cash_limit_and_best_orders()
+    test_account_integration()
+    test_speed()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# tests/test_handler_profiling.py
+
+import time
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+class SlowStrategy:
+    name = "slow_ma"
+
+    def on_event(self, event):
+        if event.data["seq"] % 50 == 0:
+            time.sleep(0.005)
+
+
+def main():
+    print("🚀 启动回调耗时统计测试")
+
+    engine = EventEngine("profile_test", slow_handler_ms=2)
+    alerts = []
+
+    engine.register(EventType.MARKET_SNAPSHOT, SlowStrategy().on_event)
+    engine.register(EventType.MARKET_SNAPSHOT, lambda e: None)
+    engine.register(EventType.LOG_EVENT, alerts.append)
+    engine.start()
+
+    for seq in range(200):
+        engine.put(Event(type_=EventType.MARKET_SNAPSHOT, data={"seq": seq}, source="TEST"))
+
+    time.sleep(1.5)
+    engine.stop()
+
+    stats = engine.handler_stats()
+    engine.print_handler_stats()
+    slow = stats[0]
+    assert slow["handler"] == "SlowStrategy.on_event[slow_ma]", slow
+    assert slow["calls"] == 200 and slow["slow"] == 4 and slow["max_ms"] >= 5
+    # 同一回调每秒至多告警一次
+    assert len(alerts) == 1, alerts
+    assert alerts[0].data["handler"] == slow["handler"]
+    assert alerts[0].data["event_type"] == "MARKET_SNAPSHOT"
+    print(f"✅ 慢回调 {slow['handler']} 被识别，告警 {len(alerts)} 次")
+
+
+if __name__ == "__main__":
+    main()
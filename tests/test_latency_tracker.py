@@ -0,0 +1,74 @@
+# tests/test_latency_tracker.py
+
+import os
+import tempfile
+import time
+
+from src.backtest.data_player import DataPlayer
+from src.strategy.ma_cross import MaCrossStrategy
+from src.event_engine.event import Event, event_pool
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event_type import EventType
+from src.account.account_simulator import AccountSimulator
+from src.monitor.latency import LatencyHistogram, latency_tracker
+
+
+def test_histogram():
+    h = LatencyHistogram()
+    for v in range(1, 100_001):
+        h.record(v * 1000)          # 1us ~ 100ms 均匀分布
+    p50, p99 = h.percentile(50), h.percentile(99)
+    assert abs(p50 - 50_000_000) / 50_000_000 < 0.05, p50
+    assert abs(p99 - 99_000_000) / 99_000_000 < 0.05, p99
+    print(f"✅ 直方图 p50={p50 / 1e6:.2f}ms p99={p99 / 1e6:.2f}ms (误差 < 5%)")
+
+
+def test_pipeline():
+    latency_tracker.reset()
+    latency_tracker.enable()
+
+    eng = EventEngine("latency")
+    account = AccountSimulator(initial_cash=100_000)
+    strategy = MaCrossStrategy("ma_test", eng, {"short_window": 3, "long_window": 5})
+    eng.register(EventType.MARKET_SNAPSHOT, strategy.on_event)
+    eng.register(EventType.STRATEGY_SIGNAL, account.on_event)
+    eng.start()
+
+    DataPlayer(event_engine=eng, data_source="mock", delay=0.01).start()
+    time.sleep(0.5)
+    eng.stop()
+    latency_tracker.enable(False)
+
+    stages = latency_tracker.summaries()
+    for stage in ("enqueue->dequeue", "dispatch:MARKET_SNAPSHOT", "tick->done:STRATEGY_SIGNAL"):
+        assert stage in stages, f"缺少阶段 {stage}: {list(stages)}"
+    latency_tracker.report()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "latency.csv")
+        latency_tracker.to_csv(path)
+        assert os.path.exists(path)
+
+
+def test_lazy_stamps():
+    """延迟统计字段按需分配：行情事件不携带，派生事件 / 入队时才分配"""
+    tick = event_pool.acquire(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519"})
+    assert tick._extra is None and tick.enq_ns == 0 and tick.origin_ns is None
+    signal = Event(EventType.STRATEGY_SIGNAL, {}, origin_ns=tick.recv_ns)
+    assert signal.origin_ns == tick.recv_ns and signal.enq_ns == 0
+    tick.enq_ns = 123
+    assert tick.enq_ns == 123 and tick.ts_ns is None
+    event_pool.release(tick)
+    assert event_pool.acquire(EventType.MARKET_SNAPSHOT)._extra is None, "回收后复用的事件不保留旧时间戳"
+    print("✅ 延迟时间戳按需分配")
+
+
+def main():
+    print("🚀 启动延迟统计测试")
+    test_histogram()
+    test_pipeline()
+    test_lazy_stamps()
+
+
+if __name__ == "__main__":
+    main()
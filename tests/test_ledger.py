@@ -0,0 +1,130 @@
+# tests/test_ledger.py
+
+import math
+import random
+import time
+
+import numpy as np
+
+from src.account.ledger import Ledger, BUY, SELL, market_ts
+
+DAY = 86400.0
+
+
+def test_symbol_pnl():
+    ledger = Ledger(capacity=2)                    # 小容量，覆盖扩容
+    ledger.record_trade(1.0, "600519", BUY, 100.0, 200, fee=5.0)
+    ledger.record_trade(2.0, "000001", BUY, 10.0, 1000)
+    ledger.record_trade(3.0, "600519", BUY, 110.0, 200)
+    ledger.record_trade(4.0, "600519", SELL, 120.0, 300, fee=7.0)
+    ledger.record_trade(5.0, "000001", SELL, 9.0, 1000)
+
+    pnl = ledger.symbol_pnl({"600519": 130.0}).set_index("symbol")
+    assert list(pnl.index) == ["600519", "000001"] and len(ledger.trades) == 5
+    row = pnl.loc["600519"]
+    assert row.position == 100 and math.isclose(row.avg_cost, 105.0)
+    assert math.isclose(row.realized, 300 * (120 - 105) - 12) and math.isclose(row.unrealized, 100 * (130 - 105))
+    # 总盈亏 = 卖出金额 - 买入金额 + 持仓市值 - 手续费
+    assert math.isclose(row.total, 36000 - 42000 + 13000 - 12)
+    row = pnl.loc["000001"]
+    assert row.position == 0 and math.isclose(row.realized, -1000) and row.unrealized == 0 and row.last_price == 9.0
+    print(f"✅ 分标的盈亏\n{pnl}")
+
+
+def test_running_average_cost():
+    """卖出按当时的移动平均成本结算，平仓后重新建仓不影响已实现盈亏"""
+    ledger = Ledger()
+    ledger.record_trade(1.0, "600519", BUY, 10.0, 100)
+    ledger.record_trade(2.0, "600519", SELL, 12.0, 100)
+    ledger.record_trade(3.0, "600519", BUY, 20.0, 100)
+    row = ledger.symbol_pnl().iloc[0]
+    assert math.isclose(row.realized, 200) and math.isclose(row.avg_cost, 20) and abs(row.unrealized) < 1e-9, row
+
+    # 与逐笔移动平均成本的循环实现对比（多标的交错、成交时间乱序写入、多次平仓再建仓）
+    rng = random.Random(7)
+    ledger, trades = Ledger(), []
+    position = {}
+    for i in range(3000):
+        sym = rng.choice(["A", "B", "C"])
+        held = position.get(sym, 0)
+        side = SELL if held and rng.random() < 0.45 else BUY
+        qty = rng.randint(1, held) if side == SELL else rng.randint(1, 500)
+        position[sym] = held + side * qty
+        trades.append((float(i), sym, side, round(rng.uniform(5, 50), 2), qty, round(rng.random(), 2)))
+    for trade in rng.sample(trades, len(trades)):
+        ledger.record_trade(*trade)
+
+    expected = {}
+    for _, sym, side, price, qty, fee in trades:
+        pos, cost, realized = expected.get(sym, (0, 0.0, 0.0))
+        if side == BUY:
+            pos, cost = pos + qty, cost + price * qty
+        else:
+            avg = cost / pos
+            realized += qty * (price - avg)
+            pos, cost = pos - qty, cost - avg * qty
+        expected[sym] = (pos, cost, realized - fee)
+    pnl = ledger.symbol_pnl().set_index("symbol")
+    for sym, (pos, cost, realized) in expected.items():
+        row = pnl.loc[sym]
+        assert row.position == pos and math.isclose(row.realized, realized, rel_tol=1e-9), (sym, row, realized)
+        assert math.isclose(row.avg_cost, cost / pos if pos else 0.0, rel_tol=1e-9, abs_tol=1e-9)
+    print(f"✅ 移动平均成本与逐笔循环一致: {dict(pnl['realized'].round(2))}")
+
+
+def test_analytics():
+    ledger = Ledger()
+    equity = [100.0, 110.0, 99.0, 120.0, 108.0]
+    for day, value in enumerate(equity):
+        ledger.record_equity(day * DAY + 3600, value / 2, value)
+        ledger.record_equity(day * DAY + 7200, value / 2, value)     # 同一天第二条
+    ledger.record_trade(3600, "600519", BUY, 10.0, 100)
+    ledger.record_trade(DAY + 3600, "600519", SELL, 11.0, 100)
+
+    stats = ledger.analytics(initial_equity=100.0)
+    daily = np.array(equity)
+    daily_returns = np.diff(daily) / daily[:-1]
+    assert np.allclose(stats["daily_returns"], daily_returns)
+    expected = daily_returns.mean() / daily_returns.std(ddof=1) * math.sqrt(252)
+    assert math.isclose(stats["sharpe"], expected), (stats["sharpe"], expected)
+    assert math.isclose(stats["max_drawdown"], 99 / 110 - 1)
+    assert stats["max_drawdown_ts"] == 2 * DAY + 3600
+    assert math.isclose(stats["total_return"], 0.08) and len(stats["returns"]) == 9
+    assert math.isclose(stats["turnover"], 2100 / daily.mean())
+    print(f"✅ 绩效: 夏普 {stats['sharpe']:.2f}, 最大回撤 {stats['max_drawdown']:.2%}")
+
+    empty = Ledger().analytics()
+    assert empty["trades"] == 0 and math.isnan(empty["sharpe"]) and empty["max_drawdown"] == 0.0
+    assert len(Ledger().trades_frame()) == 0
+
+    # 行情时间与显示时间按交易所时区（UTC+8），与运行机器的时区无关
+    ledger = Ledger()
+    ledger.record_trade(market_ts({"trade_date": 20250422, "update_time": 93000000}), "600519", BUY, 10.0, 100)
+    assert ledger.trades_frame()["time"][0] == "2025-04-22 09:30:00", ledger.trades_frame()
+
+
+def test_throughput(n: int = 200_000):
+    ledger = Ledger()
+    symbols = [f"{600000 + k:06d}" for k in range(500)]
+    t0 = time.perf_counter()
+    for i in range(n):
+        ledger.record_equity(i, 1e6, 1e6 + i % 1000)
+        if i % 10 == 0:
+            ledger.record_trade(i, symbols[i % 500], BUY if i % 20 else SELL, 10.0, 100)
+    append_us = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    ledger.analytics()
+    print(f"✅ 追加 {append_us:.2f} 微秒/条, {n} 条资产 + {len(ledger.trades)} 笔成交的绩效计算 "
+          f"{(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+def main():
+    print("🚀 启动列式账本测试")
+    test_symbol_pnl()
+    test_running_average_cost()
+    test_analytics()
+    test_throughput()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import time
 from src.event_engine.event_engine import EventEngine
 from src.market.market_event_handler import MarketEventHandler
 from src.event_engine.event_type import EventType
+from src.event_engine.priority_queue import DEFAULT_LANE_MAP
 
 
 class MockL2Stock:
@@ -34,15 +35,23 @@ class MockMsg:
         self.index = type("Index", (), {
             "SecurityID": b"000001",
             "OpenPx": 1000, "HighPx": 2000,
-            "LowPx": 900, "TradePx": 1500, "ClosePx": 1400
+            "LowPx": 900, "TradePx": 1500, "ClosePx": 1400,
+            "TotalVolumeTraded": 100000
         })()
         self.option = type("Option", (), {
             "SecurityID": b"100001",
             "TradePx": 320,
+            "TotalVolumeTraded": 50,
             "BidLevels": [type("Bid", (), {"Price": 1}) for _ in range(5)],
             "OfferLevels": [type("Offer", (), {"Price": 2}) for _ in range(5)]
         })()
-        self.l2BestOrders = self.l2Stock
+        self.l2BestOrders = type("BestOrders", (), {
+            "SecurityID": b"600519",
+            "NoBidOrders": 3, "NoOfferOrders": 2,
+            "TotalVolumeTraded": 24000,
+            "BestBidPrice": 1579900, "BestOfferPrice": 1580100,
+            "BidOrderQty": [100, 200, 300, 0, 0], "OfferOrderQty": [400, 500, 0, 0, 0]
+        })()
         self.l2MarketOverview = type("Overview", (), {
             "OrigDate": 20250424,
             "OrigTime": 93100000
@@ -52,12 +61,31 @@ class MockMsg:
         self.TradeQty = 100
         self.Price = 145000
         self.OrderQty = 200
-        self.OrderType = "1"
-        self.Side = "B"
+        self.OrderType = b"2"
+        self.Side = b"1"
         self.OrderTime = 93100000
+        # 逐笔成交 / 委托共有字段
+        self.exchId = 2
+        self.tradeDate = 20250424
+        self.TransactTime = 93100000
+        self.ChannelNo = 2011
+        self.ApplSeqNum = 1001
+        self.SseBizIndex = 0
+        self.SseOrderNo = 0
+        self.ExecType = b"F"
+        self.TradeBSFlag = b"N"
+        self.TradeMoney = 14500000
+        self.BidApplSeqNum = 998
+        self.OfferApplSeqNum = 999
+
+
+captured = []
+types = {}
 
 
 def handle_event(event):
+    captured.append(event.source)
+    types[event.source] = event.type
     print(f"✅ 捕获事件: 类型={event.type}, 来源={event.source}, 数据={event.data}")
 
 
@@ -82,6 +110,14 @@ def main():
     time.sleep(1)
     engine.stop()
 
+    expected = ["L2_SNAPSHOT", "L2_TRADE", "L2_ORDER", "L2_BEST_ORDERS", "L2_MARKET_OVERVIEW",
+                "L1_SNAPSHOT", "INDEX_SNAPSHOT", "OPTION_SNAPSHOT"]
+    assert captured == expected, captured
+    # 市场总览走行情车道，不占用控制车道（HEARTBEAT 仅用于链路存活）
+    assert types["L2_MARKET_OVERVIEW"] == EventType.MARKET_OVERVIEW
+    assert DEFAULT_LANE_MAP[EventType.MARKET_OVERVIEW] == "market"
+    print(f"✅ 8 类行情均已发布事件")
+
 
 if __name__ == "__main__":
     main()
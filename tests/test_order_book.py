@@ -0,0 +1,161 @@
+# tests/test_order_book.py
+
+import random
+
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+from src.market.order_book import OrderBook, OrderBookManager, EXCH_SSE, EXCH_SZSE
+
+
+def order(seq, side, price, qty, order_type="2", exch_id=EXCH_SZSE, order_no=0, symbol="000001"):
+    return {"kind": "order", "symbol": symbol, "exch_id": exch_id, "time": 93000000 + seq,
+            "ApplSeqNum": seq, "SseOrderNo": order_no, "Side": side, "OrderType": order_type,
+            "Price": price, "OrderQty": qty}
+
+
+def trade(seq, bid_seq, offer_seq, price, qty, exec_type="F", exch_id=EXCH_SZSE, symbol="000001"):
+    return {"kind": "trade", "symbol": symbol, "exch_id": exch_id, "time": 93000000 + seq,
+            "ApplSeqNum": seq, "ExecType": exec_type, "BidApplSeqNum": bid_seq,
+            "OfferApplSeqNum": offer_seq, "TradePx": price, "TradeQty": qty}
+
+
+def test_szse():
+    book = OrderBook("000001")
+    for tick in [
+        order(1, "1", 100000, 300),      # 买 10.00 x 300
+        order(2, "1", 99900, 200),       # 买  9.99 x 200
+        order(3, "2", 100100, 500),      # 卖 10.01 x 500
+        order(4, "2", 100200, 100),      # 卖 10.02 x 100
+        order(5, "1", 0, 100, "U"),      # 本方最优买 -> 10.00
+    ]:
+        book.apply(tick)
+    assert book.top() == (100000, 400, 100100, 500), book.top()
+
+    # 市价买 600：吃掉 10.01 全部与 10.02 的 100
+    book.apply(order(6, "1", 0, 600, "1"))
+    book.apply(trade(7, 6, 3, 100100, 500))
+    book.apply(trade(8, 6, 4, 100200, 100))
+    assert book.top() == (100000, 400, 0, 0), book.top()
+    assert 6 not in book.orders, "市价单成交完毕后应移除"
+
+    # 撤单：撤掉 10.00 上的第一笔，最优买仍为 10.00 x 100
+    book.apply(trade(9, 1, 0, 0, 300, exec_type="4"))
+    assert book.top()[:2] == (100000, 100)
+    book.apply(trade(10, 5, 0, 0, 100, exec_type="4"))
+    assert book.top()[:2] == (99900, 200), "最优档吃空后应移到下一档"
+    assert book.last_price == 100200 and book.volume == 600
+    print(f"✅ 深交所逐笔重建: {book}")
+
+
+def test_sse():
+    book = OrderBook("600519", EXCH_SSE)
+    book.apply(order(1, "2", 15000000, 200, "A", EXCH_SSE, order_no=11, symbol="600519"))
+    book.apply(order(2, "2", 15001000, 300, "A", EXCH_SSE, order_no=12, symbol="600519"))
+    book.apply(order(3, "1", 14990000, 100, "A", EXCH_SSE, order_no=13, symbol="600519"))
+    # 主动买 250：成交只扣减簿上的卖单 11 / 12，买方订单 14 不在簿上
+    book.apply(trade(4, 14, 11, 15000000, 200, exch_id=EXCH_SSE, symbol="600519"))
+    book.apply(trade(5, 14, 12, 15001000, 50, exch_id=EXCH_SSE, symbol="600519"))
+    assert book.top() == (14990000, 100, 15001000, 250), book.top()
+    book.apply(order(6, "1", 0, 100, "D", EXCH_SSE, order_no=13, symbol="600519"))
+    book.apply(order(7, "T", 0, 0, "S", EXCH_SSE, symbol="600519"))
+    assert book.top()[:2] == (0, 0) and book.status == "T"
+    # 不在 0.01 网格上的价格（如基金 0.001 元）自动细化
+    book.apply(order(8, "1", 14995500, 100, "A", EXCH_SSE, order_no=15, symbol="600519"))
+    assert book.top()[:2] == (14995500, 100)
+    print(f"✅ 上交所逐笔重建: {book}")
+
+
+def test_random_vs_reference():
+    """随机挂单 / 撤单 / 成交，与逐档暴力重算的结果比对"""
+    rng = random.Random(7)
+    book = OrderBook("000002")
+    live = {}
+    seq = 0
+    for _ in range(20000):
+        seq += 1
+        if live and rng.random() < 0.4:
+            oid = rng.choice(list(live))
+            side, price, qty = live[oid]
+            q = rng.randint(1, qty)
+            if rng.random() < 0.5:
+                book.apply(trade(seq, 0 if side == "2" else oid, oid if side == "2" else 0, 0, q, "4"))
+            else:
+                book.apply(trade(seq, oid if side == "1" else 0, oid if side == "2" else 0, price, q))
+            if q == qty:
+                del live[oid]
+            else:
+                live[oid] = (side, price, qty - q)
+        else:
+            side = rng.choice("12")
+            price = rng.randint(900, 1100) * 100 if side == "1" else rng.randint(1000, 1200) * 100
+            qty = rng.randint(1, 10) * 100
+            book.apply(order(seq, side, price, qty))
+            live[seq] = (side, price, qty)
+
+    for side_flag, side, reverse in (("1", book.bids, True), ("2", book.asks, False)):
+        levels = {}
+        for s, price, qty in live.values():
+            if s == side_flag:
+                levels[price] = levels.get(price, 0) + qty
+        expected = sorted(levels.items(), reverse=reverse)[:10]
+        px, qty = side.depth(10)
+        assert list(zip(px, qty)) == expected, (side_flag, list(zip(px, qty)), expected)
+    print(f"✅ 随机 20000 笔与暴力重算一致: {book}")
+
+
+class _Row:
+    """模拟 SnapshotRow 的档位数组接口"""
+
+    class _Arr(list):
+        def tolist(self):
+            return list(self)
+
+    def __init__(self, symbol, bid_px, bid_qty, ask_px, ask_qty):
+        self.symbol = symbol
+        self.bid_px, self.bid_qty = self._Arr(bid_px), self._Arr(bid_qty)
+        self.ask_px, self.ask_qty = self._Arr(ask_px), self._Arr(ask_qty)
+
+    def get(self, key, default=None):
+        return self.symbol if key == "symbol" else default
+
+
+class _Engine:
+    def __init__(self):
+        self.events = []
+
+    def put(self, event):
+        self.events.append(event)
+
+
+def test_manager():
+    engine = _Engine()
+    manager = OrderBookManager(engine, depth=2)
+    ticks = [order(1, "1", 100000, 300), order(2, "2", 100100, 500), order(3, "1", 99900, 200),
+             order(4, "2", 200000, 100, symbol="000002")]
+    manager.on_events([Event(EventType.MARKET_TICK, t) for t in ticks])
+    assert len(engine.events) == 2, "每批每个标的只发布一次 ORDER_BOOK"
+    book = engine.events[0].data
+    assert engine.events[0].type == EventType.ORDER_BOOK
+    assert book["bid_px"] == [100000, 99900] and book["ask_qty"] == [500], book
+
+    pad = [0] * 8
+    manager.on_snapshot(Event(EventType.MARKET_SNAPSHOT, _Row(
+        "000001", [100000, 99900] + pad, [300, 200] + pad, [100100] + [0] * 9, [500] + [0] * 9)))
+    manager.on_snapshot(Event(EventType.MARKET_SNAPSHOT, _Row(
+        "000001", [100000] + [0] * 9, [999] + [0] * 9, [0] * 10, [0] * 10)))
+    manager.on_snapshot(Event(EventType.MARKET_SNAPSHOT, {"symbol": "000001", "last_price": 100000}))
+    stats = manager.stats()
+    assert stats["verified"] == 2 and stats["mismatched"] == 1, stats
+    print(f"✅ OrderBookManager: {stats}")
+
+
+def main():
+    print("🚀 启动逐笔委托簿重建测试")
+    test_szse()
+    test_sse()
+    test_random_vs_reference()
+    test_manager()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# tests/test_portfolio.py
+
+import math
+import time
+
+from src.account.fill_simulator import FillSimulator
+from src.account.portfolio import PortfolioEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+
+
+def tick(sym: str, price) -> Event:
+    return Event(EventType.MARKET_SNAPSHOT, {"SecurityID": sym, "TradePx": price})
+
+
+def signal(source: str, sym: str, action: str, price, volume: int = 100) -> Event:
+    return Event(EventType.STRATEGY_SIGNAL, {"symbol": sym, "action": action, "price": price, "volume": volume},
+                 source=source)
+
+
+def test_allocation():
+    p = PortfolioEngine(["A", "B", "C"], total_cash=1_000_000, allocations={"A": 0.5, "B": 100_000})
+    assert {n: a.initial_cash for n, a in p.accounts.items()} == {"A": 500_000, "B": 100_000, "C": 400_000}
+    try:
+        PortfolioEngine(["A", "B"], total_cash=100, allocations={"A": 0.8, "B": 0.8})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("超额分配应报错")
+    print("✅ 资金分配")
+
+
+def test_routing_and_attribution():
+    p = PortfolioEngine(["A", "B"], total_cash=200_000)
+    p.on_events([signal("A", "600519", "buy", 100, 300), signal("B", "000001", "buy", 10, 1000),
+                 signal("B", "600519", "buy", 100, 100), signal("X", "600519", "buy", 100)])
+    a, b = p.accounts["A"], p.accounts["B"]
+    assert a.position == {"600519": 300} and b.position == {"000001": 1000, "600519": 100}
+    assert p.unrouted == 1 and p.positions() == {"600519": 400, "000001": 1000}
+
+    p.on_events([tick("600519", 110), tick("300750", 50)])
+    assert a.equity == 100_000 + 3000 and b.equity == 100_000 + 1000
+    assert math.isclose(p.equity, 204_000) and len(a.history_ts) == 2 and len(b.history_ts) == 3
+
+    p.on_event(signal("A", "600519", "sell", 110, 300))
+    assert "600519" not in a.position or a.position["600519"] == 0
+    p.on_event(tick("600519", 120))
+    assert len(a.history_ts) == 3, "已清仓的子账户不再处理该标的行情"
+    assert b.equity == 100_000 + 2000
+
+    exposure = p.exposure().set_index("symbol")
+    assert exposure.loc["600519", "position"] == 100 and exposure.loc["600519", "B"] == 100
+    assert exposure.loc["600519", "A"] == 0 and math.isclose(exposure.loc["000001", "market_value"], 10_000)
+    summary = p.summary().set_index("strategy")
+    assert summary.loc["A", "trades"] == 2 and math.isclose(summary.loc["A", "return"], 0.03)
+    stats = p.report()
+    assert math.isclose(stats["portfolio"]["total_return"], 5000 / 200_000) and stats["A"]["trades"] == 2
+    print("✅ 按来源路由、分策略归因、组合敞口")
+
+
+def test_shared_fill_simulator():
+    sim = FillSimulator(commission_rate=0, min_commission=0, stamp_duty=0, transfer_fee=0)
+    p = PortfolioEngine(["A", "B"], total_cash=1_000_000, fill_simulator=sim)
+    book = {"kind": "book", "SecurityID": "600519", "trade_date": 20250424,
+            "bid_px": [99], "bid_qty": [1000], "ask_px": [100, 101], "ask_qty": [300, 1000]}
+    p.on_events([Event(EventType.ORDER_BOOK, book), signal("A", "600519", "buy", 100, 200),
+                 signal("B", "600519", "buy", 100, 200)])
+    assert p.accounts["A"].trades["price"][0] == 100
+    assert p.accounts["B"].trades["price"][0] == (100 * 100 + 100 * 101) / 200, "子账户共用盘口，成交扣减互相可见"
+    p.on_event(signal("A", "600519", "sell", 100, 200))
+    assert p.accounts["A"].position["600519"] == 200, "T+1 按子账户冻结"
+    print("✅ 共用撮合器")
+
+
+def test_many_strategies(n_accounts: int = 50, n_ticks: int = 100_000):
+    names = [f"S{k}" for k in range(n_accounts)]
+    p = PortfolioEngine(names, total_cash=1e12)
+    symbols = [f"{600000 + k:06d}" for k in range(1000)]
+    p.on_events([signal(name, symbols[k], "buy", 10.0) for k, name in enumerate(names)])
+    ticks = [tick(symbols[i % len(symbols)], 10.0 + i % 7) for i in range(n_ticks)]
+    t0 = time.perf_counter()
+    for i in range(0, n_ticks, 100):
+        p.on_events(ticks[i:i + 100])
+    per_tick_us = (time.perf_counter() - t0) / n_ticks * 1e6
+    assert math.isclose(p.equity, sum(a.revalue() for a in p.accounts.values()))
+    print(f"✅ {n_accounts} 个子账户 / 1000 个标的: 每个行情 {per_tick_us:.2f} 微秒")
+
+
+def main():
+    print("🚀 启动多策略组合测试")
+    test_allocation()
+    test_routing_and_attribution()
+    test_shared_fill_simulator()
+    test_many_strategies()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# tests/test_priority_queue.py
+
+import time
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+from src.event_engine.priority_queue import PriorityLaneQueue
+
+
+def _fill(q):
+    for i in range(1000):
+        q.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": i}))
+    for i in range(5):
+        q.put(Event(EventType.LOG_EVENT, f"log {i}"))
+    q.put(Event(EventType.RISK_ALERT, {"msg": "超限"}))
+    q.put(Event(EventType.ORDER_CANCEL, {"order_id": 1}))
+
+
+def test_strict():
+    q = PriorityLaneQueue(scheduling="strict")
+    _fill(q)
+    first = [q.get().type for _ in range(3)]
+    assert first == [EventType.RISK_ALERT, EventType.ORDER_CANCEL, EventType.MARKET_SNAPSHOT], first
+    print(f"✅ strict 调度: 风控/撤单先于 1000 条积压快照, stats={q.stats()['lanes']['market']}")
+
+
+def test_weighted():
+    q = PriorityLaneQueue(scheduling="weighted", weights={"market": 2, "logging": 1})
+    _fill(q)
+    order = [q.get().type for _ in range(10)]
+    assert EventType.LOG_EVENT in order, "加权调度下日志车道不应被饿死"
+    print(f"✅ weighted 调度前 10 个事件: {[t.name for t in order]}")
+
+
+def test_engine():
+    engine = EventEngine("prio_test", queue_type="priority")
+    seen = []
+    engine.register("*", lambda e: seen.append(e.type))
+    _fill(engine._queue)
+    engine.start()
+    time.sleep(0.5)
+    engine.stop()
+    assert seen[0] == EventType.RISK_ALERT and len(seen) == 1007
+    print(f"✅ EventEngine(queue_type='priority'): 首个处理事件 {seen[0].name}")
+
+
+def main():
+    print("🚀 启动优先级车道队列测试")
+    test_strict()
+    test_weighted()
+    test_engine()
+
+
+if __name__ == "__main__":
+    main()
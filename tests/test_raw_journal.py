@@ -0,0 +1,120 @@
+# tests/test_raw_journal.py
+
+import ctypes
+import os
+import tempfile
+import time
+
+from src.record.raw_journal import RawJournalWriter, RawJournalReader, RECORD
+
+
+class Head(ctypes.Structure):
+    """与 SMsgHeadT 布局一致"""
+    _fields_ = [("msgFlag", ctypes.c_uint8), ("msgId", ctypes.c_uint8), ("status", ctypes.c_uint8),
+                ("detailStatus", ctypes.c_uint8), ("msgSize", ctypes.c_int32)]
+
+
+class Trade(ctypes.Structure):
+    _fields_ = [("ApplSeqNum", ctypes.c_int32), ("TradePrice", ctypes.c_int32), ("SecurityID", ctypes.c_char * 9)]
+
+
+class Body(ctypes.Union):
+    _fields_ = [("trade", Trade), ("raw", ctypes.c_char * 128)]
+
+
+class Dispatcher:
+    """模拟 MdsMsgDispatcher.replay_mkt_data_msg：按 msgId 取联合体成员"""
+
+    def __init__(self):
+        self.seen = []
+
+    def replay_mkt_data_msg(self, p_msg_head, p_msg_item, user_info=None):
+        head = p_msg_head.contents
+        if head.msgId == 22:
+            t = p_msg_item.contents.trade
+            self.seen.append((head.msgId, head.msgSize, t.ApplSeqNum, t.TradePrice, t.SecurityID))
+        else:
+            self.seen.append((head.msgId, head.msgSize))
+        return 0
+
+
+def message(i: int):
+    if i % 10 == 9:     # 心跳：无消息体
+        return Head(msgId=1, msgSize=0), None
+    body = Body()
+    body.trade = Trade(i, 100000 + i, b"600519")
+    return Head(msgId=22, msgSize=ctypes.sizeof(Trade)), body
+
+
+def check_record_and_replay(tmp: str, n: int = 50000):
+    path = os.path.join(tmp, "mds.jrnl")
+    writer = RawJournalWriter(path, chunk_size=256 << 10)       # 小块，覆盖扩容重新映射
+    messages = [message(i) for i in range(n)]
+    t0 = time.perf_counter()
+    for i, (head, body) in enumerate(messages):
+        writer.record(ctypes.pointer(head), ctypes.pointer(body) if body else None, recv_ns=1_000_000 * i)
+    record_us = (time.perf_counter() - t0) / n * 1e6
+    writer.close()
+    assert os.path.getsize(path) == writer.stats()["bytes"], "关闭时应截断到实际长度"
+
+    reader = RawJournalReader(path)
+    index = reader.index()
+    assert len(index) == n and index["ts"][1] == 1_000_000 and set(index["msg_id"]) == {1, 22}
+    size = RECORD.size + 8 + ctypes.sizeof(Trade)
+    assert index["offset"][1] - index["offset"][0] == (size + 7) // 8 * 8, "消息体只记录 msgSize 字节"
+
+    dispatcher = Dispatcher()
+    t0 = time.perf_counter()
+    count = reader.replay(dispatcher, head_type=Head, body_type=Body)
+    replay_rate = count / (time.perf_counter() - t0)
+    assert count == n
+    assert dispatcher.seen[0] == (22, ctypes.sizeof(Trade), 0, 100000, b"600519")
+    assert dispatcher.seen[9] == (1, 0) and dispatcher.seen[-2][2] == n - 2
+
+    dispatcher = Dispatcher()
+    assert reader.replay(dispatcher, msg_ids=[1], head_type=Head, body_type=Body) == n // 10
+    reader.close()
+    print(f"✅ 原始行情日志: {n} 条, 记录 {record_us:.2f} 微秒/条, 回放 {replay_rate:,.0f} 条/秒")
+
+
+def check_paced_replay_and_rebuild_index(tmp: str):
+    path = os.path.join(tmp, "paced.jrnl")
+    writer = RawJournalWriter(path)
+    for i in range(5):
+        head, body = message(i)
+        writer.record(ctypes.pointer(head), ctypes.pointer(body), recv_ns=i * 20_000_000)   # 间隔 20ms
+    writer.close()
+    os.remove(f"{path}.idx")
+
+    reader = RawJournalReader(path)
+    assert list(reader.index()["ts"]) == [i * 20_000_000 for i in range(5)], "缺少索引文件时扫描重建"
+    t0 = time.perf_counter()
+    reader.replay(Dispatcher(), speed=2, head_type=Head, body_type=Body)      # 2 倍速：约 40ms
+    elapsed = time.perf_counter() - t0
+    reader.close()
+    assert 0.035 <= elapsed < 0.5, elapsed
+    print(f"✅ 2 倍速回放 80ms 数据耗时 {elapsed * 1000:.0f}ms")
+
+
+def check_bad_file(tmp: str):
+    path = os.path.join(tmp, "bad.jrnl")
+    with open(path, "wb") as f:
+        f.write(b"not a journal....")
+    try:
+        RawJournalReader(path)
+    except ValueError:
+        print("✅ 非日志文件拒绝读取")
+    else:
+        raise AssertionError("应拒绝非日志文件")
+
+
+def main():
+    print("🚀 启动原始行情日志测试")
+    with tempfile.TemporaryDirectory() as tmp:
+        check_record_and_replay(tmp)
+        check_paced_replay_and_rebuild_index(tmp)
+        check_bad_file(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# tests/test_ring_buffer.py
+
+import queue
+import threading
+import time
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+from src.event_engine.ring_buffer import RingBufferQueue
+
+
+def test_block_policy(n: int = 200_000):
+    q = RingBufferQueue(capacity=1024, policy="block")
+    got = []
+
+    def producer():
+        q.bind_producer()
+        for i in range(n):
+            q.put(i)
+
+    t = threading.Thread(target=producer)
+    t.start()
+    t0 = time.perf_counter()
+    while len(got) < n:
+        got.extend(q.get_many(256, timeout=1))
+    elapsed = time.perf_counter() - t0
+    t.join()
+
+    assert got == list(range(n)), "block 模式顺序错乱或丢失"
+    print(f"✅ block 模式: {n} 条无丢失，{n / elapsed:,.0f} 条/秒，stats={q.stats()}")
+
+
+class _SlowClearSlots(list):
+    """清空槽位（写 None）前让出线程并等待，放大消费者清空与生产者写入同一槽位的竞争窗口"""
+
+    def __setitem__(self, index, value):
+        if value is None:
+            time.sleep(0.0002)
+        super().__setitem__(index, value)
+
+
+def test_block_policy_tiny_capacity(n: int = 2000):
+    """容量 2 + 快生产者 / 慢消费者：槽位须先清空再推进读序号，否则生产者新写入的事件会被抹掉"""
+    q = RingBufferQueue(capacity=2, policy="block", idle_sleep=0)
+    q._items = _SlowClearSlots(q._items)
+    got = []
+
+    def producer():
+        q.bind_producer()
+        for i in range(n):
+            q.put(i)
+
+    t = threading.Thread(target=producer)
+    t.start()
+    try:
+        while len(got) < n:
+            got.append(q.get(timeout=2))
+    except queue.Empty:
+        pass
+    t.join()
+    assert got == list(range(n)), f"丢失 / 错读事件: 收到 {len(got)} 条，其中 None {got.count(None)} 个"
+    print(f"✅ block 模式容量 2 压力测试: {n} 条无丢失")
+
+
+def test_overwrite_policy():
+    q = RingBufferQueue(capacity=8, policy="overwrite")
+    t = threading.Thread(target=lambda: [q.bind_producer()] + [q.put(i) for i in range(20)])
+    t.start()
+    t.join()
+
+    got = []
+    while not q.empty():
+        got.append(q.get_nowait())
+    assert got == list(range(12, 20)), f"overwrite 模式应只保留最新 8 条: {got}"
+    assert q.overwritten == 12
+    print(f"✅ overwrite 模式: 保留 {got}，覆盖 {q.overwritten} 条")
+
+
+def test_engine_with_loopback():
+    """事件线程内回发事件（策略信号）走旁路，不破坏单生产者约束"""
+    engine = EventEngine("ring_test", queue_type="ring", queue_options={"capacity": 4096})
+    signals = []
+
+    def on_snapshot(event: Event):
+        if event.data["seq"] % 100 == 0:
+            engine.put(Event(EventType.STRATEGY_SIGNAL, {"seq": event.data["seq"]}))
+
+    engine.register(EventType.MARKET_SNAPSHOT, on_snapshot)
+    engine.register(EventType.STRATEGY_SIGNAL, lambda e: signals.append(e.data["seq"]))
+    engine.start()
+
+    feeder = threading.Thread(target=lambda: [engine.bind_producer()] + [
+        engine.put(Event(EventType.MARKET_SNAPSHOT, {"SecurityID": "600519", "seq": i}))
+        for i in range(10_000)
+    ])
+    feeder.start()
+    feeder.join()
+    time.sleep(1)
+    engine.stop()
+
+    assert signals == list(range(0, 10_000, 100))
+    print(f"✅ EventEngine(queue_type='ring'): 收到信号 {len(signals)} 个，队列 {engine.queue_stats()}")
+
+
+def test_side_path_order_and_bound():
+    """非生产者线程（先于行情线程投递也一样）走有界旁路，并按投递顺序排在此前的环形缓冲事件之后"""
+    q = RingBufferQueue(capacity=64, side_capacity=4)
+    q.put("control-0")                      # 未绑定生产者：走旁路，不会抢占生产者身份
+    producer = threading.Thread(target=lambda: [q.bind_producer()] + [q.put(f"md-{i}") for i in range(3)])
+    producer.start()
+    producer.join()
+    q.put("control-1")
+    q.put("control-2")
+    got = [q.get_nowait() for _ in range(6)]
+    assert got == ["control-0", "md-0", "md-1", "md-2", "control-1", "control-2"], got
+    assert q.stats()["side_put"] == 3 and q.stats()["written"] == 3
+
+    for i in range(4):
+        q.put_nowait(i)
+    try:
+        q.put_nowait(4)
+    except queue.Full:
+        pass
+    else:
+        raise AssertionError("旁路满时应拒绝")
+    assert q.side_dropped == 1 and q.qsize() == 4
+
+    q = RingBufferQueue(capacity=64, policy="overwrite", side_capacity=2)
+    for i in range(5):
+        q.put(i)
+    assert [q.get_nowait() for _ in range(2)] == [3, 4] and q.side_overwritten == 3
+    print(f"✅ 旁路保持投递顺序，满时计数: {q.stats()}")
+
+
+def main():
+    print("🚀 启动 RingBufferQueue 测试")
+    test_block_policy()
+    test_block_policy_tiny_capacity()
+    test_overwrite_policy()
+    test_engine_with_loopback()
+    test_side_path_order_and_bound()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# tests/test_risk_engine.py
+
+import time
+
+from src.account.account_simulator import AccountSimulator
+from src.event_engine.event import Event
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event_type import EventType
+from src.risk.risk_engine import PreTradeRiskEngine
+
+
+class _Engine:
+    def __init__(self):
+        self.events = []
+
+    def put(self, event):
+        self.events.append(event)
+
+
+def tick(sym: str, price) -> Event:
+    return Event(EventType.MARKET_SNAPSHOT, {"SecurityID": sym, "TradePx": price})
+
+
+def signal(sym: str, action: str, price, volume: int = 100, source: str = "S1") -> Event:
+    return Event(EventType.STRATEGY_SIGNAL, {"symbol": sym, "action": action, "price": price, "volume": volume},
+                 source=source)
+
+
+def last_rule(engine: _Engine):
+    e = engine.events[-1]
+    return e.data["rule"] if e.type == EventType.RISK_ALERT else None
+
+
+def fill(risk: PreTradeRiskEngine, order: dict, volume: int = None, price=None):
+    """模拟账户对一笔放行委托的成交回报（缺省全部按委托价成交，volume=0 表示未成交）"""
+    risk.on_event(Event(EventType.ORDER_FILLED, {
+        "symbol": order["symbol"], "action": order["action"], "price": price or order["price"],
+        "volume": order["volume"] if volume is None else volume, "fee": 0.0, "order": order,
+    }))
+
+
+def submitted(engine: _Engine) -> dict:
+    out = engine.events[-1]
+    assert out.type == EventType.ORDER_SUBMIT, out.type
+    return out.data
+
+
+def test_limits():
+    ee = _Engine()
+    risk = PreTradeRiskEngine(ee, {
+        "max_order_qty": 1000, "max_order_notional": 50_000, "max_position": 1500,
+        "max_gross_notional": 110_000, "price_band_pct": 0.05, "reject_without_price": True,
+        "symbols": {"000001": {"max_position": 20_000, "max_order_qty": 5000, "max_order_notional": 0}},
+    })
+    assert not risk.on_signal(signal("600519", "buy", 10)) and last_rule(ee) == "no_price"
+    risk.on_events([tick("600519", 10.0), tick("000001", 10.0)])
+
+    assert risk.on_signal(signal("600519", "buy", 10.2, 1000))
+    out = ee.events[-1]
+    assert out.type == EventType.ORDER_SUBMIT and out.source == "S1" and out.data["volume"] == 1000
+    assert risk.position("600519") == 0, "放行不等于成交"
+    fill(risk, out.data)
+    assert risk.position("600519") == 1000
+    assert not risk.on_signal(signal("600519", "buy", 10, 2000)) and last_rule(ee) == "order_qty"
+    assert not risk.on_signal(signal("600519", "buy", 60, 900)) and last_rule(ee) == "order_notional"
+    assert not risk.on_signal(signal("600519", "buy", 10.6)) and last_rule(ee) == "price_band"
+    assert not risk.on_signal(signal("600519", "buy", 10, 600)) and last_rule(ee) == "position"
+    assert risk.on_signal(signal("600519", "sell", 10, 600)) and risk.position("600519") == 1000
+    fill(risk, submitted(ee))
+    assert risk.position("600519") == 400, "卖出按成交回报释放持仓"
+
+    assert risk.on_signal(signal("600519", "buy", 10, 600)), "卖出成交后释放持仓额度"
+    pending = submitted(ee)
+    assert not risk.on_signal(signal("600519", "buy", 10, 600)) and last_rule(ee) == "position", "在途买单计入持仓上限"
+    fill(risk, pending, 300)
+    assert risk.position("600519") == 700 and risk.stats()["pending_notional"] == 0, "部分成交释放整笔在途额度"
+    assert risk.on_signal(signal("600519", "sell", 10, 100)), "卖出不检查持仓上限"
+    fill(risk, submitted(ee))
+
+    assert risk.on_signal(signal("000001", "buy", 10, 5000)), "单标的覆盖全局限额"
+    fill(risk, submitted(ee))
+    assert abs(risk.gross_notional - ((10_200 * 0.4 + 3000) * 6 / 7 + 50_000)) < 1e-6, "卖出按持仓均价释放金额"
+    assert risk.on_signal(signal("000001", "buy", 10, 5000))
+    pending = submitted(ee)
+    assert not risk.on_signal(signal("000001", "buy", 10, 1000)) and last_rule(ee) == "gross_notional"
+    fill(risk, pending, 0)
+    assert risk.on_signal(signal("000001", "buy", 10, 1000)), "未成交回报释放在途额度"
+
+    stats = risk.stats()
+    assert stats["rejects"] == {"no_price": 1, "order_qty": 1, "order_notional": 1, "price_band": 1,
+                                "position": 2, "gross_notional": 1}
+    assert stats["passed"] == 7 and stats["latency_ns"]["count"] == 14 and stats["open_orders"] == 1
+    alert = ee.events[-2]
+    assert alert.data["symbol"] == "000001" and "风控拒绝" in alert.data["message"]
+    print("✅ 数量 / 金额 / 价格带 / 持仓 / 总敞口限额（按成交回报对账，含在途买单）")
+
+
+def test_price_scale():
+    """MDS 原始价格（元 × 10000）下金额限额仍按元计算"""
+    ee = _Engine()
+    risk = PreTradeRiskEngine(ee, {"max_order_notional": 50_000, "max_gross_notional": 80_000, "price_scale": 10000})
+    risk.on_event(tick("600519", 100_000))                                 # 10.00 元
+    assert risk.on_signal(signal("600519", "buy", 100_000, 4000))          # 40,000 元
+    fill(risk, submitted(ee))
+    assert abs(risk.gross_notional - 40_000) < 1e-6
+    assert not risk.on_signal(signal("600519", "buy", 100_000, 6000)) and last_rule(ee) == "order_notional"
+    assert not risk.on_signal(signal("600519", "buy", 100_000, 4100)) and last_rule(ee) == "gross_notional"
+    assert "81000.00" in ee.events[-1].data["message"]
+    print("✅ price_scale 折算金额限额")
+
+
+def test_rate_limits():
+    ee = _Engine()
+    risk = PreTradeRiskEngine(ee, {"max_orders_per_sec": 5, "max_symbol_orders_per_sec": 2})
+    results = [risk.on_signal(signal("600519", "buy", 10)) for _ in range(3)]
+    assert results == [True, True, False] and last_rule(ee) == "symbol_rate"
+    results = [risk.on_signal(signal(f"{600000 + i}", "buy", 10)) for i in range(4)]
+    assert results == [True, True, True, False] and last_rule(ee) == "rate", "单标的被拒的委托不占全局额度"
+    time.sleep(0.5)
+    assert risk.on_signal(signal("600519", "buy", 10)), "令牌按时间补充"
+    print("✅ 全局 / 单标的令牌桶限速")
+
+
+def test_pipeline():
+    ee = EventEngine("risk_test")
+    risk = PreTradeRiskEngine(ee, {"max_order_qty": 500})
+    account = AccountSimulator(100_000, event_engine=ee)
+    alerts = []
+    ee.register(EventType.STRATEGY_SIGNAL, risk.on_event)
+    ee.register(EventType.ORDER_FILLED, risk.on_event)
+    ee.register(EventType.ORDER_SUBMIT, account.on_event)
+    ee.register(EventType.RISK_ALERT, alerts.append)
+    ee.start()
+    ee.put(signal("600519", "buy", 10, 300))
+    ee.put(signal("600519", "buy", 10, 800))
+    ee.put(signal("600519", "buy", 300, 400))      # 风控放行，账户资金不足未成交
+    time.sleep(0.5)
+    ee.stop()
+    assert account.position == {"600519": 300} and len(alerts) == 1
+    stats = risk.stats()
+    assert risk.position("600519") == 300 and stats["open_orders"] == 0 and stats["pending_notional"] == 0, stats
+    print("✅ 信号 -> 风控 -> ORDER_SUBMIT -> 账户 -> ORDER_FILLED -> 风控对账")
+
+
+def test_latency(n: int = 100_000):
+    ee = _Engine()
+    risk = PreTradeRiskEngine(ee, {"max_order_qty": 10_000, "max_position": 10 ** 9, "price_band_pct": 0.1,
+                                   "max_symbol_orders_per_sec": 10 ** 9})
+    symbols = [f"{600000 + i}" for i in range(1000)]
+    risk.on_events([tick(sym, 10.0) for sym in symbols])
+    signals = [signal(symbols[i % len(symbols)], "buy", 10.0) for i in range(n)]
+    t0 = time.perf_counter()
+    for event in signals:
+        risk.on_signal(event)
+    per_order_us = (time.perf_counter() - t0) / n * 1e6
+    s = risk.stats()["latency_ns"]
+    assert risk.passed == n
+    print(f"✅ 风控单笔 {per_order_us:.2f} 微秒（自身统计 p50={s['p50'] / 1000:.1f} p99={s['p99'] / 1000:.1f} 微秒）")
+    risk.report()
+
+
+def main():
+    print("🚀 启动事前风控测试")
+    test_limits()
+    test_price_scale()
+    test_rate_limits()
+    test_pipeline()
+    test_latency()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# tests/test_snapshot_columns.py
+
+import ctypes
+import time
+
+import numpy as np
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event_type import EventType
+from src.market.market_event_handler import MarketEventHandler
+from src.market.snapshot_columns import SnapshotColumns, ctypes_dtype
+
+
+# 与 MdsMktDataSnapshotT 布局一致的精简结构体（快照头 + 匿名联合体）
+class PriceLevel(ctypes.Structure):
+    _fields_ = [("Price", ctypes.c_int32), ("NumberOfOrders", ctypes.c_int32), ("OrderQty", ctypes.c_int64)]
+
+
+class Head(ctypes.Structure):
+    _fields_ = [("exchId", ctypes.c_uint8), ("mdProductType", ctypes.c_uint8),
+                ("tradeDate", ctypes.c_int32), ("updateTime", ctypes.c_int32),
+                ("instrId", ctypes.c_int32), ("bodyLength", ctypes.c_int16)]
+
+
+class L2Stock(ctypes.Structure):
+    _fields_ = [("SecurityID", ctypes.c_char * 9), ("TradingPhaseCode", ctypes.c_char * 8),
+                ("__filler", ctypes.c_char * 7), ("NumTrades", ctypes.c_uint64),
+                ("TotalVolumeTraded", ctypes.c_uint64), ("TradePx", ctypes.c_int32),
+                ("BidLevels", PriceLevel * 10), ("OfferLevels", PriceLevel * 10)]
+
+
+class Overview(ctypes.Structure):
+    _fields_ = [("OrigDate", ctypes.c_int32), ("OrigTime", ctypes.c_int32)]
+
+
+class _Body(ctypes.Union):
+    _fields_ = [("l2Stock", L2Stock), ("l2MarketOverview", Overview)]
+
+
+class Snapshot(ctypes.Structure):
+    _fields_ = [("head", Head), ("__union", _Body)]
+    _anonymous_ = ["__union"]
+
+
+def make_snapshot(symbol: bytes, px: int, update_time: int) -> Snapshot:
+    snap = Snapshot()
+    snap.head.tradeDate, snap.head.updateTime = 20250424, update_time
+    snap.l2Stock.SecurityID, snap.l2Stock.TradePx = symbol, px
+    snap.l2Stock.TotalVolumeTraded = 24000
+    for i in range(10):
+        snap.l2Stock.BidLevels[i].Price, snap.l2Stock.BidLevels[i].OrderQty = px - (i + 1) * 100, 100 * (i + 1)
+        snap.l2Stock.OfferLevels[i].Price, snap.l2Stock.OfferLevels[i].OrderQty = px + (i + 1) * 100, 200 * (i + 1)
+    return snap
+
+
+def test_dtype():
+    dt = ctypes_dtype(L2Stock)
+    assert dt.itemsize == ctypes.sizeof(L2Stock)
+    assert dt.fields["BidLevels"][1] == L2Stock.BidLevels.offset
+    assert dt["SecurityID"] == np.dtype("S9")
+    print(f"✅ dtype 与 ctypes 布局一致: itemsize={dt.itemsize}")
+
+
+def test_columns():
+    table = SnapshotColumns(capacity=4)
+    rows = [table.append(make_snapshot(b"600519", 1580000 + i, 93100000 + i)) for i in range(6)]
+    row = rows[-1]
+    assert row.get("symbol") == "600519" and row["TradePx"] == 1580005 and row["update_time"] == 93100005
+    assert isinstance(row["TradePx"], int), "标量应转换为 Python int"
+    assert row.bid_px.tolist() == [1580005 - (i + 1) * 100 for i in range(10)]
+    assert row.ask_qty.tolist() == [200 * (i + 1) for i in range(10)]
+    assert table.column("TradePx").tolist() == [1580002, 1580003, 1580004, 1580005]
+    try:
+        rows[0].get("TradePx")
+        raise AssertionError("被覆盖的行应报错")
+    except LookupError:
+        pass
+    print(f"✅ 列式缓存: {row.to_dict()} | 买一~三 {row.bid_px[:3]}")
+
+
+class _RacyColumn:
+    """读取某行后立即触发一次写入，模拟 memmove 释放 GIL 期间生产者覆盖该行"""
+
+    def __init__(self, col, write):
+        self.col = col
+        self.write = write
+
+    def __getitem__(self, i):
+        value = self.col[i]
+        self.write()
+        return value
+
+
+def test_torn_read():
+    table = SnapshotColumns(capacity=2)
+    row = table.append(make_snapshot(b"600519", 1580000, 93100000))
+    table.append(make_snapshot(b"600519", 1580001, 93100001))
+    overwrite = lambda: table.append(make_snapshot(b"000001", 99, 93100002))
+
+    real_column, real_levels = table._column, table._level_column
+    table._column = lambda name: _RacyColumn(real_column(name), overwrite)
+    table._level_column = lambda side, field: _RacyColumn(real_levels(side, field), overwrite)
+    for read in (lambda: row.get("TradePx"), lambda: row.bid_px):
+        try:
+            read()
+            raise AssertionError("读取期间被覆盖的行应报错")
+        except LookupError:
+            pass
+    table._column, table._level_column = real_column, real_levels
+
+    latest = table.append(make_snapshot(b"600519", 1580009, 93100009))
+    table._seqs[latest._row] = -1                  # 写入中
+    try:
+        latest.get("TradePx")
+        raise AssertionError("写入中的行应报错")
+    except LookupError:
+        pass
+    table._seqs[latest._row] = latest._seq
+    bids = latest.bid_px
+    table.records[latest._row]["l2Stock"]["BidLevels"]["Price"][0] = 0
+    assert bids[0] == 1580009 - 100, "盘口数组应为拷贝"
+    print("✅ seqlock: 写入中 / 读取期间被覆盖的行均抛出 LookupError")
+
+
+def test_speed(n: int = 50_000):
+    snap = make_snapshot(b"600519", 1580000, 93100000)
+    handler = MarketEventHandler(None)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        d = handler._extract_common_snapshot(snap.l2Stock, snap.head)
+        bids = [lv.Price for lv in snap.l2Stock.BidLevels]
+    t_dict = time.perf_counter() - t0
+
+    table = SnapshotColumns(capacity=65536)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        row = table.append(snap)
+        bids = row.bid_px
+    t_cols = time.perf_counter() - t0
+    print(f"✅ {n} 条快照（含十档买价）: 字典 {n / t_dict:,.0f}/s | 列式 {n / t_cols:,.0f}/s")
+
+
+def test_handler():
+    engine = EventEngine("columns_test")
+    seen = []
+    engine.register(EventType.MARKET_SNAPSHOT,
+                    lambda e: seen.append((e.data.get("SecurityID"), e.data.get("TradePx"), int(e.data.bid_px[0]))))
+    engine.start()
+    handler = MarketEventHandler(engine, snapshot_columns=1024)
+    handler.handle_l2_snapshot(make_snapshot(b"600519", 1580000, 93100000))
+    time.sleep(1.5)
+    engine.stop()
+    assert seen == [("600519", 1580000, 1579900)], seen
+    print(f"✅ MarketEventHandler(snapshot_columns=1024): {seen}")
+
+
+def main():
+    print("🚀 启动快照列式缓存测试")
+    test_dtype()
+    test_columns()
+    test_torn_read()
+    test_speed()
+    test_handler()
+
+
+if __name__ == "__main__":
+    main()
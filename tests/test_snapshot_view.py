@@ -0,0 +1,121 @@
+# tests/test_snapshot_view.py
+
+import ctypes
+import importlib.util
+import time
+from pathlib import Path
+
+from src.event_engine.event_engine import EventEngine
+from src.event_engine.event_type import EventType
+from src.market.market_event_handler import MarketEventHandler
+from src.market.snapshot_view import SnapshotView
+
+# 缓冲池模块只依赖 ctypes，按文件加载，避免导入 quote_api 时加载行情动态库
+_POOL_FILE = Path(__file__).resolve().parent.parent / "vendor_api/quote_api/c_api_wrapper/mds_buffer_pool.py"
+_spec = importlib.util.spec_from_file_location("mds_buffer_pool", _POOL_FILE)
+mds_buffer_pool = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(mds_buffer_pool)
+
+
+# 与 MdsMktDataSnapshotT 布局类似的精简结构体
+class Head(ctypes.Structure):
+    _fields_ = [("exchId", ctypes.c_uint8), ("tradeDate", ctypes.c_int32),
+                ("updateTime", ctypes.c_int32), ("bodyLength", ctypes.c_int16)]
+
+
+class L2Stock(ctypes.Structure):
+    _fields_ = [("SecurityID", ctypes.c_char * 9), ("TradePx", ctypes.c_int32),
+                ("TotalVolumeTraded", ctypes.c_uint64), ("BidPx", ctypes.c_int32 * 10)]
+
+
+class Snapshot(ctypes.Structure):
+    _fields_ = [("head", Head), ("l2Stock", L2Stock)]
+
+
+class Body(ctypes.Union):
+    _fields_ = [("mktDataSnapshot", Snapshot), ("_reserve", ctypes.c_char * 8192)]
+
+
+def _make_src(symbol: bytes, px: int) -> Body:
+    src = Body()
+    snap = src.mktDataSnapshot
+    snap.head.tradeDate, snap.head.updateTime = 20250424, 93100000
+    snap.l2Stock.SecurityID, snap.l2Stock.TradePx = symbol, px
+    snap.l2Stock.TotalVolumeTraded = 24000
+    return src
+
+
+def test_view():
+    view = SnapshotView(_make_src(b"600519", 1580000).mktDataSnapshot)
+    assert view.get("symbol") == "600519" and view["SecurityID"] == "600519"
+    assert view.get("TradePx") == 1580000 and view.get("updateTime") == 93100000
+    assert view.get("not_a_field", 0) == 0 and "BidPx" in view
+    assert view.to_dict() == {
+        "symbol": "600519", "last_price": 1580000, "volume": 24000, "trade_date": 20250424,
+        "update_time": 93100000, "SecurityID": "600519", "TradePx": 1580000, "最新价": 1580000,
+    }
+    try:
+        view["TradePx"] = 1
+        raise AssertionError("视图应为只读")
+    except TypeError:
+        pass
+    print(f"✅ 视图字段与字典一致: {view}")
+
+
+def test_pool_safety():
+    """模拟分派器：回调内保存视图（retain）时缓冲不得被复用，视图释放后才回收"""
+    pool = mds_buffer_pool.MdsMsgBufferPool(Body)
+    size = ctypes.sizeof(Snapshot)
+    kept = []
+    for i, sym in enumerate([b"600519", b"000001", b"300750"]):
+        src = _make_src(sym, 1000 + i)
+        buf = pool.acquire()
+        pool.copy_from(buf, ctypes.byref(src), size)
+        kept.append(SnapshotView(buf.mktDataSnapshot))
+        assert not pool.release(buf), "视图仍持有时分派器释放不应回收"
+    assert [v["symbol"] for v in kept] == ["600519", "000001", "300750"], "被持有的缓冲被覆盖"
+    assert pool.stats()["created"] == 3 and pool.stats()["free"] == 0
+
+    kept.clear()
+    assert pool.stats()["free"] == 3, pool.stats()
+    # 回调中不持有时缓冲立即复用
+    for _ in range(1000):
+        buf = pool.acquire()
+        pool.copy_from(buf, ctypes.byref(_make_src(b"600519", 1)), size)
+        _ = buf.mktDataSnapshot.l2Stock.TradePx
+        assert pool.release(buf)
+    assert pool.stats()["created"] == 3, pool.stats()
+    assert not pool.release(buf) and pool.stats()["free"] == 3, "重复释放应忽略"
+
+    # copy() 得到不属于缓冲池的副本，缓冲回收复用后副本不变
+    buf = pool.acquire()
+    pool.copy_from(buf, ctypes.byref(_make_src(b"600519", 7)), size)
+    snap = pool.copy(buf.mktDataSnapshot)
+    pool.release(buf)
+    pool.copy_from(pool.acquire(), ctypes.byref(_make_src(b"000001", 8)), size)
+    assert snap.l2Stock.SecurityID == b"600519" and snap.l2Stock.TradePx == 7
+    print(f"✅ 缓冲池: {pool.stats()}")
+
+
+def test_handler():
+    engine = EventEngine("view_test")
+    seen = []
+    engine.register(EventType.MARKET_SNAPSHOT, lambda e: seen.append((e.data.get("SecurityID"), e.data.get("TradePx"))))
+    engine.start()
+    handler = MarketEventHandler(engine, snapshot_view=True)
+    handler.handle_l2_snapshot(_make_src(b"600519", 1580000).mktDataSnapshot)
+    time.sleep(1.5)
+    engine.stop()
+    assert seen == [("600519", 1580000)], seen
+    print(f"✅ MarketEventHandler(snapshot_view=True): {seen}")
+
+
+def main():
+    print("🚀 启动快照视图测试")
+    test_view()
+    test_pool_safety()
+    test_handler()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# tests/test_tick_gap_tracker.py
+
+import ctypes
+import threading
+import time
+
+from src.spi.tick_gap_tracker import TickGapTracker, RESEND_NO_DATA
+
+KEY = (2, 2011, 0)
+
+
+class Tick(ctypes.Structure):
+    _fields_ = [("ApplSeqNum", ctypes.c_uint32), ("TradeQty", ctypes.c_int32)]
+
+
+def collector():
+    seen = []
+    return seen, lambda msg, recv_ns: seen.append(msg.ApplSeqNum)
+
+
+def test_in_order_and_reorder():
+    tracker = TickGapTracker()
+    seen, emit = collector()
+    for seq in (1, 2, 3, 6, 7, 5, 4, 8, 8, 2):
+        tracker.on_tick(KEY, seq, Tick(seq), emit)
+    assert seen == list(range(1, 9)), seen
+    s = tracker.stats()
+    assert s["gaps"] == 1 and s["missing"] == 2 and s["recovered"] == 2 and s["duplicates"] == 2, s
+    assert s["open_gaps"] == 0 and s["pending"] == 0 and s["recovery_ns"]["count"] == 1
+    print(f"✅ 乱序重排: {s}")
+
+
+def test_buffer_copies_ctypes():
+    tracker = TickGapTracker()
+    seen, emit = collector()
+    tracker.on_tick(KEY, 1, Tick(1), emit)
+    shared = Tick(3)
+    tracker.on_tick(KEY, 3, shared, emit)
+    shared.ApplSeqNum = 99          # 模拟 copy_args=False 时回调内存被复用
+    tracker.on_tick(KEY, 2, Tick(2), emit)
+    assert seen == [1, 2, 3], seen
+    print("✅ 缺口后缓存的 ctypes 逐笔已复制")
+
+
+def test_resend():
+    sent = []
+    seen, emit = collector()
+
+    def resend(exch_id, channel_no, begin, end, stream):
+        # 模拟查询通道：同步回调重传的逐笔和应答
+        sent.append((begin, end))
+        for seq in range(begin, min(end, 2600) + 1):
+            tracker.on_resend((exch_id, channel_no, stream), seq, Tick(seq), emit)
+        return end - begin + 1
+
+    tracker = TickGapTracker(resend=resend, batch_ms=5)
+    tracker.start()
+    tracker.on_tick(KEY, 1, Tick(1), emit)
+    tracker.on_tick(KEY, 2501, Tick(2501), emit)      # 缺 2..2500，拆成 3 个请求
+    tracker.on_tick(KEY, 2503, Tick(2503), emit)      # 缺 2502，与上一区间不相邻
+    deadline = time.time() + 2
+    while len(seen) < 2503 and time.time() < deadline:
+        time.sleep(0.01)
+        tracker.flush()             # 行情线程发布重传线程补齐的逐笔
+    tracker.stop()
+    assert seen == list(range(1, 2504)), (len(seen), seen[-3:])
+    assert sent == [(2, 1001), (1002, 2001), (2002, 2500), (2502, 2502)], sent
+    s = tracker.stats()
+    assert s["resend_requests"] == 4 and s["resent"] == 2500 and s["lost"] == 0, s
+    tracker.report()
+    print(f"✅ 自动重传: {s['resend_requests']} 个请求补齐 {s['resent']} 条")
+
+
+def test_timeout_and_reject():
+    tracker = TickGapTracker(gap_timeout_ms=20)
+    seen, emit = collector()
+    tracker.on_tick(KEY, 1, Tick(1), emit)
+    tracker.on_tick(KEY, 4, Tick(4), emit)
+    time.sleep(0.03)
+    tracker.poll()
+    assert seen == [1] and tracker.stats()["ready"] == 1
+    tracker.flush()
+    assert seen == [1, 4] and tracker.lost == 2, (seen, tracker.lost)
+
+    tracker.on_tick(KEY, 10, Tick(10), emit)
+    tracker.on_resend_status(KEY, 5, 9, RESEND_NO_DATA)
+    tracker.flush()
+    assert seen == [1, 4, 10] and tracker.lost == 7, (seen, tracker.lost)
+    print(f"✅ 超时 / 拒绝时放弃缺口: {tracker.stats()['lost']} 条")
+
+
+def test_emit_outside_lock_on_md_thread():
+    """emit 在锁外、且只在行情线程上调用；重传应答线程只入就绪队列"""
+    tracker = TickGapTracker()
+    md_thread = threading.get_ident()
+    seen = []
+
+    def emit(msg, recv_ns):
+        assert not tracker._lock.locked(), "emit 时仍持有锁"
+        assert threading.get_ident() == md_thread, "emit 不在行情线程上"
+        seen.append(msg.ApplSeqNum)
+
+    tracker.on_tick(KEY, 1, Tick(1), emit)
+    tracker.on_tick(KEY, 4, Tick(4), emit)
+    rsp = threading.Thread(target=lambda: [tracker.on_resend(KEY, seq, Tick(seq), emit) for seq in (2, 3)])
+    rsp.start()
+    rsp.join()
+    assert seen == [1] and tracker.stats()["ready"] == 3, (seen, tracker.stats())
+    tracker.on_tick(KEY, 5, Tick(5), emit)          # 先发布就绪的 2..4，再发布 5
+    assert seen == [1, 2, 3, 4, 5], seen
+    print("✅ 逐笔在锁外按序发布，重传应答线程不调用 emit")
+
+
+def main():
+    print("🚀 启动逐笔缺口检测测试")
+    test_in_order_and_reorder()
+    test_buffer_copies_ctypes()
+    test_resend()
+    test_timeout_and_reject()
+    test_emit_outside_lock_on_md_thread()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# tests/test_tick_store.py
+
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_handler import MarketDataSaver
+from src.data_loader import DataLoader
+from src.event_engine.event import Event
+from src.event_engine.event_type import EventType
+from src.record import tick_store
+
+
+def trade(i: int, code: str, day: int) -> dict:
+    return {"kind": "trade", "symbol": code, "SecurityID": code, "exch_id": 2, "trade_date": day,
+            "time": 93000000 + i * 10, "ChannelNo": 2011, "ApplSeqNum": i, "SseBizIndex": 0,
+            "ExecType": "F", "TradeBSFlag": "N", "TradePx": 100000 + i, "TradeQty": 100,
+            "TradeMoney": 10000000, "BidApplSeqNum": i - 1, "OfferApplSeqNum": i - 2, "last_price": 100000 + i}
+
+
+def snapshot(i: int, code: str, day: int) -> dict:
+    return {"symbol": code, "last_price": 100000 + i, "volume": i * 100, "trade_date": day,
+            "update_time": 93000000 + i * 1000, "SecurityID": code, "TradePx": 100000 + i}
+
+
+def check_write_and_read(tmp: str):
+    saver = MarketDataSaver(root_dir=tmp, backend="parquet", flush_rows=2000, flush_interval=0.05,
+                            store_options={"roll_interval": 0.1, "max_open_files": 4})
+    codes = ["000001", "000002", "600519"]
+    events = []
+    for day in (20250423, 20250424):
+        for i in range(3000):
+            code = codes[i % 3]
+            events.append(Event(EventType.MARKET_TICK, trade(i, code, day)))
+            if i % 10 == 0:
+                events.append(Event(EventType.MARKET_SNAPSHOT, snapshot(i, code, day)))
+    events.append(Event(EventType.MARKET_TICK, {**trade(1, "000001", 20250424), "kind": "order"}))
+
+    t0 = time.perf_counter()
+    saver.on_events(events)
+    enqueue_us = (time.perf_counter() - t0) / len(events) * 1e6
+    time.sleep(0.3)
+    saver.close()
+    assert saver.saved == len(events) and saver.dropped == 0, saver.stats()
+
+    parts = list(Path(tmp, "trade", "date=20250424").glob("*.parquet"))
+    assert parts, "应按 date= 分区写入"
+    assert not list(Path(tmp, "trade", "date=20250424").glob("symbol=*")), "不应再按标的分目录"
+
+    loader = DataLoader(tmp)
+    df = loader.load_ticks("trade")
+    assert len(df) == 6000 and df["trade_date"].is_monotonic_increasing, "应按交易日、时间排序"
+    assert list(df.columns[:3]) == ["SecurityID", "exch_id", "trade_date"]
+
+    df = loader.load_ticks("trade", symbols=["000001"], start_date=20250424, end_date=20250424,
+                           start_time=93010000, end_time=93019990, columns=["SecurityID", "time", "TradePx"])
+    assert list(df.columns) == ["SecurityID", "time", "TradePx"], df.columns
+    assert df["SecurityID"].eq("000001").all() and df["time"].between(93010000, 93019990).all()
+    assert len(df) == len([i for i in range(3000) if i % 3 == 0 and 1000 <= i <= 1999]), len(df)
+    assert df["time"].is_monotonic_increasing
+
+    snaps = loader.load_ticks("snapshot", symbols=["600519"], columns=["date", "SecurityID", "last_price"])
+    assert len(snaps) == 2 * 100 and set(snaps["SecurityID"]) == {"600519"}, len(snaps)
+    assert set(snaps["date"]) == {20250423, 20250424}
+
+    orders = loader.load_ticks("order")
+    assert len(orders) == 1 and pd.isna(orders.loc[0, "OrderQty"]), "缺失字段应为空值"
+    print(f"✅ Parquet 行情存储: {len(events)} 行, 入队 {enqueue_us:.2f} 微秒/条, "
+          f"{saver.store.files} 个 part 文件")
+
+
+def check_row_groups(tmp: str):
+    """小批多次写入仍攒满 row_group_size 才写一个 row group，组内按 SecurityID、时间排序"""
+    import pyarrow.parquet as pq
+
+    store = tick_store.ParquetTickStore(tmp, roll_interval=3600, row_group_size=1000)
+    codes = ["600519", "000002", "000001"]
+    for batch in range(10):
+        store.write("trade", [trade(batch * 250 + i, codes[i % 3], 20250424) for i in range(250)])
+    assert store.row_groups == 2, "未满 row_group_size 的行应留在缓冲中"
+    store.close()
+
+    parts = list(Path(tmp, "trade", "date=20250424").glob("*.parquet"))
+    assert len(parts) == 1 and store.files == 1, parts
+    f = pq.ParquetFile(parts[0])
+    sizes = [f.metadata.row_group(i).num_rows for i in range(f.metadata.num_row_groups)]
+    assert sizes == [1000, 1000, 500], sizes
+    for i in range(f.num_row_groups):
+        df = f.read_row_group(i, columns=["SecurityID", "time"]).to_pandas()
+        assert df["SecurityID"].is_monotonic_increasing, "row group 内应按 SecurityID 排序"
+        assert df.groupby("SecurityID")["time"].apply(lambda t: t.is_monotonic_increasing).all()
+    print(f"✅ 10 批 2500 行写成 row group {sizes}")
+
+
+def main():
+    print("🚀 启动 Parquet 行情存储测试")
+    if tick_store.pa is None:
+        print("⚠️ 未安装 pyarrow，跳过")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        check_write_and_read(tmp)
+    with tempfile.TemporaryDirectory() as tmp:
+        check_row_groups(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+行情消息缓冲池 (copy_args="pool" 时使用)
+"""
+
+import threading
+
+from ctypes import (
+    addressof, memmove, sizeof
+)
+
+from typing import (
+    Any, List
+)
+
+
+class MdsMsgBufferPool:
+    """
+    预分配、可回收的 ctypes 消息缓冲池
+
+    - acquire() 优先复用空闲缓冲, 回调线程上不再为每条行情分配整个消息体联合体
+    - copy_from() 仅拷贝实际有效的字节 (当前消息类型对应的联合体成员), 而不是整个联合体
+    - 显式所有权: acquire() 返回的缓冲由分派器持有一份, 回调返回后分派器调用 release();
+      回调中需要在返回后继续持有缓冲 (或其成员结构体) 的一方, 须在回调内调用 retain(),
+      用完后再 release() (如行情快照视图); 只需保留数据时也可用 copy() 取得不属于缓冲池的副本。
+      持有者全部 release() 后缓冲才放回空闲列表, 不会被后续行情覆盖
+    - 所有权计数在锁内增减, 回调线程与事件线程可共享同一个池
+    """
+
+    def __init__(self, buffer_type: Any, maxsize: int = 1024) -> None:
+        """
+        Args:
+            buffer_type (Any): [缓冲的 ctypes 结构体 / 联合体类型]
+            maxsize (int): [空闲列表最多保留的缓冲数]
+        """
+        self.buffer_type = buffer_type
+        self.buffer_size: int = sizeof(buffer_type)
+        self.maxsize = maxsize
+        self._free: List[Any] = []
+        self._lock = threading.Lock()
+
+        # 统计
+        self.created = 0
+        self.reused = 0
+        self.retained = 0       # retain() 次数 (回调返回后仍被持有的缓冲)
+
+    def acquire(self) -> Any:
+        """
+        取出一个缓冲, 调用方持有一份所有权 (用完后 release())
+        """
+        try:
+            buf = self._free.pop()
+            self.reused += 1
+        except IndexError:
+            buf = self.buffer_type()
+            buf._pool = self
+            self.created += 1
+        buf._owners = 1
+        return buf
+
+    def copy_from(self, buf: Any, src: Any, size: int) -> Any:
+        """
+        从 C 指针 src 拷贝 size 字节到 buf (size 超出缓冲大小时截断)
+        """
+        if size <= 0 or size > self.buffer_size:
+            size = self.buffer_size
+        memmove(addressof(buf), src, size)
+        return buf
+
+    def retain(self, buf: Any) -> Any:
+        """
+        增加一份所有权: 须在缓冲仍被持有时 (如回调内) 调用, 用完后 release()
+        """
+        with self._lock:
+            buf._owners += 1
+            self.retained += 1
+        return buf
+
+    def release(self, buf: Any) -> bool:
+        """
+        释放一份所有权, 最后一个持有者释放时放回空闲列表 (重复释放忽略)
+
+        Returns:
+            bool: [是否已回收]
+        """
+        with self._lock:
+            if buf._owners <= 0:
+                return False
+            buf._owners -= 1
+            if buf._owners:
+                return False
+            if len(self._free) < self.maxsize:
+                self._free.append(buf)
+        return True
+
+    @staticmethod
+    def copy(obj: Any) -> Any:
+        """
+        复制缓冲或其成员结构体, 副本不属于缓冲池, 无需释放
+        """
+        return type(obj).from_buffer_copy(obj)
+
+    def stats(self) -> dict:
+        return {
+            "free": len(self._free),
+            "created": self.created,
+            "reused": self.reused,
+            "retained": self.retained,
+        }
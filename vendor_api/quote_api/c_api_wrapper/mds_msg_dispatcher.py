@@ -8,7 +8,7 @@ from ctypes import (
 )
 
 from typing import (
-    Any, Callable, Dict, List, Tuple, Optional
+    Any, Callable, Dict, List, Tuple, Optional, Union
 )
 
 from functools import (
@@ -34,6 +34,10 @@ from quote_api.mds_spi import (
     MdsClientSpi
 )
 
+from .mds_buffer_pool import (
+    MdsMsgBufferPool
+)
+
 from .mds_func_loader import (
     F_MDSAPI_ASYNC_ON_MSG_T,
     F_MDSAPI_ASYNC_ON_QRY_MSG_T,
@@ -297,16 +301,76 @@ _MDS_MSG_ID_TO_CALLBACK: Dict[
 # -------------------------
 
 
+# ===================================================================
+# 行情消息的快速派发规则定义 (适用于行情订阅通道)
+# dict字典说明:
+# - KEY  : 消息ID
+# - VALUE: tuple元组
+#   - 0号元素: MdsClientSpi 的回调函数名称 (初始化时绑定为spi实例的方法)
+#   - 1号元素: 消息体 MdsMktRspMsgBodyT 中对应的联合体成员名称 (None 表示回调不带消息体)
+# - 与 _MDS_MSG_ID_TO_CALLBACK 中行情消息的派发规则一致; 未列出的消息仍按 _MDS_MSG_ID_TO_CALLBACK 派发
+# ===================================================================
+
+_MDS_MKT_MSG_ID_TO_SPI_METHOD: Dict[int, Tuple[str, Optional[str]]] = {
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_TRADE:
+        ("on_l2_tick_trade", "trade"),
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_ORDER:
+        ("on_l2_tick_order", "order"),
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_SSE_ORDER:
+        ("on_l2_tick_order", "order"),
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_MARKET_DATA_SNAPSHOT:
+        ("on_l2_market_data_snapshot", "mktDataSnapshot"),
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_BEST_ORDERS_SNAPSHOT:
+        ("on_l2_best_orders_snapshot", "mktDataSnapshot"),
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_MARKET_OVERVIEW:
+        ("on_l2_market_overview", "mktDataSnapshot"),
+    eMdsMsgTypeT.MDS_MSGTYPE_MARKET_DATA_SNAPSHOT_FULL_REFRESH:
+        ("on_market_data_snapshot_full_refresh", "mktDataSnapshot"),
+    eMdsMsgTypeT.MDS_MSGTYPE_OPTION_SNAPSHOT_FULL_REFRESH:
+        ("on_market_option_snapshot_full_refresh", "mktDataSnapshot"),
+    eMdsMsgTypeT.MDS_MSGTYPE_INDEX_SNAPSHOT_FULL_REFRESH:
+        ("on_market_index_snapshot_full_refresh", "mktDataSnapshot"),
+    eMdsMsgTypeT.MDS_MSGTYPE_SECURITY_STATUS:
+        ("on_security_status", "securityStatus"),
+    eMdsMsgTypeT.MDS_MSGTYPE_TRADING_SESSION_STATUS:
+        ("on_trading_session_status", "trdSessionStatus"),
+    eMdsMsgTypeT.MDS_MSGTYPE_L2_TICK_CHANNEL_HEARTBEAT:
+        ("on_tick_channel_heart_beat", "tickChannelHeartbeat"),
+    eMdsMsgTypeT.MDS_MSGTYPE_MARKET_DATA_REQUEST:
+        ("on_market_data_request_rsp", "mktDataRequestRsp"),
+    eMdsMsgTypeT.MDS_MSGTYPE_TEST_REQUEST:
+        ("on_test_request_rsp", "testRequestRsp"),
+    eMdsMsgTypeT.MDS_MSGTYPE_HEARTBEAT:
+        ("on_heart_beat", None),
+    eMdsMsgTypeT.MDS_MSGTYPE_COMPRESSED_PACKETS:
+        ("on_compressed_packets", None),
+}
+
+# 消息ID -> copy_args="pool" 时需拷贝的最大字节数 (联合体各成员的偏移均为0)
+_MDS_MSG_ID_TO_BODY_SIZE: Dict[int, int] = {
+    msg_id: getattr(MdsMktRspMsgBodyT, member).size
+    for msg_id, (_, member) in _MDS_MKT_MSG_ID_TO_SPI_METHOD.items()
+    if member is not None
+}
+
+_NO_CHANNEL = object()
+# -------------------------
+
+
 class MdsMsgDispatcher:
     """
     python对c_mds_api回调函数的转换类
     """
 
-    def __init__(self, spi: MdsClientSpi, copy_args: bool) -> None:
+    def __init__(self, spi: MdsClientSpi, copy_args: Union[bool, str]) -> None:
         """
         Args:
             spi (MdsClientSpi): [回调处理类实例]
-            copy_args (bool, optional): [capi回调时是否复制参数]. Defaults to True.
+            copy_args (bool, str, optional): [capi回调时是否复制参数]. Defaults to True.
+            - True: 每条消息复制完整的消息头和消息体联合体
+            - "pool": 仅复制当前消息类型对应的联合体成员, 复制到可回收的预分配缓冲池中;
+              缓冲在回调返回后即复用; 回调中需要继续持有消息的一方须调用缓冲池的 retain()
+              (用完后 release()) 或 copy() 取得副本, 行情视图已自动 retain
 
         Raises:
             Exception: [参数spi类型错误]
@@ -317,6 +381,25 @@ class MdsMsgDispatcher:
         self._spi: MdsClientSpi = spi
         self._copy_args = copy_args
 
+        # 行情消息快速派发: 消息ID -> (spi绑定方法, 联合体成员名称), 初始化时一次性绑定
+        # @note 初始化之后再替换spi实例上的回调方法不会生效
+        self._mkt_msg_handlers: Dict[int, Tuple[Callable, Optional[str]]] = {
+            msg_id: (getattr(spi, method_name), member)
+            for msg_id, (method_name, member) in _MDS_MKT_MSG_ID_TO_SPI_METHOD.items()
+        }
+        # 会话 -> 通道缓存 (连接 / 断开时清空), 及复用的查询游标 (行情消息回调中无实际意义)
+        self._channels: Dict[Any, Any] = {}
+        self._dummy_cursor = MdsQryCursorT()
+
+        self._head_pool: Optional[MdsMsgBufferPool] = None
+        self._body_pool: Optional[MdsMsgBufferPool] = None
+        if copy_args == "pool":
+            self._head_pool = MdsMsgBufferPool(SMsgHeadT)
+            self._body_pool = MdsMsgBufferPool(MdsMktRspMsgBodyT)
+
+        # 原始行情日志 (提供 record(p_msg_head, p_msg_item) 方法, 如 RawJournalWriter), 为空时不记录
+        self._journal: Any = None
+
         # python有垃圾回收，传递给capi的非实时调用回调需要增加引用防止自动回收
         self._refs: List[CFuncPointer] = []
 
@@ -347,6 +430,7 @@ class MdsMsgDispatcher:
                     >0 大于0, 处理失败, 将重建连接并继续尝试执行
                  ]
         """
+        self._channels.clear()
         try:
             ret: int = self._spi.on_connect(
                 memcpy(p_channel.contents), partial_user_info)
@@ -448,6 +532,7 @@ class MdsMsgDispatcher:
                     <0  小于0, 异步线程将中止运行
                  ]
         """
+        self._channels.clear()
         try:
             return self._spi.on_disconnect(
                 memcpy(p_channel.contents), partial_user_info)
@@ -493,10 +578,56 @@ class MdsMsgDispatcher:
             [0]: [成功]
         """
 
-        msg_id: int = int(p_msg_head.contents.msgId)
-        p_channel = CMdsApiFuncLoader().\
-            c_mds_async_api_get_channel_by_session(p_session)
+        if self._journal is not None:
+            self._journal.record(p_msg_head, p_msg_item)
+
+        msg_id: int = p_msg_head.contents.msgId
+        entry = self._mkt_msg_handlers.get(msg_id)
+        if entry is None:
+            return self._handle_mkt_data_msg_by_table(msg_id, p_session,
+                p_msg_head, p_msg_item, partial_user_info)
+
+        handler, member = entry
+        channel = self._get_channel(p_session)
+
+        ret: int = -1
+        try:
+            if self._body_pool is not None:
+                ret = self._dispatch_pooled(handler, member, msg_id, channel,
+                    p_msg_head, p_msg_item, partial_user_info)
+            else:
+                if self._copy_args:
+                    msg_head = memcpy(p_msg_head.contents)
+                    msg_body = memcpy(p_msg_item.contents) if member else None
+                else:
+                    msg_head = p_msg_head.contents
+                    msg_body = p_msg_item.contents if member else None
+                ret = handler(channel, msg_head,
+                    getattr(msg_body, member) if member else None,
+                    partial_user_info)
+        except Exception as err:
+            log_error(f"调用消息msgId: {msg_id} 的回调函数时发生异常:{err}")
 
+        return ret
+
+    def _get_channel(self, p_session: c_void_p) -> Any:
+        """
+        按会话缓存通道信息, 避免每条消息都经 ctypes 调用 c_mds_async_api_get_channel_by_session
+        - p_session 为空或查询不到通道时返回 None
+        """
+        channel = self._channels.get(p_session, _NO_CHANNEL)
+        if channel is _NO_CHANNEL:
+            p_channel = CMdsApiFuncLoader().\
+                c_mds_async_api_get_channel_by_session(p_session)
+            channel = p_channel.contents if p_channel else None
+            self._channels[p_session] = channel
+        return channel
+
+    def _handle_mkt_data_msg_by_table(self, msg_id: int, p_session: c_void_p,
+            p_msg_head: _Pointer, p_msg_item: _Pointer, partial_user_info: Any) -> int:
+        """
+        按 _MDS_MSG_ID_TO_CALLBACK 派发快速派发表之外的消息
+        """
         tuple_callback = _MDS_MSG_ID_TO_CALLBACK.get(msg_id)
         if not tuple_callback:
             log_error(f"Invalid message type! msgId[0x{msg_id:0x}]")
@@ -507,26 +638,92 @@ class MdsMsgDispatcher:
         # - 1号元素: MDS查询回报的回调函数
         e_mds_msg_type = tuple_callback[0]
         callback: Optional[Callable] = tuple_callback[1]
+        channel = self._get_channel(p_session)
 
         ret: int = -1
         try:
             if self._copy_args:
-                ret = callback(p_channel.contents, self._spi,
+                ret = callback(channel, self._spi,
                     memcpy(p_msg_head.contents),
                     memcpy(p_msg_item.contents),
-                    MdsQryCursorT(),    # 无实际意义
+                    self._dummy_cursor,     # 无实际意义
                     partial_user_info)
             else:
-                ret = callback(p_channel.contents, self._spi,
+                ret = callback(channel, self._spi,
                     p_msg_head.contents,
                     p_msg_item.contents,
-                    MdsQryCursorT(),    # 无实际意义
+                    self._dummy_cursor,     # 无实际意义
                     partial_user_info)
         except Exception as err:
             log_error(f"调用消息msgId: {msg_id} 的回调函数时发生异常:{err}")
 
         return ret
 
+    def _dispatch_pooled(self, handler: Callable, member: Optional[str], msg_id: int,
+            channel: Any, p_msg_head: _Pointer, p_msg_item: _Pointer,
+            partial_user_info: Any) -> int:
+        """
+        copy_args="pool" 的派发: 消息头和有效的消息体成员拷贝到缓冲池中的缓冲后回调
+
+        - 拷贝长度取消息头 msgSize 与该消息类型对应联合体成员大小的较小值
+        - 回调返回后分派器释放自己持有的一份所有权; 回调内 retain() 过的缓冲
+          (如投递到事件队列的行情视图) 由持有者 release() 后回收
+        """
+        head = self._head_pool.acquire()
+        self._head_pool.copy_from(head, p_msg_head, self._head_pool.buffer_size)
+        if member is None:
+            try:
+                return handler(channel, head, None, partial_user_info)
+            finally:
+                self._head_pool.release(head)
+
+        body = self._body_pool.acquire()
+        size = _MDS_MSG_ID_TO_BODY_SIZE[msg_id]
+        if 0 < head.msgSize < size:
+            size = head.msgSize
+        self._body_pool.copy_from(body, p_msg_item, size)
+
+        try:
+            return handler(channel, head, getattr(body, member), partial_user_info)
+        finally:
+            self._head_pool.release(head)
+            self._body_pool.release(body)
+
+    def buffer_pool_stats(self) -> Dict[str, dict]:
+        """
+        copy_args="pool" 时头部 / 消息体缓冲池的统计信息
+        """
+        if self._body_pool is None:
+            return {}
+        return {"head": self._head_pool.stats(), "body": self._body_pool.stats()}
+
+    def set_journal(self, journal: Any) -> None:
+        """
+        设置原始行情日志, 每条行情消息派发前先以原始字节记录 (传入None关闭)
+
+        Args:
+            journal (Any): [提供 record(p_msg_head, p_msg_item) 方法的对象]
+        """
+        self._journal = journal
+
+    def replay_mkt_data_msg(self, p_msg_head: _Pointer, p_msg_item: _Pointer,
+            user_info: Any = None) -> int:
+        """
+        回放一条行情消息 (不经过capi, 无会话信息, 回调中的通道参数为None)
+
+        Args:
+            p_msg_head (_Pointer[SMsgHeadT]): [消息头]
+            p_msg_item (_Pointer[MdsMktRspMsgBodyT]): [消息体]
+            user_info (Any, None): [用户回调参数]
+
+        Returns:
+            [int]: [回调函数的返回值]
+        """
+        # 空会话直接对应空通道, 避免调用 c_mds_async_api_get_channel_by_session
+        self._channels[None] = None
+        return self._handle_mkt_data_msg(None, p_msg_head, p_msg_item,
+            None, user_info)
+
     def handle_mkt_data_msg(self, user_info: Any) -> CFuncPointer:
         """
         对self._handle_mkt_data_msg，返回行情数据回调函数
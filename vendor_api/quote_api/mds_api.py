@@ -482,9 +482,10 @@ class MdsClientApi:
             mds_client_spi (MdsClientSpi): [行情订阅通道消息的处理函数类]
             - Defaults to None. 此时默认使用self.mds_spi
 
-            copy_args (bool): [是否复制服务端返回的行情数据]
+            copy_args (bool, str): [是否复制服务端返回的行情数据]
             - Defaults to True
             - 可手动设置成False, 会提升吞吐和降低时延，但是行情数据需要立即保存起来, 否则后期使用会因异步队列数据覆盖而无法访问的风险
+            - 可设置成"pool", 仅复制当前消息类型对应的消息体成员到可回收的预分配缓冲池, 被持有的缓冲不会被覆盖
 
         Returns:
             [MdsAsyncApiChannelT]: [通道信息，请勿对其进行任何修改赋值操作]
@@ -519,9 +520,10 @@ class MdsClientApi:
             mds_client_spi (MdsClientSpi): [行情订阅通道消息的处理函数类].
             - Defaults to None. 此时默认使用self.mds_spi
 
-            copy_args (bool): [是否复制服务端返回的行情数据].
+            copy_args (bool, str): [是否复制服务端返回的行情数据].
             - Defaults to True
             - 可手动设置成False, 会提升吞吐和降低时延，但是行情数据需要立即保存起来, 否则后期使用会因异步队列数据覆盖而无法访问的风险
+            - 可设置成"pool", 仅复制当前消息类型对应的消息体成员到可回收的预分配缓冲池, 被持有的缓冲不会被覆盖
 
         Returns:
             [MdsAsyncApiChannelT]: [通道信息，请勿对其进行任何修改赋值操作]
@@ -1699,6 +1701,17 @@ class MdsClientApi:
                 return tuple_value[0]
         else:
             return None
+
+    def set_mkt_data_journal(self, journal: Any) -> None:
+        """
+        为所有已添加的行情订阅通道设置原始行情日志 (传入None关闭)
+        - 每条行情消息派发前, 以原始字节 (消息头 + 消息体) 调用 journal.record 记录
+
+        Args:
+            journal (Any): [提供 record(p_msg_head, p_msg_item) 方法的对象, 如 RawJournalWriter]
+        """
+        for msg_dispatcher in self._mds_msg_dispatchers:
+            msg_dispatcher.set_journal(journal)
     # -------------------------
 
 
@@ -1727,9 +1740,10 @@ class MdsClientApi:
             user_info (Any): [用户回调参数].
             mds_client_spi (MdsClientSpi): [行情订阅通道消息的处理函数类]
             - Defaults to None. 此时默认使用self.mds_spi
-            copy_args (bool): [是否复制服务端返回的行情数据]
+            copy_args (bool, str): [是否复制服务端返回的行情数据]
             - Defaults to True
             - 可手动设置成False, 会提升吞吐和降低时延，但是行情数据需要立即保存起来, 否则后期使用会因异步队列数据覆盖而无法访问的风险
+            - 可设置成"pool", 仅复制当前消息类型对应的消息体成员到可回收的预分配缓冲池, 被持有的缓冲不会被覆盖
 
             remote_cfg (MdsApiRemoteCfgT): [待添加的通道配置信息 (不可为空)]
             - 仅适用于is_add_from_file=False有效